@@ -3,6 +3,8 @@
 
 import streamlit as st
 import pandas as pd
+import functools
+import hashlib
 import io
 import re
 import sys
@@ -13,9 +15,18 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'core'))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'modules'))
 
 from lead_scoring_engine import LeadScorer
+from lead_features import drop_lead_features
+from lead_record import Lead
+from score_store import ScoreStore
 from outreach_templates import get_templates, get_openers, generate_personalized_content
-from enrichment import enrich_leads
+from enrichment import enrich_leads, seen_before_emails
+from industry_cache import IndustryCache
+from dedup_index import DedupIndex
 from column_mapper import ColumnMapper
+from data_loader import (LEAD_FILE_TYPES, REQUIRED_COLUMNS, attach_passthrough_columns, clean_leads,
+                         detect_file_format, load_leads, load_passthrough_columns, read_lead_columns)
+from size_parser import recognized_company_sizes
+from profiling import profile_run, profiling_requested
 
 def validate_email_format(email):
     """Validate basic email format."""
@@ -66,13 +77,7 @@ def validate_csv_data(df):
         warnings.append(f"⚠️ {missing_titles} leads missing job titles (will affect scoring)")
     
     # Check company size format
-    invalid_sizes = 0
-    for size in df['company_size']:
-        if pd.notna(size):
-            try:
-                int(size)
-            except (ValueError, TypeError):
-                invalid_sizes += 1
+    invalid_sizes = int((~recognized_company_sizes(df['company_size'])).sum())
     
     if invalid_sizes > 0:
         warnings.append(f"⚠️ {invalid_sizes} leads have invalid company sizes (will use 0)")
@@ -206,6 +211,82 @@ def show_column_mapping_results(mapping_log):
     else:
         st.info("✅ **Perfect!** Your CSV columns are already in the standard format.")
 
+def _fragment(function):
+    # A fragment reruns on its own when one of its widgets changes (Streamlit >= 1.37)
+    fragment = getattr(st, 'fragment', None)
+    return fragment(function) if fragment else function
+
+def passthrough_loader(uploaded_file, column_mapping):
+    """
+    Deferred reader of an upload's non-lead columns (see load_passthrough_columns).
+    
+    Scoring reads only the lead columns; the others are read once, by the
+    first export that needs them.
+    
+    Args:
+        uploaded_file: Streamlit upload
+        column_mapping (dict): {original_column: standard_name} used to load the leads
+        
+    Returns:
+        callable: Returns the passthrough DataFrame
+    """
+    file_bytes = uploaded_file.getvalue()
+    file_format = detect_file_format(uploaded_file)
+    
+    @functools.lru_cache(maxsize=1)
+    def load_passthrough():
+        return load_passthrough_columns(io.BytesIO(file_bytes), column_mapping, file_format)
+    return load_passthrough
+
+def export_csv(scored_df, load_passthrough):
+    """Download data: scored_df with the upload's other columns joined back, as CSV."""
+    return attach_passthrough_columns(scored_df, load_passthrough()).to_csv(index=False)
+
+@_fragment
+def show_what_if_thresholds(scorer, histogram, scored_df, load_passthrough):
+    """
+    Sliders that re-derive the High/Medium/Low split for other thresholds.
+    
+    Works from the scored batch's points histogram, so moving a slider
+    recounts the distinct point values instead of rescoring the upload.
+    
+    Args:
+        scorer (LeadScorer): Scorer that produced scored_df
+        histogram (PointsHistogram): Points of scored_df, in its row order
+        scored_df (pd.DataFrame): Scored leads (for the re-leveled download)
+        load_passthrough (callable): Returns the upload's non-lead columns
+    """
+    with st.expander("🎚️ What-if: level thresholds", expanded=False):
+        current = scorer.rules.thresholds()
+        lowest = min([int(histogram.values.min())] + list(current.values()))
+        highest = max([int(histogram.values.max())] + list(current.values()))
+        
+        thresholds = {}
+        slider_columns = st.columns(len(current))
+        for column, (level, minimum) in zip(slider_columns, current.items()):
+            with column:
+                thresholds[level] = st.slider(
+                    f"{level} starts at (points)", min_value=lowest, max_value=max(highest, lowest + 1),
+                    value=minimum, key=f"what_if_{level}"
+                )
+        
+        counts = scorer.what_if_counts(thresholds, histogram)
+        baseline = scorer.what_if_counts(current, histogram)
+        metric_columns = st.columns(len(counts))
+        for column, (level, count) in zip(metric_columns, counts.items()):
+            column.metric(level, count, delta=count - baseline[level])
+        
+        if thresholds != current:
+            levels = scorer.what_if_levels(thresholds, histogram)
+            what_if_df = scored_df.assign(score=levels.to_numpy())
+            what_if_df = what_if_df.drop(columns=['score_reason_codes'], errors='ignore')
+            st.download_button(
+                label="📥 Download with these thresholds",
+                data=export_csv(what_if_df, load_passthrough),
+                file_name="scored_leads_what_if.csv",
+                mime="text/csv"
+            )
+
 def main():
     st.title("🎯 Lead Prioritization Tool")
     st.markdown("### Upload CSV → Score Leads → Generate Outreach")
@@ -214,6 +295,9 @@ def main():
     # Initialize scorer
     if 'scorer' not in st.session_state:
         st.session_state.scorer = LeadScorer()
+    # Emails flagged seen_before per upload (content hash) recorded in the dedup index this session
+    if 'recorded_uploads' not in st.session_state:
+        st.session_state.recorded_uploads = {}
     
     # Sidebar with instructions and tips
     st.sidebar.header("📋 Instructions")
@@ -270,6 +354,15 @@ def main():
     enhance_enrichment = st.sidebar.checkbox("Enrich data (domain, industry)", value=True)
     dedup_by_email = st.sidebar.checkbox("Deduplicate by email", value=False)
     explain_scores = st.sidebar.checkbox("Explain scores (why?)", value=True)
+    incremental_scoring = st.sidebar.checkbox("Reuse scores from previous uploads", value=False)
+    flag_seen_leads = st.sidebar.checkbox(
+        "Flag leads seen in earlier uploads", value=False,
+        help="Adds a seen_before column during enrichment and remembers this upload's emails"
+    )
+    profile_uploads = st.sidebar.checkbox(
+        "Profile this run", value=profiling_requested(),
+        help="Save per-stage timings, cProfile stats, allocation sites and a flamegraph stack file"
+    )
     
     # Main content area
     col1, col2 = st.columns([2, 1])
@@ -277,36 +370,66 @@ def main():
     with col1:
         st.subheader("📤 Upload Lead Data")
         uploaded_file = st.file_uploader(
-            "Choose a CSV file",
-            type="csv",
-            help="Upload a CSV file with lead data. Use the sample CSV format."
+            "Choose a lead file",
+            type=LEAD_FILE_TYPES,
+            help="Upload a CSV, Parquet, Feather or Arrow file with lead data. Use the sample CSV format."
         )
     
+    # Profile the whole upload run when requested (see profiling.py)
+    with profile_run("upload", enabled=profile_uploads and uploaded_file is not None) as profile:
+        show_upload(uploaded_file, col2, sample_df, enhance_enrichment, dedup_by_email, explain_scores,
+                    incremental_scoring, flag_seen_leads)
+
+    if profile is not None:
+        st.sidebar.success(f"🔬 Profile saved to {profile.directory}")
+
+def show_upload(uploaded_file, col2, sample_df, enhance_enrichment, dedup_by_email, explain_scores,
+                incremental_scoring, flag_seen_leads):
+    """
+    Load, score and display an upload (or the sample leads when there is none).
+    
+    Args:
+        uploaded_file: Streamlit upload, or None
+        col2: Quick stats column of the main layout
+        sample_df (pd.DataFrame): Sample leads shown before an upload
+        enhance_enrichment, dedup_by_email, explain_scores, incremental_scoring,
+        flag_seen_leads (bool): Sidebar options
+    """
     with col2:
         st.subheader("📊 Quick Stats")
         if uploaded_file is not None:
             # Load and process data
             try:
-                with st.spinner('📋 Loading and validating your CSV...'):
-                    df = pd.read_csv(uploaded_file)
-                    
+                with st.spinner('📋 Loading and validating your file...'):
                     # Initialize column mapper
                     mapper = ColumnMapper()
                     
-                    # Step 1: Auto-map columns
-                    mapped_df, mapping_log, column_mapping = mapper.auto_map_columns(df)
+                    # Step 1: Auto-map columns from the header alone
+                    header_df = pd.DataFrame(columns=read_lead_columns(uploaded_file))
+                    mapped_header, mapping_log, column_mapping = mapper.auto_map_columns(header_df)
                     
                     # Step 2: Check for missing columns after auto-mapping
-                    missing_columns, available_columns = mapper.validate_required_columns(mapped_df)
+                    missing_columns, available_columns = mapper.validate_required_columns(mapped_header)
                     
                     # Step 3: Show mapping results
                     if mapping_log:
                         show_column_mapping_results(mapping_log)
                     
+                    rename_mapping = {original: standard for standard, original in column_mapping.items()}
+                    if not missing_columns:
+                        # Read only the lead columns (see data_loader.load_leads)
+                        mapped_df = load_leads(uploaded_file, column_mapping=rename_mapping)
+                        # Other columns (record IDs, owner, ...) are re-joined on export
+                        load_passthrough = passthrough_loader(uploaded_file, rename_mapping)
+                    
                     # Step 4: Handle missing columns with manual mapping
                     if missing_columns:
                         st.warning(f"⚠️ **Missing columns after auto-mapping:** {', '.join(missing_columns)}")
                         
+                        # Manual mapping previews every column, so read them all
+                        df = load_leads(uploaded_file, all_columns=True)
+                        mapped_df = df.rename(columns=rename_mapping)
+                        
                         # Show manual mapping interface
                         manual_mapping = show_manual_column_mapping_interface(df, missing_columns, mapper)
                         
@@ -322,7 +445,9 @@ def main():
                                 st.error("📝 **Please map all required columns to proceed.**")
                                 st.stop()
                             else:
-                                mapped_df = manual_mapped_df
+                                mapped_df = manual_mapped_df[REQUIRED_COLUMNS]
+                                passthrough_df = manual_mapped_df.drop(columns=REQUIRED_COLUMNS)
+                                load_passthrough = lambda: passthrough_df
                                 if manual_mapping_log:
                                     show_column_mapping_results(manual_mapping_log)
                                 st.success("✅ **All columns mapped successfully!**")
@@ -348,27 +473,33 @@ def main():
                         st.info("🚀 **Don't worry - we'll handle these automatically and proceed with scoring!**")
                     
                     # Step 6: Clean the data
-                    df_clean = mapped_df.dropna(how='all')  # Remove completely empty rows
-                    df_clean['name'] = df_clean['name'].fillna('Unknown')
-                    df_clean['company'] = df_clean['company'].fillna('Unknown Company')
-                    df_clean['job_title'] = df_clean['job_title'].fillna('Unknown')
-                    
-                    # Clean company_size
-                    def clean_company_size(size):
-                        if pd.isna(size):
-                            return 0
-                        try:
-                            return int(size)
-                        except (ValueError, TypeError):
-                            return 0
-                    
-                    df_clean['company_size'] = df_clean['company_size'].apply(clean_company_size)
+                    df_to_score = clean_leads(mapped_df)
+                    # Email domain, corporate flag, normalized title and size:
+                    # derived once here, read by enrichment, scoring and outreach
+                    df_to_score = st.session_state.scorer.derive_features(df_to_score)
 
                     # Optional enrichment & deduplication (non-destructive to original)
-                    df_to_score = df_clean.copy()
                     if enhance_enrichment:
-                        df_to_score, enrich_report = enrich_leads(df_to_score)
-                        st.info(f"🔎 Enriched data: {enrich_report['rows']} rows | Duplicate emails flagged: {enrich_report['duplicate_email_count']}")
+                        industry_cache = IndustryCache()
+                        # Reruns (any widget change) re-enrich the same upload: record it
+                        # once, then reuse that run's flags
+                        upload_id = hashlib.sha1(uploaded_file.getvalue()).hexdigest()
+                        seen_emails = st.session_state.recorded_uploads.get(upload_id) if flag_seen_leads else None
+                        dedup_index = DedupIndex() if flag_seen_leads and seen_emails is None else None
+                        try:
+                            df_to_score, enrich_report = enrich_leads(
+                                df_to_score, industry_cache=industry_cache, scorer=st.session_state.scorer,
+                                dedup_index=dedup_index, seen_emails=seen_emails
+                            )
+                            if dedup_index is not None:
+                                st.session_state.recorded_uploads[upload_id] = seen_before_emails(df_to_score)
+                        finally:
+                            industry_cache.close()
+                            if dedup_index is not None:
+                                dedup_index.close()
+                        st.info(f"🔎 Enriched data: {enrich_report['rows']} rows | Duplicate emails flagged: {enrich_report['duplicate_email_count']} | Near-duplicate leads: {enrich_report['near_duplicate_count']}")
+                        if 'seen_before_count' in enrich_report:
+                            st.info(f"📇 Seen in earlier uploads: {enrich_report['seen_before_count']} leads")
                     if dedup_by_email:
                         before = len(df_to_score)
                         df_to_score = df_to_score.drop_duplicates(subset=['email'], keep='first')
@@ -376,10 +507,23 @@ def main():
                 
                 with st.spinner('🎯 Scoring your leads...'):
                     # Apply scoring
-                    if explain_scores:
+                    if incremental_scoring:
+                        store = ScoreStore()
+                        try:
+                            scored_df, score_report = st.session_state.scorer.score_leads_incremental(df_to_score, store)
+                        finally:
+                            store.close()
+                        if not explain_scores:
+                            scored_df = scored_df.drop(columns=['score_points', 'score_reason_codes'])
+                        st.info(f"♻️ Reused {score_report['cached']} cached scores | Rescored {score_report['rescored']} new or changed leads")
+                    elif explain_scores:
                         scored_df = st.session_state.scorer.score_leads_batch_with_explain(df_to_score)
                     else:
                         scored_df = st.session_state.scorer.score_leads_batch(df_to_score)
+                    # Keep the derived columns only where enrichment shows them
+                    scored_df = drop_lead_features(
+                        scored_df, keep=('email_domain', 'is_corporate_email') if enhance_enrichment else ()
+                    )
                     
                 st.success(f"✅ **Upload Complete!** Successfully processed {len(scored_df)} leads.")
                 
@@ -401,6 +545,9 @@ def main():
                 st.error(f"😵 **CSV Format Error** - Unable to parse the file: {str(e)}")
                 st.info("📝 **Tip:** Make sure your file is a valid CSV with proper formatting.")
                 st.stop()
+            except ImportError as e:
+                st.error(f"😵 **Missing Dependency** - {str(e)}")
+                st.stop()
             except UnicodeDecodeError:
                 st.error("😵 **Encoding Error** - Unable to read the file encoding.")
                 st.info("📝 **Tip:** Save your CSV as UTF-8 encoding and try again.")
@@ -415,6 +562,11 @@ def main():
         st.markdown("---")
         st.subheader("🎯 Prioritized Leads")
         
+        # Threshold what-if from the points histogram kept by the scorer
+        if st.session_state.scorer.points_histogram is not None and len(st.session_state.scorer.points_histogram):
+            show_what_if_thresholds(st.session_state.scorer, st.session_state.scorer.points_histogram, scored_df,
+                                    load_passthrough)
+        
         # Filter options
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -430,23 +582,10 @@ def main():
             display_df = scored_df.copy()
 
         # Add compact "Why" summary if explanations are available
-        if explain_scores and 'score_reasons' in display_df.columns:
-            def _short_why(text):
-                try:
-                    s = str(text)
-                except Exception:
-                    return ''
-                tags = []
-                if 'senior title' in s or 'executive title' in s:
-                    tags.append('Title')
-                if 'corporate email' in s:
-                    tags.append('Email')
-                if 'company size' in s:
-                    tags.append('Size')
-                return ' | '.join(tags)
-            display_df['Why'] = display_df['score_reasons'].apply(_short_why)
+        if explain_scores and 'score_reason_codes' in display_df.columns:
+            display_df['Why'] = st.session_state.scorer.summarize_reason_codes(display_df['score_reason_codes'])
             # Hide verbose explanation columns in the table
-            for col in ['score_reasons', 'score_points']:
+            for col in ['score_reason_codes', 'score_points']:
                 if col in display_df.columns:
                     display_df.drop(columns=[col], inplace=True)
         
@@ -475,7 +614,8 @@ def main():
             st.info("🎯 **Pro Tip:** Focus on high-priority leads first - they have the highest conversion potential!")
             
             # Get high priority leads for outreach
-            high_priority_leads = scored_df[scored_df['score'] == 'High'].head(3)
+            top_leads = st.session_state.scorer.top_k(scored_df, 3)
+            high_priority_leads = top_leads[top_leads['score'] == 'High']
             
             if len(high_priority_leads) > 0:
                 # Lead selection for outreach
@@ -509,9 +649,10 @@ def main():
                     """)
                 
                 # Generate personalized content
-                lead_data = selected_lead.to_dict()
+                lead_data = Lead.from_mapping(selected_lead)
                 content_type_map = {"Both": "both", "Templates": "templates", "Openers": "openers"}
-                personalized_content = generate_personalized_content(lead_data, content_type_map[content_type])
+                personalized_content = generate_personalized_content(lead_data, content_type_map[content_type],
+                                                                     features=selected_lead)
                 
                 # Display outreach content
                 if content_type in ["Templates", "Both"] and "templates" in personalized_content:
@@ -555,14 +696,17 @@ def main():
         
         col1, col2, col3 = st.columns(3)
         
+        # Reason codes are rendered to readable text only for export
+        export_df = scored_df
+        if 'score_reason_codes' in scored_df.columns:
+            export_df = scored_df.drop(columns=['score_reason_codes'])
+            export_df['score_reasons'] = st.session_state.scorer.render_score_reasons(scored_df)
+        
         with col1:
-            # Export scored leads CSV
-            csv_buffer = io.StringIO()
-            scored_df.to_csv(csv_buffer, index=False)
-            
+            # Export scored leads CSV, with every other column of the upload
             if st.download_button(
                 label="📈 Download Scored Leads CSV",
-                data=csv_buffer.getvalue(),
+                data=export_csv(export_df, load_passthrough),
                 file_name="scored_leads.csv",
                 mime="text/csv",
                 help="Download the complete dataset with scores",
@@ -572,13 +716,11 @@ def main():
         
         with col2:
             # Export high priority leads only
-            high_priority_df = scored_df[scored_df['score'] == 'High']
+            high_priority_df = export_df[export_df['score'] == 'High']
             if len(high_priority_df) > 0:
-                high_csv_buffer = io.StringIO()
-                high_priority_df.to_csv(high_csv_buffer, index=False)
                 if st.download_button(
                     label="⭐ Download High Priority Only",
-                    data=high_csv_buffer.getvalue(),
+                    data=export_csv(high_priority_df, load_passthrough),
                     file_name="high_priority_leads.csv",
                     mime="text/csv",
                     help="Download only high-priority leads",
@@ -0,0 +1,342 @@
+# Domain Table - offline knowledge base of personal email domains
+# config/email_domains.txt compiled to a memory-mapped sorted array of 64-bit keys
+
+import functools
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from score_store import default_cache_path
+
+DEFAULT_DOMAINS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'config', 'email_domains.txt'
+)
+
+# Bumped when the compiled layout or key hashing changes (part of the version)
+TABLE_FORMAT = 1
+
+# Domain categories, stored in the low bits of each compiled key
+NOT_LISTED = 0
+FREE = 1
+DISPOSABLE = 2
+ISP = 3
+PUBLIC_SUFFIX = 4
+CATEGORIES = {'free': FREE, 'disposable': DISPOSABLE, 'isp': ISP, 'public_suffix': PUBLIC_SUFFIX}
+PERSONAL_CATEGORIES = (FREE, DISPOSABLE, ISP)
+
+# Longest public suffix looked for, in labels (co.uk = 2)
+MAX_SUFFIX_LABELS = 3
+
+# Domains hashed per step (bounds the code point arrays)
+HASH_CHUNK = 50_000
+
+_CATEGORY_MASK = np.uint64(7)
+_UINT64 = (1 << 64) - 1
+
+
+def parse_domain_list(text):
+    """
+    Read the email_domains.txt format: domains under [category] headers.
+
+    Args:
+        text (str): File contents
+
+    Returns:
+        dict: {domain: category code}; a domain listed twice keeps its first category
+
+    Raises:
+        ValueError: On an unknown category or a domain before any header
+    """
+    entries = {}
+    category = None
+    for number, line in enumerate(text.splitlines(), start=1):
+        line = line.split('#', 1)[0].strip().lower()
+        if not line:
+            continue
+        if line.startswith('[') and line.endswith(']'):
+            if line[1:-1] not in CATEGORIES:
+                raise ValueError(f"Unknown domain category {line} on line {number}")
+            category = CATEGORIES[line[1:-1]]
+        elif category is None:
+            raise ValueError(f"Domain {line!r} on line {number} is not under a [category] header")
+        else:
+            entries.setdefault(line, category)
+    return entries
+
+
+def _mix(hashes):
+    """splitmix64 finalizer on a uint64 array."""
+    hashes = hashes * np.uint64(0x9E3779B97F4A7C15)
+    hashes ^= hashes >> np.uint64(29)
+    hashes *= np.uint64(0xBF58476D1CE4E5B9)
+    hashes ^= hashes >> np.uint64(32)
+    return hashes
+
+
+def label_suffix_keys(domains, depth=MAX_SUFFIX_LABELS + 1):
+    """
+    Key of each domain, and of its last 1..depth labels, in one pass over the text.
+
+    Domains are read as code points right to left with a running hash, and
+    the hash is recorded at each dot: "co.uk" gets the same key whether it
+    is a whole domain or the tail of "example.co.uk", without slicing any
+    strings.
+
+    Args:
+        domains: Sequence of lower-cased domains
+        depth (int): Most trailing labels to key
+
+    Returns:
+        tuple: (keys, tail keys, label counts); tail keys is
+            (len(domains), depth) uint64, column d - 1 holding the key of
+            the last d labels (0 where the domain has fewer than d labels).
+            Keys have the category bits cleared.
+    """
+    domains = np.asarray(domains, dtype=object)
+    keys = np.zeros(len(domains), dtype=np.uint64)
+    tails = np.zeros((len(domains), depth), dtype=np.uint64)
+    label_counts = np.zeros(len(domains), dtype=np.int64)
+    dot = np.uint64(ord('.'))
+
+    for start in range(0, len(domains), HASH_CHUNK):
+        chunk = domains[start:start + HASH_CHUNK]
+        width = max(max(map(len, chunk), default=0), 1)
+        # Fixed-width unicode array viewed as code points; shorter texts end in zeros
+        points = np.array(chunk.tolist(), dtype=f'U{width}').view(np.uint32).reshape(len(chunk), width)
+        running = np.zeros(len(chunk), dtype=np.uint64)
+        dots = np.zeros(len(chunk), dtype=np.int64)
+        block = tails[start:start + len(chunk)]
+
+        for column in range(width - 1, -1, -1):
+            code = points[:, column].astype(np.uint64)
+            at_dot = np.flatnonzero(code == dot)
+            # The text after this dot is the domain's last (dots + 1) labels
+            recorded = at_dot[dots[at_dot] < depth]
+            block[recorded, dots[recorded]] = running[recorded]
+            dots[at_dot] += 1
+            text = np.flatnonzero(code)
+            running[text] = _mix(running[text] ^ code[text])
+
+        whole = np.flatnonzero(dots < depth)
+        block[whole, dots[whole]] = running[whole]
+        keys[start:start + len(chunk)] = running
+        label_counts[start:start + len(chunk)] = dots + 1
+    return keys & ~_CATEGORY_MASK, tails & ~_CATEGORY_MASK, label_counts
+
+
+def _mix_one(value):
+    """_mix on a single Python int."""
+    value = (value * 0x9E3779B97F4A7C15) & _UINT64
+    value ^= value >> 29
+    value = (value * 0xBF58476D1CE4E5B9) & _UINT64
+    return value ^ (value >> 32)
+
+
+def _label_suffix_keys_one(domain, depth):
+    """label_suffix_keys for one domain, in plain Python (for per-lead checks)."""
+    running, dots = 0, 0
+    tails = [0] * depth
+    for char in reversed(domain):
+        if char == '.':
+            if dots < depth:
+                tails[dots] = running
+            dots += 1
+        running = _mix_one(running ^ ord(char))
+    if dots < depth:
+        tails[dots] = running
+    mask = _UINT64 ^ int(_CATEGORY_MASK)
+    return running & mask, [tail & mask for tail in tails], dots + 1
+
+
+def domain_keys(domains):
+    """
+    64-bit key per domain, with the category bits cleared.
+
+    Args:
+        domains: Sequence of lower-cased domains
+
+    Returns:
+        numpy.ndarray: uint64 key per domain
+    """
+    return label_suffix_keys(domains, depth=0)[0]
+
+
+def compile_domain_entries(entries):
+    """
+    Sorted key array for {domain: category} entries (key | category per domain).
+
+    Returns:
+        numpy.ndarray: uint64, ascending
+    """
+    domains = list(entries)
+    categories = np.array([entries[domain] for domain in domains], dtype=np.uint64)
+    return np.sort(domain_keys(domains) | categories)
+
+
+class DomainTable:
+    """
+    Membership of email domains in the free-mail, disposable and ISP lists.
+
+    Domains are stored as one sorted uint64 array (hash | category), so a
+    whole column is answered with one searchsorted call and the compiled
+    file is memory-mapped rather than parsed. A domain matches its own
+    entry or, failing that, its registrable domain's: mail.yahoo.co.uk
+    is looked up as yahoo.co.uk, using the [public_suffix] entries.
+    """
+
+    def __init__(self, keys, version):
+        """
+        Args:
+            keys: Sorted uint64 keys (see compile_domain_entries)
+            version (str): Content version of the source list
+        """
+        self.keys = keys
+        self.version = version
+        self._entry_categories = None
+
+    @classmethod
+    def from_file(cls, path=None, compiled_path=None):
+        """
+        Load a domain list, compiling it on first use.
+
+        The compiled array is cached as a .npy file named after the source's
+        content hash, so editing the list recompiles it and later loads are
+        a memory map.
+
+        Args:
+            path (str): Source list (default: config/email_domains.txt)
+            compiled_path (str): Compiled file (default: email_domains.<version>.npy
+                in the cache directory, see default_cache_path)
+
+        Returns:
+            DomainTable: Table backed by the compiled file, or by an in-memory
+                array when the cache directory cannot be created or written
+        """
+        with open(path or DEFAULT_DOMAINS_PATH, 'rb') as handle:
+            raw = handle.read()
+        version = hashlib.sha1(b'%d\x00' % TABLE_FORMAT + raw).hexdigest()[:12]
+        keys = None
+        try:
+            compiled_path = compiled_path or default_cache_path(f'email_domains.{version}.npy')
+            if not os.path.exists(compiled_path):
+                keys = compile_domain_entries(parse_domain_list(raw.decode('utf-8')))
+                # Written aside and renamed, so a concurrent load never sees half a file
+                partial_path = f"{compiled_path}.{os.getpid()}.tmp"
+                try:
+                    with open(partial_path, 'wb') as handle:
+                        np.save(handle, keys)
+                    os.replace(partial_path, compiled_path)
+                finally:
+                    if os.path.exists(partial_path):
+                        os.remove(partial_path)
+            return cls(np.load(compiled_path, mmap_mode='r'), version)
+        except OSError:
+            # Read-only home, or LEAD_SCORER_CACHE_DIR not a directory: scoring still works
+            if keys is None:
+                keys = compile_domain_entries(parse_domain_list(raw.decode('utf-8')))
+            return cls(keys, version)
+
+    @classmethod
+    def from_domains(cls, domains, path=None):
+        """
+        In-memory table of the given personal domains (e.g. a rule set override).
+
+        Public suffixes still come from the source list, so subdomains
+        match the way they do in the bundled table.
+
+        Args:
+            domains: Personal email domains
+            path (str): List to take [public_suffix] entries from (default:
+                config/email_domains.txt)
+
+        Returns:
+            DomainTable: Table with the domains as FREE
+        """
+        with open(path or DEFAULT_DOMAINS_PATH, encoding='utf-8') as handle:
+            entries = {domain: category for domain, category in parse_domain_list(handle.read()).items()
+                       if category == PUBLIC_SUFFIX}
+        personal = sorted({str(domain).strip().lower() for domain in domains})
+        entries.update({domain: FREE for domain in personal})
+        version = hashlib.sha1(','.join(personal).encode('utf-8')).hexdigest()[:12]
+        return cls(compile_domain_entries(entries), version)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _lookup(self, keys):
+        """Category of each key's entry (NOT_LISTED if absent)."""
+        if not len(self.keys):
+            return np.zeros(len(keys), dtype=np.uint8)
+        # An entry (key | category) sorts at or after its bare key, before any larger key
+        positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        stored = np.asarray(self.keys[positions])
+        found = (stored & ~_CATEGORY_MASK) == keys
+        return np.where(found, stored & _CATEGORY_MASK, NOT_LISTED).astype(np.uint8)
+
+    def categories(self, domains):
+        """
+        Category of each domain: its own entry's, else its registrable domain's.
+
+        The registrable domain is the longest [public_suffix] entry (or
+        else the last label) plus one label: a.b.example.co.uk is looked
+        up as example.co.uk, mail.example.com as example.com. Each distinct
+        domain is hashed once.
+
+        Args:
+            domains: Sequence (or Series) of lower-cased domains
+
+        Returns:
+            numpy.ndarray: uint8 category per domain (FREE, DISPOSABLE, ISP or
+                NOT_LISTED; public suffixes themselves count as NOT_LISTED)
+        """
+        codes, distinct = pd.factorize(np.asarray(domains, dtype=object))
+        keys, tails, label_counts = label_suffix_keys(distinct)
+
+        suffix_labels = np.ones(len(keys), dtype=np.int64)
+        for depth in range(2, MAX_SUFFIX_LABELS + 1):
+            is_suffix = (self._lookup(tails[:, depth - 1]) == PUBLIC_SUFFIX) & (label_counts >= depth)
+            suffix_labels[is_suffix] = depth
+        # Column suffix_labels holds the key of the last (suffix_labels + 1) labels
+        registrable = tails[np.arange(len(keys)), suffix_labels]
+
+        own = self._lookup(keys)
+        parent = np.where(label_counts > suffix_labels, self._lookup(registrable), NOT_LISTED)
+        category = np.where(np.isin(own, PERSONAL_CATEGORIES), own,
+                            np.where(np.isin(parent, PERSONAL_CATEGORIES), parent, NOT_LISTED))
+        return category.astype(np.uint8)[codes]
+
+    def is_personal(self, domains):
+        """
+        True where the domain is a free, disposable or ISP mailbox domain.
+
+        Args:
+            domains: Sequence (or Series) of lower-cased domains
+
+        Returns:
+            numpy.ndarray: bool per domain
+        """
+        return self.categories(domains) != NOT_LISTED
+
+    def __contains__(self, domain):
+        """Whether one domain is personal (is_personal without array overhead)."""
+        if self._entry_categories is None:
+            keys = np.asarray(self.keys)
+            self._entry_categories = dict(zip((keys & ~_CATEGORY_MASK).tolist(), (keys & _CATEGORY_MASK).tolist()))
+        categories = self._entry_categories
+
+        key, tails, label_count = _label_suffix_keys_one(str(domain), MAX_SUFFIX_LABELS + 1)
+        if categories.get(key, NOT_LISTED) in PERSONAL_CATEGORIES:
+            return True
+        suffix_labels = 1
+        for depth in range(2, min(MAX_SUFFIX_LABELS, label_count) + 1):
+            if categories.get(tails[depth - 1]) == PUBLIC_SUFFIX:
+                suffix_labels = depth
+        return label_count > suffix_labels and categories.get(tails[suffix_labels], NOT_LISTED) in PERSONAL_CATEGORIES
+
+
+@functools.lru_cache(maxsize=None)
+def default_domain_table():
+    """The bundled table (config/email_domains.txt), loaded once per process."""
+    return DomainTable.from_file()
@@ -0,0 +1,98 @@
+# Lead Features - derived columns shared by scoring, enrichment and outreach
+# Email domain, corporate flag, normalized title and size, computed once per batch
+
+import pandas as pd
+
+# Columns attached by derive_lead_features (LeadScorer.derive_features)
+FEATURE_COLUMNS = ('email_domain', 'is_corporate_email', 'normalized_title', 'normalized_size')
+
+
+def _as_text(values):
+    """Return values as a string Series, with missing entries as ''."""
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    series = series.astype(object)
+    return series.where(series.notna(), '').astype(str)
+
+
+def email_domain(email):
+    """
+    Normalized email domain of one address.
+
+    Args:
+        email (str): Email address
+
+    Returns:
+        str: Lower-cased domain without 'www.', or '' if the email is invalid
+    """
+    if not email or str(email).lower().strip() in ['nan', 'none', '']:
+        return ''
+
+    email_str = str(email).lower().strip()
+
+    if '@' not in email_str:
+        return ''
+
+    try:
+        domain = email_str.split('@')[1]
+        # Remove common variations
+        domain = domain.replace('www.', '')
+        return domain
+    except (IndexError, AttributeError):
+        return ''
+
+
+def email_domains(emails):
+    """
+    Columnar email_domain over a whole Series.
+
+    Args:
+        emails: pandas Series (or sequence) of email addresses
+
+    Returns:
+        pandas Series: Normalized domains ('' where the email is invalid)
+    """
+    emails = _as_text(emails).str.lower().str.strip()
+    domains = emails.str.extract(r'^[^@]*@([^@]*)', expand=False).fillna('')
+    return domains.str.replace('www.', '', regex=False)
+
+
+def has_lead_features(df):
+    """True if df already carries every derived feature column."""
+    return all(column in df.columns for column in FEATURE_COLUMNS)
+
+
+def derive_lead_features(leads_df, scorer=None):
+    """
+    Attach the derived feature columns to a copy of leads_df.
+
+    Scoring, enrichment and outreach read these columns when present
+    instead of re-parsing emails, titles and sizes, so deriving them once
+    at the start of a pipeline saves a string pass per stage.
+
+    Args:
+        leads_df (pd.DataFrame): Lead data with standard column names
+        scorer (LeadScorer): Scorer whose title/size mappings and personal
+            domain table to use (default: a LeadScorer with the default rules)
+
+    Returns:
+        pd.DataFrame: Copy of leads_df with FEATURE_COLUMNS added
+    """
+    if scorer is None:
+        from lead_scoring_engine import LeadScorer
+        scorer = LeadScorer()
+    return scorer.derive_features(leads_df)
+
+
+def drop_lead_features(df, keep=()):
+    """
+    Remove derived feature columns (e.g. before display or export).
+
+    Args:
+        df (pd.DataFrame): Data that may carry feature columns
+        keep: Feature columns to leave in place
+
+    Returns:
+        pd.DataFrame: df without the other feature columns
+    """
+    return df.drop(columns=[column for column in FEATURE_COLUMNS
+                            if column in df.columns and column not in keep])
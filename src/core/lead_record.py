@@ -0,0 +1,80 @@
+# Lead Record - compact per-lead type for the single-lead APIs
+# A NamedTuple: no per-instance __dict__, built straight from DataFrame tuples
+
+from typing import Any, NamedTuple
+
+LEAD_FIELDS = ('name', 'email', 'company', 'job_title', 'company_size')
+
+# Rows converted to Python values at a time by Lead.iter_frame
+ITER_CHUNK_ROWS = 10_000
+
+
+class Lead(NamedTuple):
+    """
+    One lead's core fields.
+
+    Accepted anywhere a lead dict is (score_lead, score_lead_with_explain,
+    generate_personalized_content): get() behaves like dict.get, treating
+    fields that were never set (None) as missing.
+    """
+
+    name: Any = None
+    email: Any = None
+    company: Any = None
+    job_title: Any = None
+    company_size: Any = None
+
+    def get(self, key, default=None):
+        """dict.get-style access by field name."""
+        value = getattr(self, key, None) if key in self._fields else None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        # Field names as well as positions, like a dict or a pandas row
+        if isinstance(key, str):
+            if key not in self._fields:
+                raise KeyError(key)
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+    def to_dict(self):
+        """The fields that are set, as a plain dict."""
+        return {field: value for field, value in zip(self._fields, self) if value is not None}
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        """
+        Build a Lead from a dict, pandas Series or any mapping with .get().
+
+        Args:
+            mapping: Lead data keyed by field name (extra keys are ignored)
+
+        Returns:
+            Lead
+        """
+        return cls._make(mapping.get(field) for field in LEAD_FIELDS)
+
+    @classmethod
+    def iter_frame(cls, leads_df):
+        """
+        Iterate a DataFrame's rows as Lead records.
+
+        Only the lead columns are read, a block of rows at a time, and
+        zipped straight into records, so no per-row Series or dict is
+        created. Missing columns come through as None.
+
+        Args:
+            leads_df: pandas DataFrame with lead data
+
+        Yields:
+            Lead per row, in row order
+        """
+        columns = [field for field in LEAD_FIELDS if field in leads_df.columns]
+        positions = [columns.index(field) if field in columns else None for field in LEAD_FIELDS]
+        for start in range(0, len(leads_df), ITER_CHUNK_ROWS):
+            block = leads_df[columns].iloc[start:start + ITER_CHUNK_ROWS]
+            values = [block[column].tolist() for column in columns]
+            missing = [None] * len(block)
+            yield from map(cls._make, zip(*[
+                values[position] if position is not None else missing for position in positions
+            ]))
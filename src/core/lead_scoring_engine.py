@@ -1,13 +1,45 @@
 # Scoring Engine - Rule-based Lead Prioritization
 # Modular design for future ML upgrade
 
+import functools
+import re
+
+import numpy as np
+import pandas as pd
+
+from lead_features import _as_text, email_domain, email_domains, has_lead_features
+from lead_record import Lead
+from points_histogram import PointsHistogram
+from profiling import profiled, profile_stage
+from size_parser import COMPANY_SIZE_WORDS, parse_company_size, parse_company_sizes
+from scoring_rules import (
+    RuleSetFile,
+    REASON_SENIOR_TITLE,
+    REASON_EXECUTIVE_TITLE,
+    REASON_CORPORATE_EMAIL,
+    REASON_SIZE_TIERS
+)
+
+
 class LeadScorer:
     """
     Rule-based lead scoring engine.
     Future upgrade path: replace rule-based logic with ML model.
     """
     
-    def __init__(self):
+    def __init__(self, cache_size=4096, rules_path=None, reload_interval=1.0, model_path=None):
+        """
+        Args:
+            cache_size (int): Max distinct values remembered per normalizer
+                (least recently used are evicted first). 0 disables caching,
+                None makes the caches unbounded.
+            rules_path (str): Scoring rule set file (JSON/TOML/YAML); defaults
+                to config/scoring_rules.json
+            reload_interval (float): Seconds between checks of the rule set
+                file for changes (edits are picked up without a restart)
+            model_path (str): Weights file for mode="ml"; defaults to
+                config/lead_model.npz (loaded on first use)
+        """
         self.scoring_mode = "rule"
         # Normalize common job title variations
         self.job_title_mappings = {
@@ -36,6 +68,112 @@ class LeadScorer:
             'eng': 'engineer',
             'admin': 'administrator'
         }
+        # Text representations of company size (see size_parser)
+        self.company_size_mappings = dict(COMPANY_SIZE_WORDS)
+        self._rule_set_file = RuleSetFile(rules_path, reload_interval)
+        self.model_path = model_path
+        self._ml_model = None
+        # Points of the last rule-scored batch, for threshold what-ifs
+        self.points_histogram = None
+        
+        # Compiled patterns for the columnar (whole-Series) path. Abbreviation
+        # keys containing '.' can never match because '.' is replaced first.
+        abbreviations = sorted(self.job_title_mappings, key=len, reverse=True)
+        self._title_abbreviation_pattern = re.compile(
+            r'(?<!\S)[!?;:]*(' + '|'.join(re.escape(a) for a in abbreviations) + r')[!?;:]*(?!\S)'
+        )
+
+        self.cache_size = cache_size
+        self._build_normalizer_caches()
+    
+    def _build_normalizer_caches(self):
+        """Wrap each normalizer in its own bounded LRU cache."""
+        lru = functools.lru_cache(maxsize=self.cache_size, typed=True)
+        self._normalizer_caches = {
+            'job_title': lru(self._normalize_job_title_uncached),
+            'email_domain': lru(self._normalize_email_domain_uncached),
+            'company_size': lru(self._normalize_company_size_uncached)
+        }
+    
+    def _normalize_cached(self, normalizer, value):
+        """Look a value up in a normalizer cache, computing it on a miss."""
+        cached = self._normalizer_caches[normalizer]
+        try:
+            return cached(value)
+        except TypeError:
+            # Unhashable input (e.g. a list) - skip the cache
+            return cached.__wrapped__(value)
+    
+    def cache_stats(self):
+        """
+        Report normalizer cache usage.
+        
+        Returns:
+            dict: {normalizer: {'hits', 'misses', 'size', 'maxsize'}}
+        """
+        stats = {}
+        for normalizer, cached in self._normalizer_caches.items():
+            info = cached.cache_info()
+            stats[normalizer] = {
+                'hits': info.hits,
+                'misses': info.misses,
+                'size': info.currsize,
+                'maxsize': info.maxsize
+            }
+        return stats
+    
+    @property
+    def rules(self):
+        """The active ScoringRules, reloaded if the rule set file changed."""
+        return self._rule_set_file.get()
+    
+    @property
+    def title_matcher(self):
+        return self.rules.title_matcher
+    
+    @property
+    def senior_titles(self):
+        return self.rules.senior_keywords
+    
+    @property
+    def executive_titles(self):
+        return self.rules.executive_keywords
+    
+    @property
+    def personal_domains(self):
+        return self.rules.personal_domains
+    
+    @property
+    def ml_model(self):
+        """The LeadModel used by mode="ml", loaded once on first use."""
+        if self._ml_model is None:
+            from ml_model import LeadModel
+            self._ml_model = LeadModel.load(self.model_path)
+        return self._ml_model
+    
+    def worker_config(self):
+        """Constructor arguments that rebuild this scorer in another process."""
+        return {
+            'cache_size': self.cache_size,
+            'rules_path': self._rule_set_file.path,
+            'reload_interval': self._rule_set_file.reload_interval,
+            'model_path': self.model_path
+        }
+    
+    def clear_caches(self):
+        """Empty the normalizer caches and reset their hit/miss counters."""
+        for cached in self._normalizer_caches.values():
+            cached.cache_clear()
+    
+    def set_cache_size(self, cache_size):
+        """
+        Resize the normalizer caches (existing entries are dropped).
+        
+        Args:
+            cache_size (int): See __init__
+        """
+        self.cache_size = cache_size
+        self._build_normalizer_caches()
     
     def normalize_job_title(self, job_title):
         """
@@ -47,6 +185,10 @@ class LeadScorer:
         Returns:
             str: Normalized job title
         """
+        return self._normalize_cached('job_title', job_title)
+    
+    def _normalize_job_title_uncached(self, job_title):
+        """normalize_job_title without the cache."""
         if not job_title or str(job_title).lower().strip() in ['nan', 'none', '']:
             return 'unknown'
             
@@ -79,21 +221,11 @@ class LeadScorer:
         Returns:
             str: Normalized domain or empty string if invalid
         """
-        if not email or str(email).lower().strip() in ['nan', 'none', '']:
-            return ''
-            
-        email_str = str(email).lower().strip()
-        
-        if '@' not in email_str:
-            return ''
-            
-        try:
-            domain = email_str.split('@')[1]
-            # Remove common variations
-            domain = domain.replace('www.', '')
-            return domain
-        except (IndexError, AttributeError):
-            return ''
+        return self._normalize_cached('email_domain', email)
+    
+    def _normalize_email_domain_uncached(self, email):
+        """normalize_email_domain without the cache."""
+        return email_domain(email)
     
     def normalize_company_size(self, company_size):
         """
@@ -105,59 +237,95 @@ class LeadScorer:
         Returns:
             int: Normalized company size (0 if invalid)
         """
-        if company_size is None or str(company_size).lower().strip() in ['nan', 'none', '', 'unknown']:
-            return 0
+        return self._normalize_cached('company_size', company_size)
+    
+    def _normalize_company_size_uncached(self, company_size):
+        """normalize_company_size without the cache."""
+        return parse_company_size(company_size, self.company_size_mappings)
+    
+    def normalize_job_titles(self, job_titles):
+        """
+        Columnar version of normalize_job_title over a whole Series.
+        
+        Args:
+            job_titles: pandas Series (or sequence) of raw job titles
             
-        # Handle string representations
-        size_str = str(company_size).lower().strip()
-        
-        # Handle common text representations
-        size_mappings = {
-            'startup': 5,
-            'small': 10,
-            'medium': 50,
-            'large': 200,
-            'enterprise': 1000,
-            'freelance': 1,
-            'freelancer': 1,
-            'individual': 1,
-            'solo': 1,
-            'self-employed': 1
-        }
+        Returns:
+            pandas Series: Normalized job titles, same index as the input
+        """
+        titles = _as_text(job_titles).str.lower().str.strip()
+        missing = titles.isin(['nan', 'none', ''])
+        
+        titles = titles.str.replace(r'[,./]', ' ', regex=True)
+        titles = titles.str.replace(r'\s+', ' ', regex=True).str.strip()
+        titles = titles.str.replace(
+            self._title_abbreviation_pattern,
+            lambda match: self.job_title_mappings[match.group(1)],
+            regex=True
+        )
         
-        if size_str in size_mappings:
-            return size_mappings[size_str]
+        return titles.mask(missing, 'unknown')
+    
+    def normalize_email_domains(self, emails):
+        """
+        Columnar version of normalize_email_domain over a whole Series.
+        
+        Args:
+            emails: pandas Series (or sequence) of email addresses
             
-        # Handle ranges like "50-100", "10+", "100-500"
-        if '-' in size_str:
-            try:
-                # Take the lower bound of ranges
-                parts = size_str.split('-')
-                return int(parts[0].strip())
-            except (ValueError, IndexError):
-                return 0
-                
-        if '+' in size_str:
-            try:
-                return int(size_str.replace('+', '').strip())
-            except ValueError:
-                return 0
-        
-        # Handle numeric values
-        try:
-            # Remove common suffixes and convert
-            size_clean = size_str.replace(',', '').replace('employees', '').replace('people', '').strip()
-            return max(0, int(float(size_clean)))  # Convert via float to handle "50.0"
-        except (ValueError, TypeError):
-            return 0
+        Returns:
+            pandas Series: Normalized domains ('' where the email is invalid)
+        """
+        return email_domains(emails)
+    
+    def normalize_company_sizes(self, company_sizes):
+        """
+        Columnar version of normalize_company_size over a whole Series.
+        
+        Numeric columns are converted in bulk; text is parsed once per
+        distinct value with a single regex pass (see size_parser).
+        
+        Args:
+            company_sizes: pandas Series (or sequence) of raw company sizes
+            
+        Returns:
+            numpy.ndarray: Normalized company sizes (int64, 0 if invalid)
+        """
+        return parse_company_sizes(company_sizes, self.company_size_mappings)
+    
+    @profiled('scoring.derive_features')
+    def derive_features(self, leads_df):
+        """
+        Attach the shared derived columns (see lead_features) to a copy of leads_df.
+        
+        Each column is normalized once per distinct raw value. Every scoring
+        path (both columnar engines, explanations, ML mode), enrichment and
+        outreach then read these columns instead of normalizing again.
+        is_corporate_email uses the active rule set's personal domains.
+        
+        Args:
+            leads_df: pandas DataFrame with lead data
+            
+        Returns:
+            pandas DataFrame: Copy with email_domain, is_corporate_email,
+                normalized_title and normalized_size columns
+        """
+        titles, domains, sizes = self._normalized_inputs(leads_df)
+        features = leads_df.copy()
+        features['email_domain'] = domains
+        features['is_corporate_email'] = (domains != '') & ~self.personal_domains.is_personal(domains)
+        features['normalized_title'] = titles
+        features['normalized_size'] = sizes
+        return features
     
-    def score_lead(self, lead: dict, mode="rule"):
+    def score_lead(self, lead, mode="rule"):
         """
         Score a single lead based on specified mode.
         
         Args:
-            lead (dict): Lead data containing name, email, company, job_title, company_size
-            mode (str): Scoring mode - "rule" for rule-based, "ml" for future ML model
+            lead (Lead or dict): Lead data containing name, email, company, job_title, company_size
+            mode (str): Scoring mode - "rule" for rule-based, "ml" for the
+                trained LeadModel (see ml_model.py)
             
         Returns:
             str: Score level - "High", "Medium", or "Low"
@@ -165,201 +333,719 @@ class LeadScorer:
         if mode == "rule":
             return self._rule_based_score(lead)
         elif mode == "ml":
-            # Placeholder for future ML model integration
-            return "Medium"
+            return self._ml_score(lead)
         else:
             return "Medium"
 
-    def score_lead_with_explain(self, lead: dict):
+    def score_lead_with_explain(self, lead):
         """
-        Score a single lead and return explanation details.
+        Score a single lead (Lead or dict) and return explanation details.
         Returns: (level, points, reasons_list)
         """
-        points = 0
-        reasons = []
-
-        normalized_title = self.normalize_job_title(lead.get('job_title', ''))
+        rules = self.rules
         email_domain = self.normalize_email_domain(lead.get('email', ''))
-        normalized_size = self.normalize_company_size(lead.get('company_size', 0))
-
-        senior_titles = [
-            'manager', 'head', 'director', 'vice president', 'vp',
-            'lead', 'principal', 'senior', 'supervisor', 'coordinator'
-        ]
-        executive_titles = [
-            'chief executive officer', 'ceo', 'chief technology officer', 'cto',
-            'chief financial officer', 'cfo', 'chief marketing officer', 'cmo',
-            'chief operating officer', 'coo', 'president', 'founder',
-            'executive vice president', 'evp', 'senior vice president', 'svp'
-        ]
-
-        if any(t in normalized_title for t in senior_titles):
-            points += 2
-            reasons.append("+2 senior title")
-        if any(t in normalized_title for t in executive_titles):
-            points += 1
-            reasons.append("+1 executive title")
-
-        if email_domain:
-            personal_domains = [
-                'gmail.com','yahoo.com','hotmail.com','outlook.com','aol.com',
-                'icloud.com','live.com','msn.com','mail.com','protonmail.com',
-                'yandex.com','qq.com','sina.com','zoho.com'
-            ]
-            if email_domain not in personal_domains:
-                points += 1
-                reasons.append(f"+1 corporate email ({email_domain})")
-
-        if normalized_size > 100:
-            points += 2
-            reasons.append("+2 company size > 100")
-        elif normalized_size > 25:
-            points += 1
-            reasons.append("+1 company size > 25")
-        elif normalized_size > 5:
-            reasons.append("±0 company size > 5")
-        else:
-            reasons.append("±0 very small company")
-
-        if points >= 5:
-            level = "High"
-        elif points >= 3:
-            level = "Medium"
-        elif points >= 1:
-            level = "Medium"
-        else:
-            level = "Low"
-
+        points, reason_code = self._score_lead_features(lead, rules, email_domain)
+        
+        level = rules.level_for(points)
+        reasons = rules.render_reasons(reason_code, email_domain)
         return level, points, reasons
 
-    def score_leads_batch_with_explain(self, leads_df):
+    @profiled('scoring.score_leads_batch_with_explain')
+    def score_leads_batch_with_explain(self, leads_df, engine="vectorized", tiebreak=None):
         """
         Batch scoring with explanations.
-        Returns DataFrame with 'score', 'score_points', 'score_reasons' columns.
-        """
-        import pandas as pd
-        scored_df = leads_df.copy()
-        levels = []
-        points_list = []
-        reasons_list = []
-        for _, row in scored_df.iterrows():
-            level, pts, reasons = self.score_lead_with_explain(row.to_dict())
-            levels.append(level)
-            points_list.append(pts)
-            reasons_list.append('; '.join(reasons))
-        scored_df['score'] = levels
-        scored_df['score_points'] = points_list
-        scored_df['score_reasons'] = reasons_list
-        priority_order = {'High': 3, 'Medium': 2, 'Low': 1}
-        scored_df['_sort_priority'] = scored_df['score'].map(priority_order)
-        scored_df = scored_df.sort_values('_sort_priority', ascending=False)
-        scored_df = scored_df.drop('_sort_priority', axis=1)
-        return scored_df
+        
+        Explanations are stored as compact REASON_* bit flags; use
+        render_score_reasons() or summarize_reason_codes() to turn them
+        into text for the rows being displayed or exported.
+        
+        Args:
+            leads_df: pandas DataFrame with lead data
+            engine (str): "vectorized" (default) or "factorize", see score_leads_batch
+            tiebreak (str): Optional tiebreak column, see priority_order
+            
+        Returns DataFrame with 'score', 'score_points', 'score_reason_codes' columns,
+        ordered by level, then points.
+        """
+        factorize = self._columnar_engine(engine)
+        # One rule set for the whole batch, even if the file is reloaded meanwhile
+        rules = self.rules
+        
+        points, reason_codes = self._score_features(leads_df, factorize=factorize, rules=rules)
+        columns = {
+            'score': self._points_to_levels(points, rules),
+            'score_points': points,
+            'score_reason_codes': reason_codes
+        }
+        # Levels rise with points, so points alone give the level-then-points order
+        key = self._priority_key(None, points, ('points',), rules)
+        return self._ordered(leads_df, columns, key, tiebreak, points=points)
     
-    def _rule_based_score(self, lead: dict):
+    @profiled('scoring.score_leads_incremental')
+    def score_leads_incremental(self, leads_df, store=None, engine="vectorized", tiebreak=None):
+        """
+        score_leads_batch_with_explain that only rescores new or changed leads.
+        
+        Each lead's scoring fields are fingerprinted; leads whose fingerprint
+        is already in the store under the active rule set version reuse the
+        stored result, the rest are scored and added to the store.
+        
+        Args:
+            leads_df: pandas DataFrame with lead data
+            store: ScoreStore (default: the store in the local cache directory)
+            engine (str): Engine for the leads that need scoring
+            tiebreak (str): Optional tiebreak column, see priority_order
+            
+        Returns:
+            tuple: (scored DataFrame as from score_leads_batch_with_explain,
+                report dict with 'rows', 'cached', 'rescored' counts)
+        """
+        from score_store import ScoreStore, lead_fingerprints
+        
+        factorize = self._columnar_engine(engine)
+        store = store or ScoreStore()
+        # Results are stored under this rule set's version, so score with it alone
+        rules = self.rules
+        version = rules.version
+        
+        fingerprints = lead_fingerprints(leads_df)
+        found, points, reason_codes = store.lookup(version, fingerprints)
+        missing = ~found
+        if missing.any():
+            new_points, new_codes = self._score_features(leads_df[missing], factorize=factorize, rules=rules)
+            points[missing] = new_points
+            reason_codes[missing] = new_codes
+            store.save(version, fingerprints[missing], new_points, new_codes)
+        
+        columns = {
+            'score': self._points_to_levels(points, rules),
+            'score_points': points,
+            'score_reason_codes': reason_codes
+        }
+        key = self._priority_key(None, points, ('points',), rules)
+        report = {'rows': len(leads_df), 'cached': int(found.sum()), 'rescored': int(missing.sum())}
+        return self._ordered(leads_df, columns, key, tiebreak, points=points), report
+    
+    def render_score_reasons(self, scored_df):
+        """
+        Render reason codes as the readable text of score_lead_with_explain.
+        
+        Args:
+            scored_df: DataFrame from score_leads_batch_with_explain (only
+                'score_reason_codes' and 'email_domain', or else 'email', are read)
+            
+        Returns:
+            pandas Series: '; '-joined reasons per lead, same index as scored_df
+        """
+        rules = self.rules
+        codes = scored_df['score_reason_codes'].to_numpy(dtype=np.uint8)
+        
+        # Each distinct code is rendered once, split around the email domain
+        distinct = np.unique(codes)
+        prefixes = np.empty(len(distinct), dtype=object)
+        suffixes = np.empty(len(distinct), dtype=object)
+        for i, code in enumerate(distinct):
+            prefixes[i], suffixes[i] = rules.reason_template(int(code))
+        positions = np.searchsorted(distinct, codes)
+        
+        rendered = pd.Series(prefixes[positions], index=scored_df.index, dtype=object)
+        corporate = (codes & REASON_CORPORATE_EMAIL) > 0
+        if corporate.any():
+            if 'email_domain' in scored_df.columns:
+                domains = scored_df['email_domain'][corporate].astype(object)
+            else:
+                domains = self.normalize_email_domains(self._lead_column(scored_df, 'email')[corporate])
+            rendered[corporate] = rendered[corporate] + domains + suffixes[positions[corporate]]
+        return rendered
+    
+    @staticmethod
+    def summarize_reason_codes(reason_codes):
+        """
+        Short "Title | Email | Size" summary of which signals fired.
+        
+        Args:
+            reason_codes: Series or array of REASON_* bit flags
+            
+        Returns:
+            pandas Series (or numpy array for array input) of summaries
+        """
+        summaries = np.empty(64, dtype=object)
+        for code in range(64):
+            tags = []
+            if code & (REASON_SENIOR_TITLE | REASON_EXECUTIVE_TITLE):
+                tags.append('Title')
+            if code & REASON_CORPORATE_EMAIL:
+                tags.append('Email')
+            if code & REASON_SIZE_TIERS:
+                tags.append('Size')
+            summaries[code] = ' | '.join(tags)
+        
+        if isinstance(reason_codes, pd.Series):
+            return pd.Series(summaries[reason_codes.to_numpy(dtype=np.uint8)], index=reason_codes.index)
+        return summaries[np.asarray(reason_codes, dtype=np.uint8)]
+    
+    def _rule_based_score(self, lead):
         """
         Enhanced rule-based scoring logic with normalization.
         
-        Rules:
+        Rules (weights and thresholds come from the active rule set):
         1. If job title contains senior roles (Manager, Director, VP, etc.) → +2 points
         2. If email domain is corporate (not personal) → +1 point
-        3. If company size > 50 → +2 points, > 10 → +1 point
+        3. If company size > 100 → +2 points, > 25 → +1 point
         4. Bonus points for C-level titles → +1 point
         
         Returns:
             str: Score level - "High", "Medium", or "Low"
         """
-        score = 0
+        rules = self.rules
+        email_domain = self.normalize_email_domain(lead.get('email', ''))
+        points, _ = self._score_lead_features(lead, rules, email_domain)
+        return rules.level_for(points)
+    
+    def _ml_score(self, lead):
+        """Score one lead with the ML model."""
+        return str(self.ml_model.predict(
+            [self.normalize_job_title(lead.get('job_title', ''))],
+            [self.normalize_email_domain(lead.get('email', ''))],
+            [self.normalize_company_size(lead.get('company_size', 0))]
+        )[0])
+    
+    def _ml_inputs(self, leads_df):
+        """Normalized (titles, domains, sizes) model inputs for a DataFrame."""
+        if has_lead_features(leads_df):
+            return (leads_df['normalized_title'].to_numpy(dtype=object),
+                    leads_df['email_domain'].to_numpy(dtype=object),
+                    leads_df['normalized_size'].to_numpy(dtype=np.int64))
+        return self._normalized_inputs(leads_df)
+    
+    def _normalized_inputs(self, leads_df):
+        """
+        Normalized (titles, domains, sizes) arrays for a DataFrame.
         
-        # Rule 1: Job Title Check (with normalization)
+        Each column is normalized once per distinct raw value and broadcast
+        back through its factorize codes.
+        """
+        normalizers = {
+            'job_title': self.normalize_job_titles,
+            'email': self.normalize_email_domains,
+            'company_size': self.normalize_company_sizes
+        }
+        inputs = []
+        for column, normalize in normalizers.items():
+            codes, uniques = self._factorize(self._lead_column(leads_df, column))
+            inputs.append(np.asarray(normalize(uniques))[codes])
+        return tuple(inputs)
+    
+    @profiled('scoring.ml_features', standalone=False)
+    def _score_features_ml(self, leads_df):
+        """ML level per lead (object array) for a whole DataFrame."""
+        return self.ml_model.predict(*self._ml_inputs(leads_df))
+    
+    def _score_lead_features(self, lead, rules, email_domain):
+        """
+        Evaluate the rule set for a single lead.
+        
+        Returns:
+            tuple: (points, reason_code)
+        """
+        # Rule 1: Job title (senior / executive keywords, with normalization)
         normalized_title = self.normalize_job_title(lead.get('job_title', ''))
+        title_flags = rules.title_matcher.match(normalized_title)
+        
+        # Rule 2: Corporate (non-personal) email domain
+        corporate = bool(email_domain) and email_domain not in rules.personal_domains
+        
+        # Rule 3: Company size tier
+        normalized_size = self.normalize_company_size(lead.get('company_size', 0))
+        size_tier = rules.size_tier(normalized_size)
+        
+        return rules.evaluate_one(title_flags, corporate, size_tier)
+    
+    def _lead_column(self, leads_df, column):
+        """Return a lead column, or an all-empty Series if it is absent."""
+        if column in leads_df.columns:
+            return leads_df[column]
+        return pd.Series('', index=leads_df.index, dtype=object)
+    
+    def _title_flags(self, job_titles, rules):
+        """Senior/executive bit flags (TitleMatcher) for raw job titles."""
+        return rules.title_matcher.match_series(self.normalize_job_titles(job_titles))
+    
+    def _corporate_email_flags(self, emails, rules):
+        """True where the email has a non-personal domain."""
+        domains = self.normalize_email_domains(emails)
+        return (domains != '').to_numpy(dtype=bool) & ~rules.personal_domains.is_personal(domains)
+    
+    def _company_size_tiers(self, company_sizes, rules):
+        """Company size tier per lead (0 = below every rule set threshold)."""
+        return rules.size_tiers(self.normalize_company_sizes(company_sizes))
+    
+    @staticmethod
+    def _factorize(values):
+        """
+        Encode a column as (codes, uniques) for score-once-per-value mode.
+        
+        Non-numeric columns are factorized on their string form, which is
+        all the normalizers look at (this keeps True and 1 apart).
+        """
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        else:
+            codes, uniques = pd.factorize(_as_text(values))
+        return codes, pd.Series(uniques)
+    
+    @profiled('scoring.features', standalone=False)
+    def _score_features(self, leads_df, factorize=False, rules=None):
+        """
+        Columnar rule-based scoring over a whole DataFrame.
+        
+        Evaluates the same compiled rule set as _rule_based_score, one column
+        at a time. Columns attached by derive_features are used as-is.
+        With factorize=True each column is reduced to its distinct values,
+        those are scored, and the results are broadcast back through the
+        integer codes, so cost follows cardinality rather than row count.
+        
+        Args:
+            leads_df: pandas DataFrame with lead data
+            factorize (bool): Score each distinct column value once
+            rules (ScoringRules): Rule set to evaluate (default: the active one)
+        
+        Returns:
+            tuple: (points, reason_codes) arrays in row order
+                - points: int64 score points per lead
+                - reason_codes: uint8 REASON_* bit flags per lead
+        """
+        rules = rules or self.rules
+        if has_lead_features(leads_df):
+            # Derived once upstream (derive_features): no string passes here
+            return rules.evaluate(
+                rules.title_matcher.match_series(leads_df['normalized_title']),
+                leads_df['is_corporate_email'].to_numpy(dtype=bool),
+                rules.size_tiers(leads_df['normalized_size'].to_numpy(dtype=np.int64))
+            )
+        features = {
+            'job_title': self._title_flags,
+            'email': self._corporate_email_flags,
+            'company_size': self._company_size_tiers
+        }
+        values = {}
+        for column, feature in features.items():
+            lead_values = self._lead_column(leads_df, column)
+            if factorize:
+                codes, uniques = self._factorize(lead_values)
+                values[column] = feature(uniques, rules)[codes]
+            else:
+                values[column] = feature(lead_values, rules)
+        
+        return rules.evaluate(values['job_title'], values['email'], values['company_size'])
+    
+    def _score_points(self, leads_df, factorize=False, rules=None):
+        """Columnar score points per lead (see _score_features)."""
+        return self._score_features(leads_df, factorize=factorize, rules=rules)[0]
+    
+    @staticmethod
+    def _columnar_engine(engine):
+        """Validate a columnar engine name; return True for factorize mode."""
+        if engine not in ("vectorized", "factorize"):
+            raise ValueError(f"Unknown scoring engine: {engine!r}")
+        return engine == "factorize"
+    
+    def _points_to_levels(self, points, rules=None):
+        """Map an array of points to level names (of rules, default: the active rule set)."""
+        return (rules or self.rules).levels(points)
+    
+    @staticmethod
+    def _priority_order(key, tiebreak=None):
+        """
+        Stable descending order of a priority key, in linear time.
+        
+        The key is flipped to ascending and packed into the narrowest
+        unsigned type; for 8/16-bit keys NumPy's stable sort is a radix
+        (counting) sort. A tiebreak is applied first as its own 16-bit pass
+        (LSD order), so equal keys end up ordered by descending tiebreak.
         
-        # Senior titles (enhanced list)
-        senior_titles = [
-            'manager', 'head', 'director', 'vice president', 'vp', 
-            'lead', 'principal', 'senior', 'supervisor', 'coordinator'
-        ]
-        
-        # C-level and executive titles get extra points
-        executive_titles = [
-            'chief executive officer', 'ceo', 'chief technology officer', 'cto',
-            'chief financial officer', 'cfo', 'chief marketing officer', 'cmo',
-            'chief operating officer', 'coo', 'president', 'founder', 
-            'executive vice president', 'evp', 'senior vice president', 'svp'
-        ]
-        
-        # Check for senior titles
-        if any(title in normalized_title for title in senior_titles):
-            score += 2
+        Args:
+            key: int64 priority key per lead (larger = higher priority)
+            tiebreak: Optional numeric values per lead, larger first
+                (clipped to 0..65535)
             
-        # Bonus for executive titles
-        if any(title in normalized_title for title in executive_titles):
-            score += 1
+        Returns:
+            numpy.ndarray: Positional index, highest priority first
+        """
+        if len(key) == 0:
+            return np.empty(0, dtype=np.int64)
+        ascending = key.max() - key
+        if ascending.max() <= np.iinfo(np.uint8).max:
+            ascending = ascending.astype(np.uint8)
+        elif ascending.max() <= np.iinfo(np.uint16).max:
+            ascending = ascending.astype(np.uint16)
         
-        # Rule 2: Corporate Email Domain Check (with normalization)
-        email_domain = self.normalize_email_domain(lead.get('email', ''))
+        if tiebreak is None:
+            return np.argsort(ascending, kind='stable')
+        tiebreak = np.nan_to_num(np.asarray(tiebreak, dtype=np.float64))
+        secondary = (65535 - np.clip(tiebreak, 0, 65535)).astype(np.uint16)
+        order = np.argsort(secondary, kind='stable')
+        return order[np.argsort(ascending[order], kind='stable')]
+    
+    def _tiebreak_values(self, leads_df, tiebreak):
+        """Numeric tiebreak values for a column name (None if no tiebreak)."""
+        if tiebreak is None:
+            return None
+        if tiebreak == 'company_size':
+            return self.normalize_company_sizes(self._lead_column(leads_df, 'company_size'))
+        return pd.to_numeric(leads_df[tiebreak], errors='coerce').fillna(0).to_numpy()
+    
+    def priority_order(self, scored_df, tiebreak=None):
+        """
+        Positional order of scored leads: level, then points, then tiebreak.
         
-        if email_domain:
-            # Expanded list of personal domains
-            personal_domains = [
-                'gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'aol.com',
-                'icloud.com', 'live.com', 'msn.com', 'mail.com', 'protonmail.com',
-                'yandex.com', 'qq.com', 'sina.com', 'zoho.com'
-            ]
+        Ordering is stable (equal leads keep input order) and linear in the
+        number of leads. Apply it with scored_df.take(order).
+        
+        Args:
+            scored_df: Scored DataFrame ('score' and, if present, 'score_points')
+            tiebreak (str): Optional column to break ties on, largest first;
+                'company_size' uses the normalized company size
             
-            if not any(personal_domain == email_domain for personal_domain in personal_domains):
-                score += 1  # Corporate email bonus
+        Returns:
+            numpy.ndarray: Positional index, highest priority first
+        """
+        points = scored_df['score_points'].to_numpy() if 'score_points' in scored_df.columns else None
+        by = ('level', 'points') if points is not None else ('level',)
+        key = self._priority_key(scored_df['score'].to_numpy(), points, by)
+        return self._priority_order(key, self._tiebreak_values(scored_df, tiebreak))
+    
+    @profiled('scoring.order', standalone=False)
+    def _ordered(self, leads_df, columns, key, tiebreak=None, points=None):
+        """
+        Build the scored result in priority order with a single take.
         
-        # Rule 3: Company Size Check (with normalization)
-        normalized_size = self.normalize_company_size(lead.get('company_size', 0))
+        Args:
+            leads_df: Input leads (not modified)
+            columns (dict): {column: array per lead} to add
+            key: Priority key per lead (see _priority_key)
+            tiebreak (str): See priority_order
+            points: Score points per lead; kept as points_histogram (in
+                result order) for what_if_counts / what_if_levels
+        """
+        order = self._priority_order(key, self._tiebreak_values(leads_df, tiebreak))
+        scored_df = leads_df.take(order)
+        for column, values in columns.items():
+            scored_df[column] = np.asarray(values)[order]
+        self.points_histogram = (
+            PointsHistogram(np.asarray(points)[order], index=scored_df.index) if points is not None else None
+        )
+        return scored_df
+    
+    def _what_if_histogram(self, histogram):
+        histogram = histogram if histogram is not None else self.points_histogram
+        if histogram is None:
+            raise ValueError("No score points to work from: score a batch with a rule engine first")
+        return histogram
+    
+    def what_if_counts(self, thresholds, histogram=None):
+        """
+        Level counts for other level thresholds, without rescoring.
         
-        if normalized_size > 100:  # Large company
-            score += 2
-        elif normalized_size > 25:  # Medium company
-            score += 1
-        elif normalized_size > 5:   # Small but established company
-            score += 0  # Neutral
-        # Freelancers, students, etc. get no bonus (could be negative in future)
-        
-        # Convert score to priority level with refined thresholds
-        if score >= 5:  # High bar for high priority
-            return "High"
-        elif score >= 3:  # Medium priority
-            return "Medium"
-        elif score >= 1:  # Some positive signals
-            return "Medium"
-        else:
-            return "Low"
+        Args:
+            thresholds (dict): {level_name: min_points}, e.g. {'High': 4, 'Medium': 1}
+                (see rules.thresholds() for the active ones)
+            histogram (PointsHistogram): Batch to use (default: the last
+                batch scored with a rule engine)
+            
+        Returns:
+            dict: {level_name: count}, highest level first
+        """
+        return self._what_if_histogram(histogram).level_counts(thresholds, self.rules.default_level)
     
-    def score_leads_batch(self, leads_df):
+    def what_if_levels(self, thresholds, histogram=None):
+        """
+        Re-derive each lead's level for other thresholds, without rescoring.
+        
+        Args:
+            thresholds (dict): {level_name: min_points}
+            histogram (PointsHistogram): See what_if_counts
+            
+        Returns:
+            pandas Series: Level per lead, indexed like the scored DataFrame
+        """
+        histogram = self._what_if_histogram(histogram)
+        levels = histogram.assign_levels(thresholds, self.rules.default_level)
+        return pd.Series(levels, index=histogram.index, name='score')
+    
+    @profiled('scoring.score_leads_batch')
+    def score_leads_batch(self, leads_df, engine="vectorized", tiebreak=None):
         """
         Score multiple leads in batch.
         
         Args:
             leads_df: pandas DataFrame with lead data
+            engine (str): "vectorized" scores whole columns at once (default);
+                "factorize" scores each distinct column value once and
+                broadcasts the points back (best for repetitive data);
+                "rowwise" calls score_lead for every row (reference path);
+                "ml" predicts levels with the trained LeadModel
+            tiebreak (str): Optional tiebreak column, see priority_order
             
         Returns:
-            pandas DataFrame with added 'score' column
+            pandas DataFrame with added 'score' column, ordered by level
+            (then points for the columnar engines)
         """
-        import pandas as pd
+        points = None
+        rules = self.rules
+        if engine in ("vectorized", "factorize"):
+            points = self._score_points(leads_df, factorize=(engine == "factorize"), rules=rules)
+            scores = self._points_to_levels(points, rules)
+            key = self._priority_key(None, points, ('points',), rules)
+        elif engine in ("ml", "rowwise"):
+            if engine == "ml":
+                scores = self._score_features_ml(leads_df)
+            else:
+                # Apply scoring to each row, as compact Lead records
+                scores = np.array(
+                    [self.score_lead(lead, mode="rule") for lead in Lead.iter_frame(leads_df)],
+                    dtype=object
+                )
+            key = self._priority_key(scores, None, ('level',), rules)
+        else:
+            raise ValueError(f"Unknown scoring engine: {engine!r}")
         
-        # Create a copy to avoid modifying original DataFrame
-        scored_df = leads_df.copy()
+        # Order by priority (High > Medium > Low) while building the result
+        return self._ordered(leads_df, {'score': scores}, key, tiebreak, points=points)
+    
+    def _priority_key(self, levels, points, by, rules=None):
+        """
+        Combine priority fields into one int64 key (larger = higher priority).
         
-        # Apply scoring to each row
-        scores = []
-        for index, row in scored_df.iterrows():
-            lead_dict = row.to_dict()
-            score = self.score_lead(lead_dict, mode="rule")
-            scores.append(score)
+        Args:
+            levels: Level name per lead (only read if 'level' is in by)
+            points: Score points per lead (only read if 'points' is in by)
+            by (tuple): Fields in priority order, 'level' and/or 'points'
+            rules (ScoringRules): Rule set ranking the levels (default: the active one)
+        """
+        ranked = (rules or self.rules).ranked_level_names
+        key = np.zeros(len(levels if levels is not None else points), dtype=np.int64)
+        for field in by:
+            if field == 'level':
+                # Unknown level names rank below every known level
+                values = pd.Categorical(levels, categories=ranked).codes.astype(np.int64) + 1
+                span = len(ranked) + 1
+            elif field == 'points':
+                values = np.asarray(points, dtype=np.int64)
+                values = values - values.min() if len(values) else values
+                span = int(values.max()) + 1 if len(values) else 1
+            else:
+                raise ValueError(f"Unknown priority field: {field!r}")
+            key = key * span + values
+        return key
+    
+    @staticmethod
+    def _top_k_positions(key, k):
+        """
+        Positions of the k largest keys, best first, without a full sort.
         
-        # Add score column
-        scored_df['score'] = scores
+        np.partition finds the k-th largest key in linear time; ties at that
+        boundary are resolved by position, so earlier rows win.
+        """
+        n = len(key)
+        if k <= 0 or n == 0:
+            return np.empty(0, dtype=np.int64)
+        if k < n:
+            threshold = np.partition(key, n - k)[n - k]
+            above = np.flatnonzero(key > threshold)
+            ties = np.flatnonzero(key == threshold)[:k - len(above)]
+            selected = np.sort(np.concatenate([above, ties]))
+        else:
+            selected = np.arange(n)
+        return selected[np.argsort(-key[selected], kind='stable')]
+    
+    @profiled('scoring.top_k')
+    def top_k(self, leads_df, k, by=('level', 'points')):
+        """
+        Select the k highest-priority leads without sorting the whole batch.
         
-        # Sort by priority (High > Medium > Low)
-        priority_order = {'High': 3, 'Medium': 2, 'Low': 1}
-        scored_df['_sort_priority'] = scored_df['score'].map(priority_order)
-        scored_df = scored_df.sort_values('_sort_priority', ascending=False)
-        scored_df = scored_df.drop('_sort_priority', axis=1)
+        Args:
+            leads_df: Scored DataFrame (score_leads_batch / _with_explain or a
+                streamed chunk) or raw leads, which are scored first
+            k (int): Number of leads to return
+            by (tuple): Priority fields, 'level' and/or 'points'; ties keep
+                input order
+            
+        Returns:
+            pandas DataFrame: Up to k leads, highest priority first, with
+                'score' and 'score_points' columns
+        """
+        points = reason_codes = None
+        rules = self.rules
+        if 'score_points' in leads_df.columns:
+            points = leads_df['score_points'].to_numpy()
+        elif 'score' not in leads_df.columns or 'points' in by:
+            points, reason_codes = self._score_features(leads_df, rules=rules)
         
-        return scored_df
+        if 'score' in leads_df.columns:
+            levels = leads_df['score'].to_numpy()
+        else:
+            levels = self._points_to_levels(points, rules)
+        
+        positions = self._top_k_positions(self._priority_key(levels, points, by, rules), k)
+        top = leads_df.iloc[positions].copy()
+        if 'score' not in top.columns:
+            top['score'] = levels[positions]
+        if 'score_points' not in top.columns and points is not None:
+            top['score_points'] = points[positions]
+            top['score_reason_codes'] = reason_codes[positions]
+        return top
+    
+    def top_k_stream(self, path, k, by=('level', 'points'), chunksize=100_000,
+                     engine="vectorized", column_mapping=None):
+        """
+        Top k leads of a CSV file of any size.
+        
+        Each streamed chunk is reduced to its own top k and merged with the
+        running top k, so memory is bounded by chunksize + 2k rows and the
+        file is never sorted as a whole.
+        
+        Args:
+            path: CSV file path
+            k (int): Number of leads to return
+            by (tuple): Priority fields, see top_k
+            chunksize, engine, column_mapping: See score_csv_stream
+            
+        Returns:
+            pandas DataFrame: Up to k leads, highest priority first, indexed
+                by their row number in the file
+        """
+        top = None
+        for chunk in self.score_csv_stream(path, chunksize=chunksize, explain=True,
+                                           engine=engine, column_mapping=column_mapping):
+            chunk_top = self.top_k(chunk, k, by)
+            top = chunk_top if top is None else self.top_k(pd.concat([top, chunk_top]), k, by)
+        return top if top is not None else pd.DataFrame()
+    
+    def annotate_scores(self, leads_df, explain=False, engine="vectorized"):
+        """
+        Add score columns to leads_df in place, keeping the input row order.
+        
+        For callers that match results back to inputs by position (streamed
+        chunks, the scoring service) rather than wanting a priority order.
+        
+        Args:
+            leads_df: pandas DataFrame with lead data (modified in place)
+            explain (bool): Also add 'score_points' and 'score_reason_codes'
+            engine (str): "vectorized" (default) or "factorize"
+            
+        Returns:
+            pandas DataFrame: leads_df
+        """
+        rules = self.rules
+        points, reason_codes = self._score_features(leads_df, factorize=self._columnar_engine(engine), rules=rules)
+        leads_df['score'] = self._points_to_levels(points, rules)
+        if explain:
+            leads_df['score_points'] = points
+            leads_df['score_reason_codes'] = reason_codes
+        return leads_df
+    
+    def score_csv_stream(self, path, chunksize=100_000, explain=False,
+                         engine="vectorized", column_mapping=None):
+        """
+        Score a CSV file chunk by chunk, keeping memory flat for any file size.
+        
+        Each chunk is column-mapped, cleaned and scored in place; chunks are
+        yielded in file order and are not sorted by priority. Parquet,
+        Feather and Arrow IPC files stream the same way (see iter_lead_chunks).
+        
+        Args:
+            path: CSV (or Parquet / Feather / Arrow IPC) file path
+            chunksize (int): Rows per chunk
+            explain (bool): Also add 'score_points' and 'score_reason_codes'
+            engine (str): "vectorized" (default) or "factorize"
+            column_mapping (dict): Optional {original_column: standard_name}
+                (auto-detected from the header when omitted)
+            
+        Yields:
+            pandas DataFrame: Scored chunk
+        """
+        # Imported lazily: the loading layer lives with the feature modules
+        from data_loader import iter_lead_chunks
+        
+        self._columnar_engine(engine)  # fail before reading the file
+        for chunk in iter_lead_chunks(path, chunksize=chunksize, column_mapping=column_mapping):
+            with profile_stage('scoring.score_csv_stream'):
+                self.annotate_scores(chunk, explain=explain, engine=engine)
+            yield chunk
+    
+    @profiled('scoring.score_csv_to_file')
+    def score_csv_to_file(self, path, output_path, chunksize=100_000, explain=False,
+                          engine="vectorized", column_mapping=None):
+        """
+        Stream-score a CSV file and append each scored chunk to output_path.
+        
+        Args:
+            path: Input CSV file path
+            output_path: Output CSV file path (overwritten)
+            explain (bool): Also write 'score_points' and readable 'score_reasons'
+            chunksize, engine, column_mapping: See score_csv_stream
+            
+        Returns:
+            dict: 'rows' plus a count per level name of the rule set,
+                highest level first (e.g. 'High', 'Medium', 'Low')
+        """
+        report = {'rows': 0}
+        report.update({name: 0 for name in reversed(self.rules.ranked_level_names)})
+        first_chunk = True
+        
+        for chunk in self.score_csv_stream(path, chunksize=chunksize, explain=explain,
+                                           engine=engine, column_mapping=column_mapping):
+            if explain:
+                chunk['score_reasons'] = self.render_score_reasons(chunk)
+                chunk = chunk.drop(columns=['score_reason_codes'])
+            chunk.to_csv(output_path, mode='w' if first_chunk else 'a', header=first_chunk, index=False)
+            first_chunk = False
+            
+            report['rows'] += len(chunk)
+            for level, count in chunk['score'].value_counts().items():
+                # A rule set reloaded mid-file may bring new level names
+                report[level] = report.get(level, 0) + int(count)
+        
+        return report
+    
+    @profiled('scoring.score_leads_parallel')
+    def score_leads_parallel(self, leads_df, explain=False, workers=None,
+                             shard_size=250_000, min_rows=200_000, engine="factorize",
+                             tiebreak=None):
+        """
+        Score a large DataFrame on several cores.
+        
+        The DataFrame is split into shards of shard_size rows; the scoring
+        columns are passed to a process pool through shared memory and the
+        shard results are reassembled in input order. Inputs with fewer than
+        min_rows rows are scored in-process.
+        
+        Args:
+            leads_df: pandas DataFrame with lead data
+            explain (bool): Add 'score_points' and 'score_reason_codes' as in
+                score_leads_batch_with_explain
+            workers (int): Worker processes (default: CPU count)
+            shard_size (int): Rows per shard
+            min_rows (int): Smallest input that is worth a process pool
+            engine (str): Engine used inside each shard ("factorize" or "vectorized")
+            tiebreak (str): Optional tiebreak column, see priority_order
+            
+        Returns:
+            pandas DataFrame with added 'score' column, sorted by priority
+        """
+        from parallel_scoring import score_features_parallel
+        
+        factorize = self._columnar_engine(engine)
+        rules = self.rules
+        points, reason_codes = score_features_parallel(
+            self, leads_df, workers=workers, shard_size=shard_size,
+            min_rows=min_rows, factorize=factorize, rules=rules
+        )
+        
+        columns = {'score': self._points_to_levels(points, rules)}
+        if explain:
+            columns['score_points'] = points
+            columns['score_reason_codes'] = reason_codes
+        key = self._priority_key(None, points, ('points',), rules)
+        return self._ordered(leads_df, columns, key, tiebreak, points=points)
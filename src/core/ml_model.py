@@ -0,0 +1,232 @@
+# ML Lead Model - NumPy-only batch scoring behind score_lead(mode="ml")
+# Multinomial logistic regression over hashed title/domain tokens and size buckets
+
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'config', 'lead_model.npz'
+)
+
+DEFAULT_SIZE_EDGES = (1, 5, 10, 25, 50, 100, 250, 1000, 5000)
+
+
+def _token_ids(texts, prefix, hash_bits):
+    """
+    Hash the whitespace tokens of each text into feature ids.
+
+    Args:
+        texts: Sequence of (distinct) normalized strings
+        prefix (str): Namespace so title and domain tokens never collide
+        hash_bits (int): Size of the hashed feature space (2 ** hash_bits)
+
+    Returns:
+        tuple: (token_ids, owners) flat arrays; owners[i] is the index of
+            the text that token_ids[i] came from
+    """
+    mask = (1 << hash_bits) - 1
+    token_ids = []
+    owners = []
+    for owner, text in enumerate(texts):
+        for token in text.split():
+            token_ids.append(zlib.crc32(f"{prefix}{token}".encode('utf-8')) & mask)
+            owners.append(owner)
+    return np.array(token_ids, dtype=np.int64), np.array(owners, dtype=np.int64)
+
+
+def _domain_tokens(domains):
+    """Domain features: the full domain and its top-level suffix."""
+    domains = pd.Series(domains, dtype=object).fillna('')
+    suffixes = domains.str.rsplit('.', n=1).str[-1]
+    tokens = ('domain:' + domains + ' tld:' + suffixes).where(domains != '', 'domain:none')
+    return tokens.tolist()
+
+
+class LeadModel:
+    """
+    Multinomial logistic regression lead model.
+
+    Features are hashed job title tokens, the email domain (plus its
+    top-level suffix) and a one-hot company size bucket. Inference works on
+    distinct values: each distinct title/domain gets its logit contribution
+    once, and rows gather them through integer codes, so a batch costs a
+    few array operations regardless of row count.
+    """
+
+    def __init__(self, weights, bias, classes, hash_bits=14, size_edges=DEFAULT_SIZE_EDGES):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.classes = list(classes)
+        self.hash_bits = int(hash_bits)
+        self.size_edges = np.asarray(size_edges, dtype=np.float64)
+
+    @property
+    def size_offset(self):
+        """Index of the first company size bucket feature."""
+        return 1 << self.hash_bits
+
+    @classmethod
+    def empty(cls, classes=('High', 'Medium', 'Low'), hash_bits=14, size_edges=DEFAULT_SIZE_EDGES):
+        """An untrained model with all-zero weights."""
+        n_features = (1 << hash_bits) + len(size_edges) + 1
+        return cls(np.zeros((n_features, len(classes))), np.zeros(len(classes)),
+                   classes, hash_bits, size_edges)
+
+    @classmethod
+    def load(cls, path=None):
+        """Load model weights from a compact .npz file."""
+        with np.load(path or DEFAULT_MODEL_PATH, allow_pickle=False) as data:
+            return cls(data['weights'], data['bias'], data['classes'].tolist(),
+                       int(data['hash_bits']), data['size_edges'])
+
+    def save(self, path):
+        """Save model weights as a compressed .npz file."""
+        np.savez_compressed(
+            path, weights=self.weights.astype(np.float16), bias=self.bias,
+            classes=np.array(self.classes), hash_bits=self.hash_bits, size_edges=self.size_edges
+        )
+
+    # --- Features ----------------------------------------------------------
+
+    def _encode(self, titles, domains, sizes):
+        """
+        Factorize the inputs and hash the distinct titles and domains.
+
+        Returns:
+            dict: Codes per row plus (token_ids, owners) per distinct value
+        """
+        title_codes, title_uniques = pd.factorize(pd.Series(titles, dtype=object).fillna(''))
+        domain_codes, domain_uniques = pd.factorize(pd.Series(domains, dtype=object).fillna(''))
+        buckets = np.searchsorted(self.size_edges, np.asarray(sizes, dtype=np.float64), side='right')
+        return {
+            'title_codes': title_codes,
+            'title_tokens': _token_ids(title_uniques, 'title:', self.hash_bits),
+            'n_titles': len(title_uniques),
+            'domain_codes': domain_codes,
+            'domain_tokens': _token_ids(_domain_tokens(domain_uniques), '', self.hash_bits),
+            'n_domains': len(domain_uniques),
+            'size_ids': self.size_offset + buckets
+        }
+
+    def _sum_token_weights(self, tokens, n_values):
+        """Per distinct value, the sum of its token weights (n_values x classes)."""
+        token_ids, owners = tokens
+        totals = np.zeros((n_values, len(self.classes)), dtype=np.float32)
+        np.add.at(totals, owners, self.weights[token_ids])
+        return totals
+
+    def _logits(self, encoded):
+        title_logits = self._sum_token_weights(encoded['title_tokens'], encoded['n_titles'])
+        domain_logits = self._sum_token_weights(encoded['domain_tokens'], encoded['n_domains'])
+        return (self.bias
+                + title_logits[encoded['title_codes']]
+                + domain_logits[encoded['domain_codes']]
+                + self.weights[encoded['size_ids']])
+
+    # --- Inference ---------------------------------------------------------
+
+    def predict_proba(self, titles, domains, sizes):
+        """
+        Class probabilities for a batch of leads.
+
+        Args:
+            titles: Normalized job titles
+            domains: Normalized email domains ('' if none)
+            sizes: Normalized company sizes
+
+        Returns:
+            numpy.ndarray: (rows x classes) probabilities, columns in self.classes order
+        """
+        logits = self._logits(self._encode(titles, domains, sizes))
+        logits -= logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits /= logits.sum(axis=1, keepdims=True)
+        return logits
+
+    def predict(self, titles, domains, sizes):
+        """Most likely class label per lead."""
+        logits = self._logits(self._encode(titles, domains, sizes))
+        return np.array(self.classes, dtype=object)[logits.argmax(axis=1)]
+
+    # --- Training ----------------------------------------------------------
+
+    def fit(self, titles, domains, sizes, labels, epochs=300, learning_rate=0.5, l2=1e-4):
+        """
+        Fit the weights with full-batch gradient descent.
+
+        Gradients are accumulated per distinct title/domain first and then
+        scattered to their tokens, mirroring how inference is computed.
+
+        Args:
+            titles, domains, sizes: As for predict_proba
+            labels: Class label per lead (values from self.classes)
+            epochs (int): Gradient descent steps
+            learning_rate (float): Step size
+            l2 (float): L2 regularization strength
+
+        Returns:
+            LeadModel: self
+        """
+        encoded = self._encode(titles, domains, sizes)
+        class_index = {label: i for i, label in enumerate(self.classes)}
+        targets = np.zeros((len(labels), len(self.classes)), dtype=np.float32)
+        targets[np.arange(len(labels)), [class_index[label] for label in labels]] = 1.0
+        n_rows = max(len(labels), 1)
+
+        for _ in range(epochs):
+            logits = self._logits(encoded)
+            logits -= logits.max(axis=1, keepdims=True)
+            probabilities = np.exp(logits)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            errors = (probabilities - targets) / n_rows
+
+            gradient = l2 * self.weights
+            for prefix, count in (('title', encoded['n_titles']), ('domain', encoded['n_domains'])):
+                per_value = np.zeros((count, len(self.classes)), dtype=np.float32)
+                np.add.at(per_value, encoded[f'{prefix}_codes'], errors)
+                token_ids, owners = encoded[f'{prefix}_tokens']
+                np.add.at(gradient, token_ids, per_value[owners])
+            np.add.at(gradient, encoded['size_ids'], errors)
+
+            self.weights -= learning_rate * gradient
+            self.bias -= learning_rate * errors.sum(axis=0)
+
+        return self
+
+
+def build_default_model(output_path=None, num_leads=20_000, seed=7):
+    """
+    Train the bundled model on synthetic leads labelled by the rule engine.
+
+    This bootstraps ML mode until labelled CRM outcomes are available; the
+    resulting model reproduces the rule-based levels from hashed features.
+
+    Returns:
+        tuple: (model, agreement with the rule-based levels on the training data)
+    """
+    import random
+    from lead_scoring_engine import LeadScorer
+    from test_data_generator import ComplexTestDataGenerator
+
+    random.seed(seed)
+    np.random.seed(seed)
+    leads = ComplexTestDataGenerator().generate_complex_dataset(num_leads)
+
+    scorer = LeadScorer()
+    titles, domains, sizes = scorer._ml_inputs(leads)
+    labels = scorer.score_leads_batch(leads).sort_index()['score'].tolist()
+
+    model = LeadModel.empty().fit(titles, domains, sizes, labels)
+    agreement = float(np.mean(model.predict(titles, domains, sizes) == np.array(labels, dtype=object)))
+    model.save(output_path or DEFAULT_MODEL_PATH)
+    return model, agreement
+
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+    _, agreement = build_default_model()
+    print(f"Saved {DEFAULT_MODEL_PATH} (agreement with rules: {agreement:.1%})")
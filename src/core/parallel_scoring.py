@@ -0,0 +1,187 @@
+# Parallel Scoring - sharded multi-core batch scoring
+# Lead columns are handed to worker processes through shared memory
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from lead_features import _as_text
+
+SCORING_COLUMNS = ['job_title', 'email', 'company_size']
+
+# Set in each worker process by _init_worker
+_worker_scorer = None
+# Rule sets sent with tasks, rebuilt once per worker, by version
+_worker_rules = {}
+
+
+def _attach(name):
+    """Attach to an existing shared memory block without taking ownership."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: spawned workers share the parent's resource tracker,
+        # so re-registering the block is harmless and the parent unlinks it
+        return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(scorer_config):
+    """Build one LeadScorer per worker process."""
+    global _worker_scorer
+    from lead_scoring_engine import LeadScorer
+    _worker_scorer = LeadScorer(**scorer_config)
+
+
+def _task_rules(config, fingerprint, version):
+    """
+    The parent's rule set for a task, compiled once per worker.
+
+    Raises:
+        RuntimeError: If the rebuilt rule set has another version (e.g. the
+            bundled domain list was edited since the parent loaded it)
+    """
+    from scoring_rules import ScoringRules
+    if version not in _worker_rules:
+        rules = ScoringRules(config, fingerprint=fingerprint)
+        if rules.version != version:
+            raise RuntimeError(f"Worker rebuilt rule set {rules.version}, expected {version}")
+        _worker_rules[version] = rules
+    return _worker_rules[version]
+
+
+def _score_shard(task):
+    """
+    Score one shard from shared memory and write the results back in place.
+
+    Args:
+        task (dict): Shared block names, the shard's row range, the byte
+            range of each text column within its block and the parent's
+            rule set (its source and version)
+
+    Returns:
+        int: Number of rows scored
+    """
+    start, stop = task['rows']
+    blocks = {}
+    try:
+        columns = {}
+        for column, spec in task['columns'].items():
+            block = blocks[column] = _attach(spec['name'])
+            if spec['kind'] == 'numeric':
+                values = np.ndarray((spec['length'],), dtype=np.float64, buffer=block.buf)
+                columns[column] = pd.Series(values[start:stop].copy())
+            else:
+                offset, size = spec['shards'][task['shard']]
+                text = bytes(block.buf[offset:offset + size]).decode('utf-8')
+                columns[column] = pd.Series(text.split('\x00') if stop > start else [], dtype=object)
+
+        points, reason_codes = _worker_scorer._score_features(
+            pd.DataFrame(columns), factorize=task['factorize'], rules=_task_rules(*task['rules'])
+        )
+
+        output = blocks['output'] = _attach(task['output'])
+        length = task['length']
+        np.ndarray((length,), dtype=np.int64, buffer=output.buf)[start:stop] = points
+        np.ndarray((length,), dtype=np.uint8, buffer=output.buf, offset=8 * length)[start:stop] = reason_codes
+        return stop - start
+    finally:
+        for block in blocks.values():
+            block.close()
+
+
+def _share_column(values, shard_bounds, blocks):
+    """
+    Copy one lead column into a new shared memory block.
+
+    Numeric columns are stored as float64. Text columns are stored as UTF-8,
+    one '\\x00'-separated run per shard, so workers decode only their shard.
+
+    Returns:
+        dict: Column spec passed to the workers
+    """
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        array = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        blocks.append(block)
+        np.ndarray(array.shape, dtype=np.float64, buffer=block.buf)[:] = array
+        return {'kind': 'numeric', 'name': block.name, 'length': len(array)}
+
+    texts = _as_text(values).str.replace('\x00', ' ', regex=False).tolist()
+    encoded = [('\x00'.join(texts[start:stop])).encode('utf-8') for start, stop in shard_bounds]
+
+    block = shared_memory.SharedMemory(create=True, size=max(sum(len(e) for e in encoded), 1))
+    blocks.append(block)
+    shards = []
+    offset = 0
+    for data in encoded:
+        block.buf[offset:offset + len(data)] = data
+        shards.append((offset, len(data)))
+        offset += len(data)
+    return {'kind': 'text', 'name': block.name, 'shards': shards}
+
+
+def score_features_parallel(scorer, leads_df, workers=None, shard_size=250_000,
+                            min_rows=200_000, factorize=True, rules=None):
+    """
+    Columnar scoring of a DataFrame split into shards across a process pool.
+
+    Shards are scored independently and written into a shared output array
+    at their row offsets, so the result order is always the input order.
+    Every shard is scored with the same rule set: the parent's, sent with
+    each task, not whatever the workers load from the rule set file.
+    Inputs smaller than min_rows (or workers <= 1) are scored in-process.
+
+    Args:
+        scorer: LeadScorer whose configuration the workers copy
+        leads_df: pandas DataFrame with lead data
+        workers (int): Worker processes (default: CPU count)
+        shard_size (int): Rows per shard
+        min_rows (int): Below this many rows, skip the pool
+        factorize (bool): Use the factorize engine inside each shard
+        rules (ScoringRules): Rule set to score with (default: the scorer's
+            active one)
+
+    Returns:
+        tuple: (points, reason_codes) arrays in row order
+    """
+    workers = workers or os.cpu_count() or 1
+    rules = rules or scorer.rules
+    length = len(leads_df)
+    if workers <= 1 or length < max(min_rows, 1):
+        return scorer._score_features(leads_df, factorize=factorize, rules=rules)
+
+    shard_bounds = [(start, min(start + shard_size, length)) for start in range(0, length, shard_size)]
+    blocks = []
+    try:
+        columns = {
+            column: _share_column(scorer._lead_column(leads_df, column), shard_bounds, blocks)
+            for column in SCORING_COLUMNS
+        }
+        output = shared_memory.SharedMemory(create=True, size=9 * length)
+        blocks.append(output)
+
+        tasks = [
+            {
+                'shard': shard, 'rows': bounds, 'columns': columns, 'output': output.name,
+                'length': length, 'factorize': factorize, 'rules': (*rules.source, rules.version)
+            }
+            for shard, bounds in enumerate(shard_bounds)
+        ]
+        # spawn: safe to start from threaded hosts such as Streamlit
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context,
+                                 initializer=_init_worker, initargs=(scorer.worker_config(),)) as pool:
+            for _ in pool.map(_score_shard, tasks):
+                pass
+
+        points = np.ndarray((length,), dtype=np.int64, buffer=output.buf).copy()
+        reason_codes = np.ndarray((length,), dtype=np.uint8, buffer=output.buf, offset=8 * length).copy()
+        return points, reason_codes
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
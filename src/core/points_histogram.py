@@ -0,0 +1,102 @@
+# Points Histogram - threshold what-ifs without rescoring
+# Distinct point totals with their counts, plus each row's bin
+
+import numpy as np
+
+# Widest points range histogrammed by counting; wider ranges fall back to a sort
+MAX_COUNTING_SPAN = 1 << 16
+
+
+class PointsHistogram:
+    """
+    The score points of one scored batch, reduced to a histogram.
+
+    Rule scores take only a handful of distinct point values, so level
+    counts for any set of thresholds are computed over the distinct values
+    (O(bins)); per-row levels are a lookup through each row's bin.
+    """
+
+    def __init__(self, points, index=None):
+        """
+        Args:
+            points: Score points per row
+            index: Optional row labels for what-if level Series (e.g. the
+                scored DataFrame's index)
+        """
+        points = np.asarray(points, dtype=np.int64).reshape(-1)
+        low = int(points.min()) if len(points) else 0
+        span = int(points.max()) - low + 1 if len(points) else 1
+        if span <= MAX_COUNTING_SPAN:
+            # Counting pass (linear): point totals are small integers
+            offsets = points - low
+            totals = np.bincount(offsets, minlength=span)
+            present = np.flatnonzero(totals)
+            self.values = present + low
+            self.counts = totals[present]
+            bin_of_offset = np.zeros(span, dtype=np.int64)
+            bin_of_offset[present] = np.arange(len(present))
+            row_bins = bin_of_offset[offsets]
+        else:
+            self.values, row_bins, self.counts = np.unique(points, return_inverse=True, return_counts=True)
+        dtype = np.uint8 if len(self.values) <= 256 else np.uint32
+        self.row_bins = row_bins.reshape(-1).astype(dtype)
+        self.index = index
+
+    def __len__(self):
+        return len(self.row_bins)
+
+    @property
+    def points(self):
+        """Score points per row."""
+        return self.values[self.row_bins]
+
+    def _bin_ranks(self, thresholds):
+        """
+        Level per distinct point value under the given thresholds.
+
+        Levels are taken in the thresholds' order (highest level first) and
+        each value gets the first level whose minimum it meets, as
+        ScoringRules.level_for does, so crossed or equal thresholds label
+        leads the same way rescoring would.
+
+        Returns:
+            tuple: (rank per bin, level names by rank; rank len(names) is the default level)
+        """
+        names = list(thresholds)
+        ranks = np.full(len(self.values), len(names), dtype=np.int64)
+        for rank in range(len(names) - 1, -1, -1):
+            ranks[self.values >= thresholds[names[rank]]] = rank
+        return ranks, names
+
+    def level_counts(self, thresholds, default_level='Low'):
+        """
+        Lead count per level if the level thresholds were different.
+
+        Args:
+            thresholds (dict): {level_name: min_points}, highest level first,
+                e.g. {'High': 4, 'Medium': 1}
+            default_level (str): Level for points below every threshold
+
+        Returns:
+            dict: {level_name: count}, in the thresholds' order, default level last
+        """
+        ranks, names = self._bin_ranks(thresholds)
+        totals = np.bincount(ranks, weights=self.counts, minlength=len(names) + 1).astype(np.int64)
+        counts = {name: int(totals[rank]) for rank, name in enumerate(names)}
+        counts[default_level] = int(totals[len(names)])
+        return counts
+
+    def assign_levels(self, thresholds, default_level='Low'):
+        """
+        Level per row under different thresholds (no rescoring).
+
+        Args:
+            thresholds (dict): {level_name: min_points}, highest level first
+            default_level (str): Level for points below every threshold
+
+        Returns:
+            numpy.ndarray: Level name per row, in the scored batch's row order
+        """
+        ranks, names = self._bin_ranks(thresholds)
+        labels = np.array(names + [default_level], dtype=object)
+        return labels[ranks][self.row_bins]
@@ -0,0 +1,308 @@
+# Profiling - opt-in per-stage capture for scoring and enrichment runs
+# Enabled with LEAD_SCORER_PROFILE=1 or the app's sidebar toggle
+
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_ENV = 'LEAD_SCORER_PROFILE'
+PROFILE_DIR_ENV = 'LEAD_SCORER_PROFILE_DIR'
+DEFAULT_PROFILE_DIR = 'profiles'
+
+# The run being captured (one at a time, owned by the thread that started it)
+_active_run = None
+
+
+def profiling_requested():
+    """True if LEAD_SCORER_PROFILE is set to a truthy value."""
+    return os.environ.get(PROFILE_ENV, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _safe_name(name):
+    return ''.join(c if c.isalnum() or c in '-_.' else '_' for c in name)
+
+
+class _StackSampler(threading.Thread):
+    """
+    Samples one thread's Python stack at a fixed interval.
+
+    Stacks are counted in the collapsed format used by flamegraph.pl and
+    speedscope: 'stage;stage;module:function;... count'.
+    """
+
+    def __init__(self, profile, interval):
+        super().__init__(name='lead-scorer-profiler', daemon=True)
+        self.profile = profile
+        self.interval = interval
+        self.counts = {}
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.profile.thread_id)
+            if frame is None:
+                continue
+            functions = []
+            while frame is not None:
+                code = frame.f_code
+                module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                functions.append(f"{module}:{code.co_name}")
+                frame = frame.f_back
+            stages = [f"[{name}]" for name in self.profile.stage_names()]
+            stack = ';'.join(stages + functions[::-1])
+            self.counts[stack] = self.counts.get(stack, 0) + 1
+
+
+class ProfileRun:
+    """
+    One captured pipeline run.
+
+    Each stage gets its own cProfile profiler, so a stage's .prof file holds
+    only its own work (nested stages pause their parent's profiler).
+    tracemalloc tracks the peak memory of each stage and the allocation
+    sites of its first call; a sampling thread records collapsed stacks.
+    """
+
+    def __init__(self, name, output_dir, sample_interval=0.005, top_allocations=25):
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self.name = name
+        self.directory = os.path.join(output_dir, f"{stamp}-{_safe_name(name)}-{os.getpid()}")
+        self.thread_id = threading.get_ident()
+        self.top_allocations = top_allocations
+        self.stages = {}
+        self._stack = []
+        self._started_tracemalloc = False
+        self._sampler = _StackSampler(self, sample_interval)
+
+    def stage_names(self):
+        return [frame['name'] for frame in list(self._stack)]
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._started = time.perf_counter()
+        self._sampler.start()
+        self.enter_stage(self.name)
+
+    def stop(self):
+        self._sampler.stop()
+        self.exit_stage()
+        self.seconds = time.perf_counter() - self._started
+        self._write()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    def enter_stage(self, name):
+        stats = self.stages.setdefault(name, {
+            'calls': 0, 'seconds': 0.0, 'peak_memory_mb': 0.0,
+            'profiler': cProfile.Profile(), 'allocations': None
+        })
+        stats['calls'] += 1
+
+        if self._stack:
+            parent = self._stack[-1]
+            parent['peak'] = max(parent['peak'], tracemalloc.get_traced_memory()[1])
+            self._pause(parent)
+        tracemalloc.reset_peak()
+
+        started = time.perf_counter()
+        snapshot = self._snapshot() if stats['calls'] == 1 else None
+        frame = {
+            'name': name, 'stats': stats, 'peak': 0, 'snapshot': snapshot, 'profiling': False,
+            # Snapshot time is profiler overhead, kept out of the stage timings
+            'overhead': time.perf_counter() - started, 'started': started
+        }
+        self._stack.append(frame)
+        self._resume(frame)
+
+    def exit_stage(self):
+        frame = self._stack.pop()
+        self._pause(frame)
+        stats = frame['stats']
+        finished = time.perf_counter()
+        stats['seconds'] += finished - frame['started'] - frame['overhead']
+        peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+        stats['peak_memory_mb'] = max(stats['peak_memory_mb'], peak / 1024 ** 2)
+        if frame['snapshot'] is not None:
+            growth = self._snapshot().compare_to(frame['snapshot'], 'lineno')
+            stats['allocations'] = growth[:self.top_allocations]
+
+        if self._stack:
+            parent = self._stack[-1]
+            parent['peak'] = max(parent['peak'], peak)
+            parent['overhead'] += frame['overhead'] + time.perf_counter() - finished
+            self._resume(parent)
+
+    @staticmethod
+    def _snapshot():
+        """Snapshot of traced memory, without the profiler's own allocations."""
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)
+        ])
+
+    @staticmethod
+    def _resume(frame):
+        try:
+            frame['stats']['profiler'].enable()
+            frame['profiling'] = True
+        except ValueError:
+            # Another profiler (e.g. an outer cProfile run) is active
+            frame['profiling'] = False
+
+    @staticmethod
+    def _pause(frame):
+        if frame['profiling']:
+            frame['stats']['profiler'].disable()
+            frame['profiling'] = False
+
+    def _write(self):
+        summary = {
+            'run': self.name,
+            'directory': self.directory,
+            'seconds': round(self.seconds, 6),
+            'stages': {}
+        }
+        allocation_lines = []
+
+        for name, stats in self.stages.items():
+            profile_file = f"{_safe_name(name)}.prof"
+            profiler = stats['profiler']
+            top_functions = []
+            if profiler.getstats():
+                profiler.dump_stats(os.path.join(self.directory, profile_file))
+                report = pstats.Stats(profiler, stream=io.StringIO())
+                # Ranked by own time: where the stage's time actually went
+                ranked = sorted(report.stats.items(), key=lambda item: item[1][2], reverse=True)
+                for (filename, line, function), (_, calls, total, cumulative, _) in ranked[:10]:
+                    top_functions.append({
+                        'function': f"{os.path.basename(filename)}:{line}({function})",
+                        'calls': calls,
+                        'own_seconds': round(total, 6),
+                        'cumulative_seconds': round(cumulative, 6)
+                    })
+            else:
+                profile_file = None
+
+            summary['stages'][name] = {
+                'calls': stats['calls'],
+                'seconds': round(stats['seconds'], 6),
+                'peak_memory_mb': round(stats['peak_memory_mb'], 3),
+                'profile': profile_file,
+                'top_functions': top_functions
+            }
+
+            allocation_lines.append(f"== {name} (first call, net growth by line) ==")
+            for stat in stats['allocations'] or []:
+                allocation_lines.append(str(stat))
+            allocation_lines.append('')
+
+        with open(os.path.join(self.directory, 'allocations.txt'), 'w') as f:
+            f.write('\n'.join(allocation_lines))
+        with open(os.path.join(self.directory, 'stacks.collapsed'), 'w') as f:
+            for stack, count in sorted(self._sampler.counts.items()):
+                f.write(f"{stack} {count}\n")
+        with open(os.path.join(self.directory, 'summary.json'), 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+@contextmanager
+def profile_run(name='run', enabled=None, output_dir=None, sample_interval=0.005, top_allocations=25):
+    """
+    Capture a whole pipeline run, broken down by the stages it passes through.
+
+    Writes to <output_dir>/<timestamp>-<name>-<pid>/:
+        - summary.json: time, peak memory and hottest functions per stage
+        - <stage>.prof: cProfile stats per stage (open with pstats/snakeviz)
+        - allocations.txt: top allocation sites per stage
+        - stacks.collapsed: sampled stacks for flamegraph.pl / speedscope
+
+    Args:
+        name (str): Run name (also the root stage)
+        enabled (bool): Capture or not; None follows LEAD_SCORER_PROFILE
+        output_dir (str): Base directory (default: LEAD_SCORER_PROFILE_DIR or ./profiles)
+        sample_interval (float): Seconds between stack samples
+        top_allocations (int): Allocation sites kept per stage
+
+    Yields:
+        ProfileRun (or None when profiling is off or a run is already active)
+    """
+    global _active_run
+    if enabled is None:
+        enabled = profiling_requested()
+    if not enabled or _active_run is not None:
+        yield None
+        return
+
+    output_dir = output_dir or os.environ.get(PROFILE_DIR_ENV) or DEFAULT_PROFILE_DIR
+    run = ProfileRun(name, output_dir, sample_interval, top_allocations)
+    _active_run = run
+    run.start()
+    try:
+        yield run
+    finally:
+        try:
+            run.stop()
+        finally:
+            _active_run = None
+
+
+@contextmanager
+def profile_stage(name, standalone=True):
+    """
+    Mark a pipeline stage inside the active run.
+
+    Without an active run this does nothing, unless LEAD_SCORER_PROFILE is
+    set and standalone is True, in which case the stage is captured as a
+    run of its own (one profile directory per call).
+
+    Args:
+        name (str): Stage name
+        standalone (bool): False for stages called per chunk or per lead,
+            which are only worth recording inside a larger run
+    """
+    run = _active_run
+    if run is None:
+        if standalone and profiling_requested():
+            with profile_run(name):
+                yield
+        else:
+            yield
+        return
+    if run.thread_id != threading.get_ident():
+        yield
+        return
+
+    run.enter_stage(name)
+    try:
+        yield
+    finally:
+        run.exit_stage()
+
+
+def profiled(name, standalone=True):
+    """Decorator form of profile_stage."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _active_run is None and not (standalone and profiling_requested()):
+                return function(*args, **kwargs)
+            with profile_stage(name, standalone):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,158 @@
+# Score Store - persistent lead fingerprint cache for incremental rescoring
+# Results are keyed by (rule set version, fingerprint of the scoring fields)
+
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from lead_features import _as_text
+
+SCORING_FIELDS = ['job_title', 'email', 'company_size']
+
+
+def default_cache_path(filename):
+    """
+    Path of a local cache file.
+
+    The directory comes from LEAD_SCORER_CACHE_DIR, or ~/.cache/lead_scorer.
+
+    Args:
+        filename (str): Cache file name
+
+    Returns:
+        str: Absolute path (the directory is created if needed)
+    """
+    cache_dir = os.environ.get('LEAD_SCORER_CACHE_DIR') or os.path.join(
+        os.path.expanduser('~'), '.cache', 'lead_scorer'
+    )
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, filename)
+
+
+def lead_fingerprints(leads_df):
+    """
+    64-bit fingerprint of each lead's scoring-relevant fields.
+
+    Only job title, email and company size affect the score, so edits to any
+    other column keep a lead's fingerprint (and its cached score).
+
+    Args:
+        leads_df: pandas DataFrame with lead data
+
+    Returns:
+        numpy.ndarray: int64 fingerprint per lead, in row order
+    """
+    from lead_scoring_engine import LeadScorer
+    fingerprints = np.zeros(len(leads_df), dtype=np.uint64)
+    for column in SCORING_FIELDS:
+        values = leads_df[column] if column in leads_df.columns else pd.Series('', index=leads_df.index)
+        if pd.api.types.is_string_dtype(values) and values.dtype != object:
+            codes, uniques = pd.factorize(values, use_na_sentinel=False)
+            texts = pd.Series(uniques, dtype=object).fillna('')
+        else:
+            codes, uniques = LeadScorer._factorize(values)
+            texts = _as_text(uniques)
+        # Hash each distinct value once, then combine the columns per row
+        hashes = pd.util.hash_array(texts.to_numpy(dtype=object), categorize=False)
+        fingerprints = fingerprints * np.uint64(0x100000001B3) ^ hashes[codes]
+    # SQLite integers are signed, so store the uint64 hash as int64
+    return fingerprints.view(np.int64)
+
+
+class ScoreStore:
+    """
+    SQLite store of scoring results by lead fingerprint.
+
+    Rows are keyed by the rule set version as well, so editing the rules
+    starts a fresh cache instead of serving stale scores. Results of
+    earlier versions are deleted once results of a new version are saved,
+    so the store does not grow with every rule edit.
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): SQLite file (default: scores.sqlite in the cache
+                directory, see default_cache_path); ':memory:' for a
+                throwaway store
+        """
+        self.path = path or default_cache_path('scores.sqlite')
+        self._connection = sqlite3.connect(self.path)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS scores ('
+            ' rules_version TEXT NOT NULL,'
+            ' fingerprint INTEGER NOT NULL,'
+            ' points INTEGER NOT NULL,'
+            ' reason_codes INTEGER NOT NULL,'
+            ' PRIMARY KEY (rules_version, fingerprint)'
+            ') WITHOUT ROWID'
+        )
+        # Version of the last saved results (older versions are pruned on change)
+        self._connection.execute('CREATE TABLE IF NOT EXISTS state (rules_version TEXT NOT NULL)')
+        self._connection.execute('CREATE TEMP TABLE IF NOT EXISTS wanted (fingerprint INTEGER PRIMARY KEY)')
+        self._connection.commit()
+
+    def lookup(self, rules_version, fingerprints):
+        """
+        Find cached results for a batch of fingerprints.
+
+        Only the requested fingerprints are read (joined through a temp
+        table), so lookups cost the size of the batch, not of the store.
+
+        Args:
+            rules_version (str): Rule set version (ScoringRules.version)
+            fingerprints: int64 fingerprint per lead
+
+        Returns:
+            tuple: (found bool array, points int64 array, reason_codes uint8
+                array); points and codes are 0 where found is False
+        """
+        fingerprints = np.asarray(fingerprints, dtype=np.int64)
+        self._connection.execute('DELETE FROM wanted')
+        # Distinct keys in sorted order: appends to the temp B-tree instead of random inserts
+        self._connection.executemany('INSERT INTO wanted VALUES (?)',
+                                     ((key,) for key in np.unique(fingerprints).tolist()))
+        rows = self._connection.execute(
+            'SELECT scores.fingerprint, scores.points, scores.reason_codes FROM wanted'
+            ' CROSS JOIN scores ON scores.rules_version = ? AND scores.fingerprint = wanted.fingerprint',
+            (rules_version,)
+        ).fetchall()
+        stored = np.array(rows, dtype=np.int64).reshape(-1, 3)
+
+        positions = pd.Index(stored[:, 0]).get_indexer(fingerprints)
+        found = positions >= 0
+        points = np.where(found, stored[positions, 1] if len(stored) else 0, 0)
+        reason_codes = np.where(found, stored[positions, 2] if len(stored) else 0, 0).astype(np.uint8)
+        return found, points.astype(np.int64), reason_codes
+
+    def save(self, rules_version, fingerprints, points, reason_codes):
+        """
+        Store results for a batch of fingerprints (existing entries are replaced).
+
+        Saving under a different rule set version than last time first
+        prunes every other version.
+        """
+        current = self._connection.execute('SELECT rules_version FROM state').fetchone()
+        if current is None or current[0] != rules_version:
+            self.prune(rules_version)
+            self._connection.execute('DELETE FROM state')
+            self._connection.execute('INSERT INTO state VALUES (?)', (rules_version,))
+        fingerprints, first = np.unique(np.asarray(fingerprints, dtype=np.int64), return_index=True)
+        rows = zip(
+            [rules_version] * len(fingerprints),
+            fingerprints.tolist(),
+            np.asarray(points)[first].tolist(),
+            np.asarray(reason_codes)[first].tolist()
+        )
+        self._connection.executemany('INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)', rows)
+        self._connection.commit()
+
+    def prune(self, keep_version):
+        """Delete results of every rule set version except keep_version."""
+        self._connection.execute('DELETE FROM scores WHERE rules_version != ?', (keep_version,))
+        self._connection.commit()
+
+    def close(self):
+        self._connection.close()
@@ -0,0 +1,301 @@
+# Scoring Rules - declarative rule set compiled to vector operations
+# Weights, keywords, size tiers and level thresholds live in config/scoring_rules.json
+
+import bisect
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from domain_table import DomainTable, default_domain_table
+from title_matcher import TitleMatcher
+
+DEFAULT_RULES_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'config', 'scoring_rules.json'
+)
+
+# Reason codes - bit flags stored per lead in 'score_reason_codes' (uint8)
+# and only rendered to text when a lead is displayed or exported
+REASON_SENIOR_TITLE = 1
+REASON_EXECUTIVE_TITLE = 2
+REASON_CORPORATE_EMAIL = 4
+# Company size tier n (1-based, ascending thresholds) sets bit 4 << n;
+# with the default rules: 8 = size > 5, 16 = size > 25, 32 = size > 100
+REASON_SIZE_TIERS = 0xF8
+MAX_SIZE_TIERS = 5
+
+
+def _format_points(points):
+    """Render a point value the way reasons show it: +2, ±0, -1."""
+    if points > 0:
+        return f"+{points}"
+    if points == 0:
+        return "±0"
+    return str(points)
+
+
+def load_rules_config(path):
+    """
+    Parse a rule set file (JSON, TOML or YAML, by extension).
+
+    Args:
+        path (str): Rule set file path
+
+    Returns:
+        tuple: (config dict, raw file bytes)
+
+    Raises:
+        ValueError: If the file is not valid JSON, TOML or YAML
+    """
+    with open(path, 'rb') as handle:
+        raw = handle.read()
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.toml':
+        import tomllib
+        return tomllib.loads(raw.decode('utf-8')), raw
+    if extension in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("PyYAML is required for YAML rule sets (pip install pyyaml)")
+        try:
+            return yaml.safe_load(raw), raw
+        except yaml.YAMLError as e:
+            # JSON and TOML parse errors are ValueErrors; make YAML's match
+            raise ValueError(f"Invalid YAML in {path}: {e}")
+    return json.loads(raw), raw
+
+
+class ScoringRules:
+    """
+    A compiled rule set.
+
+    The config is validated and turned into lookup arrays once, so every
+    scoring path (per-lead, batch, explain) evaluates the same plan without
+    re-reading or re-parsing anything per lead.
+    """
+
+    def __init__(self, config, fingerprint=''):
+        """
+        Args:
+            config (dict): Parsed rule set (see config/scoring_rules.json)
+            fingerprint (str): Content hash of the source, added to the version
+
+        Raises:
+            ValueError: If the rule set is malformed
+        """
+        # Kept so the same rule set can be rebuilt elsewhere (see source)
+        self._source = (config, fingerprint)
+        try:
+            senior = config['title']['senior']
+            executive = config['title']['executive']
+            corporate = config['email']['corporate']
+            tiers = sorted(config['company_size']['tiers'], key=lambda tier: tier['above'])
+
+            self.senior_keywords = [str(k).lower() for k in senior['keywords']]
+            self.executive_keywords = [str(k).lower() for k in executive['keywords']]
+            self.senior_points = int(senior['points'])
+            self.executive_points = int(executive['points'])
+            self.senior_label = senior.get('label', 'senior title')
+            self.executive_label = executive.get('label', 'executive title')
+
+            self.corporate_points = int(corporate['points'])
+            self.corporate_label = corporate.get('label', 'corporate email')
+            personal_domains = config['email'].get('personal_domains')
+            if personal_domains is None:
+                # The bundled domain table (config/email_domains.txt); its version
+                # joins the rules version so cached scores are dropped when it is edited
+                self.personal_domains = default_domain_table()
+                digest = self.personal_domains.version[:8]
+                fingerprint = f"{fingerprint}.{digest}" if fingerprint else digest
+            else:
+                self.personal_domains = DomainTable.from_domains(personal_domains)
+
+            self.size_thresholds = np.array([tier['above'] for tier in tiers], dtype=np.float64)
+            self.size_tier_points = np.array([0] + [int(tier['points']) for tier in tiers], dtype=np.int64)
+            self.size_tier_labels = (
+                [config['company_size'].get('default_label', 'very small company')]
+                + [tier['label'] for tier in tiers]
+            )
+
+            levels = sorted(config['levels'], key=lambda level: level['min_points'], reverse=True)
+            self.level_names = [level['name'] for level in levels]
+            self.level_min_points = [int(level['min_points']) for level in levels]
+            self.default_level = config.get('default_level', 'Low')
+            base_version = str(config.get('version', '0'))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid scoring rule set: {e!r}")
+
+        if len(tiers) > MAX_SIZE_TIERS:
+            raise ValueError(f"Invalid scoring rule set: at most {MAX_SIZE_TIERS} company size tiers")
+
+        self._size_threshold_list = self.size_thresholds.tolist()
+        self._ascending_min_points = np.array(self.level_min_points[::-1], dtype=np.int64)
+        self.ranked_level_names = [self.default_level] + self.level_names[::-1]
+        self._ranked_level_array = np.array(self.ranked_level_names, dtype=object)
+        self.version = f"{base_version}+{fingerprint}" if fingerprint else base_version
+        self.title_matcher = TitleMatcher(self.senior_keywords, self.executive_keywords)
+        self.size_tier_reasons = np.array(
+            [0] + [4 << tier for tier in range(1, len(tiers) + 1)], dtype=np.uint8
+        )
+
+    @property
+    def source(self):
+        """(config, fingerprint) this rule set was compiled from: ScoringRules(*source) rebuilds it."""
+        return self._source
+
+    @classmethod
+    def from_file(cls, path):
+        """Load and compile a rule set file."""
+        config, raw = load_rules_config(path)
+        return cls(config, fingerprint=hashlib.sha1(raw).hexdigest()[:12])
+
+    # --- Vectorized evaluation -------------------------------------------
+
+    def size_tiers(self, sizes):
+        """Tier index per normalized company size (0 = below every threshold)."""
+        return np.searchsorted(self.size_thresholds, sizes, side='left')
+
+    def size_tier(self, size):
+        """Scalar size_tiers() for the per-lead path."""
+        return bisect.bisect_left(self._size_threshold_list, size)
+
+    def evaluate(self, title_flags, corporate, size_tiers):
+        """
+        Apply the rule set to per-lead feature arrays.
+
+        Args:
+            title_flags: TitleMatcher bit flags per lead
+            corporate: bool array, True for corporate email domains
+            size_tiers: company size tier per lead (see size_tiers)
+
+        Returns:
+            tuple: (points int64 array, reason_codes uint8 array)
+        """
+        title_flags = np.asarray(title_flags)
+        senior = (title_flags & TitleMatcher.SENIOR) > 0
+        executive = (title_flags & TitleMatcher.EXECUTIVE) > 0
+        corporate = np.asarray(corporate, dtype=bool)
+        size_tiers = np.asarray(size_tiers)
+
+        points = self.size_tier_points[size_tiers].copy()
+        points += np.where(senior, self.senior_points, 0)
+        points += np.where(executive, self.executive_points, 0)
+        points += np.where(corporate, self.corporate_points, 0)
+
+        reason_codes = self.size_tier_reasons[size_tiers].copy()
+        reason_codes |= np.where(senior, REASON_SENIOR_TITLE, 0).astype(np.uint8)
+        reason_codes |= np.where(executive, REASON_EXECUTIVE_TITLE, 0).astype(np.uint8)
+        reason_codes |= np.where(corporate, REASON_CORPORATE_EMAIL, 0).astype(np.uint8)
+        return points, reason_codes
+
+    def evaluate_one(self, title_flags, corporate, size_tier):
+        """Scalar evaluate() for the per-lead path: returns (points, reason_code)."""
+        points = int(self.size_tier_points[size_tier])
+        reason_code = int(self.size_tier_reasons[size_tier])
+        if title_flags & TitleMatcher.SENIOR:
+            points += self.senior_points
+            reason_code |= REASON_SENIOR_TITLE
+        if title_flags & TitleMatcher.EXECUTIVE:
+            points += self.executive_points
+            reason_code |= REASON_EXECUTIVE_TITLE
+        if corporate:
+            points += self.corporate_points
+            reason_code |= REASON_CORPORATE_EMAIL
+        return points, reason_code
+
+    def level_ranks(self, points):
+        """
+        Level rank per point total (uint8): 0 for the default level, higher
+        ranks for higher levels (index into ranked_level_names).
+        """
+        return np.searchsorted(self._ascending_min_points, points, side='right').astype(np.uint8)
+
+    def levels(self, points):
+        """Map an array of points to level names."""
+        return self._ranked_level_array[self.level_ranks(points)]
+
+    def thresholds(self):
+        """Level thresholds as {level_name: min_points}, highest level first."""
+        return dict(zip(self.level_names, self.level_min_points))
+
+    def level_for(self, points):
+        """Level name for a single point total."""
+        for name, minimum in zip(self.level_names, self.level_min_points):
+            if points >= minimum:
+                return name
+        return self.default_level
+
+    # --- Reason rendering ------------------------------------------------
+
+    def reason_template(self, code):
+        """
+        Text for one reason code, split around the corporate email domain.
+
+        Returns:
+            tuple: (prefix, suffix); the domain goes between them when the
+                REASON_CORPORATE_EMAIL flag is set, otherwise suffix is ''
+        """
+        reasons = []
+        if code & REASON_SENIOR_TITLE:
+            reasons.append(f"{_format_points(self.senior_points)} {self.senior_label}")
+        if code & REASON_EXECUTIVE_TITLE:
+            reasons.append(f"{_format_points(self.executive_points)} {self.executive_label}")
+
+        tier = 0
+        for index in range(len(self.size_tier_reasons) - 1, 0, -1):
+            if code & self.size_tier_reasons[index]:
+                tier = index
+                break
+        size_reason = f"{_format_points(int(self.size_tier_points[tier]))} {self.size_tier_labels[tier]}"
+
+        if code & REASON_CORPORATE_EMAIL:
+            reasons.append(f"{_format_points(self.corporate_points)} {self.corporate_label} (")
+            return '; '.join(reasons), f"); {size_reason}"
+        return '; '.join(reasons + [size_reason]), ''
+
+    def render_reasons(self, code, email_domain=''):
+        """Reasons for one lead as a list of strings."""
+        prefix, suffix = self.reason_template(code)
+        text = f"{prefix}{email_domain}{suffix}" if code & REASON_CORPORATE_EMAIL else prefix
+        return text.split('; ')
+
+
+class RuleSetFile:
+    """
+    A rule set file that is reloaded when it changes on disk.
+
+    The file's modification time is checked at most once per
+    reload_interval seconds; if a changed file fails to load, the last good
+    rule set stays active and the error is kept in last_error.
+    """
+
+    def __init__(self, path=None, reload_interval=1.0):
+        self.path = os.path.abspath(path or DEFAULT_RULES_PATH)
+        self.reload_interval = reload_interval
+        self.last_error = None
+        self._stamp = self._file_stamp()
+        self._rules = ScoringRules.from_file(self.path)
+        self._checked_at = time.monotonic()
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self):
+        """Return the current rules, reloading them if the file changed."""
+        now = time.monotonic()
+        if now - self._checked_at >= self.reload_interval:
+            self._checked_at = now
+            try:
+                stamp = self._file_stamp()
+                if stamp != self._stamp:
+                    self._rules = ScoringRules.from_file(self.path)
+                    self._stamp = stamp
+                    self.last_error = None
+            except (OSError, ValueError, ImportError) as e:
+                self.last_error = e
+        return self._rules
@@ -0,0 +1,157 @@
+# Company Size Parser - vectorized parsing of free-form company sizes
+# Shared by the data loader (cleaning) and the scorer (normalization)
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from lead_features import _as_text
+
+# Size words and the headcount they stand for
+COMPANY_SIZE_WORDS = {
+    'startup': 5,
+    'small': 10,
+    'small business': 10,
+    'smb': 10,
+    'medium': 50,
+    'mid-size': 50,
+    'midsize': 50,
+    'mid size': 50,
+    'mid-sized': 50,
+    'medium-sized': 50,
+    'large': 200,
+    'enterprise': 1000,
+    'freelance': 1,
+    'freelancer': 1,
+    'individual': 1,
+    'solo': 1,
+    'self-employed': 1
+}
+
+MISSING_SIZE_VALUES = ('nan', 'none', '', 'unknown')
+
+_NUMBER = r'\d[\d,]*(?:\.\d+)?(?:e\+?\d+)?'
+_UNIT = r'k|m|thousand|million'
+
+# "1,200", "~25", "1.5k", "10k+", "50-100", "1,000-5,000 employees", "1-5k"
+SIZE_PATTERN = re.compile(
+    r'^(?:~|approx\.?|approximately|about|around|over|>=?)?\s*'
+    rf'(?P<number>{_NUMBER})\s*(?P<unit>{_UNIT})?'
+    rf'(?:\s*(?:-|–|to)\s*{_NUMBER}\s*(?P<range_unit>{_UNIT})?)?'
+    r'\s*\+?\s*(?:employees?|people|staff|persons?|emp|ppl)?\.?$'
+)
+
+_UNIT_MULTIPLIERS = {'k': 1_000, 'thousand': 1_000, 'm': 1_000_000, 'million': 1_000_000}
+
+
+def _size_texts(values):
+    """Lowercased, whitespace-collapsed text per value ('' if missing)."""
+    texts = _as_text(values).str.lower().str.strip()
+    return texts.str.replace(r'\s+', ' ', regex=True)
+
+
+def _parse_texts(texts, words):
+    """
+    Parse normalized size texts with one regex pass and a word lookup.
+
+    Args:
+        texts: pandas Series of normalized texts (see _size_texts)
+        words (dict): Size word lookup table
+
+    Returns:
+        tuple: (sizes int64 array, recognized bool array)
+    """
+    parts = texts.str.extract(SIZE_PATTERN)
+    matched = parts['number'].notna().to_numpy()
+
+    numbers = pd.to_numeric(parts['number'].str.replace(',', '', regex=False), errors='coerce')
+    # A range like "1-5k" takes its unit from the upper bound
+    units = parts['unit'].fillna(parts['range_unit'])
+    multipliers = units.map(_UNIT_MULTIPLIERS).fillna(1)
+    values = (numbers * multipliers).to_numpy(dtype=np.float64, na_value=np.nan)
+
+    sizes = np.zeros(len(texts), dtype=np.int64)
+    finite = matched & np.isfinite(values)
+    sizes[finite] = np.minimum(np.trunc(values[finite]), np.iinfo(np.int64).max // 2)
+
+    named = ~matched & texts.isin(list(words)).to_numpy(dtype=bool)
+    sizes[named] = texts[named].map(words).to_numpy()
+
+    missing = texts.isin(MISSING_SIZE_VALUES).to_numpy(dtype=bool)
+    return sizes, finite | named | missing
+
+
+def _parse_series(values, words):
+    """Parse a Series of raw sizes, once per distinct value."""
+    values = values if isinstance(values, pd.Series) else pd.Series(values)
+    sizes = np.zeros(len(values), dtype=np.int64)
+    recognized = np.ones(len(values), dtype=bool)
+
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        numbers = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        finite = np.isfinite(numbers)
+        sizes[finite] = np.clip(np.trunc(numbers[finite]), 0, np.iinfo(np.int64).max // 2)
+        recognized = finite | np.isnan(numbers)
+        return sizes, recognized
+
+    # Factorized on the string form so True and 1 stay apart
+    codes, uniques = pd.factorize(_as_text(values))
+    unique_sizes, unique_recognized = _parse_texts(_size_texts(pd.Series(uniques)), words)
+    return unique_sizes[codes], unique_recognized[codes]
+
+
+def parse_company_sizes(values, words=None):
+    """
+    Parse raw company sizes into employee counts.
+
+    Handles plain and comma-grouped numbers ("1,200"), approximations
+    ("~25"), k/m suffixes ("1.5k", "10k+"), ranges (lower bound:
+    "1,000-5,000 employees" -> 1000) and size words ("Mid-size").
+
+    Args:
+        values: pandas Series (or sequence) of raw company sizes
+        words (dict): Size word lookup (default: COMPANY_SIZE_WORDS)
+
+    Returns:
+        numpy.ndarray: int64 employee count per value (0 if missing or invalid)
+    """
+    return _parse_series(values, COMPANY_SIZE_WORDS if words is None else words)[0]
+
+
+def recognized_company_sizes(values, words=None):
+    """
+    Which raw company sizes parse_company_sizes understands.
+
+    Returns:
+        numpy.ndarray: bool per value; missing values count as recognized
+    """
+    return _parse_series(values, COMPANY_SIZE_WORDS if words is None else words)[1]
+
+
+def parse_company_size(value, words=None):
+    """
+    Scalar parse_company_sizes for a single value.
+
+    Returns:
+        int: Employee count (0 if missing or invalid)
+    """
+    words = COMPANY_SIZE_WORDS if words is None else words
+    if value is None or isinstance(value, bool):
+        return 0
+    if isinstance(value, (int, np.integer)):
+        return max(int(value), 0)
+
+    text = ' '.join(str(value).lower().split())
+    if text in words:
+        return words[text]
+    match = SIZE_PATTERN.match(text)
+    if not match:
+        return 0
+
+    number = float(match.group('number').replace(',', ''))
+    unit = match.group('unit') or match.group('range_unit')
+    number *= _UNIT_MULTIPLIERS.get(unit, 1)
+    if not np.isfinite(number):
+        return 0
+    return int(min(number, np.iinfo(np.int64).max // 2))
@@ -0,0 +1,84 @@
+# Title Matcher - single-pass senior/executive keyword detection
+# Compiled once per keyword set and shared by the per-lead and batch scoring paths
+
+import re
+
+import numpy as np
+import pandas as pd
+
+
+class TitleMatcher:
+    """
+    Detects senior and executive keywords in normalized job titles.
+
+    All keywords are compiled into one overlapping-match regex, so a title is
+    scanned once no matter how many keywords there are. Results are returned
+    as bit flags (SENIOR | EXECUTIVE).
+    """
+
+    SENIOR = 1
+    EXECUTIVE = 2
+
+    def __init__(self, senior_titles, executive_titles):
+        categories = {}
+        for keyword in senior_titles:
+            categories[keyword] = categories.get(keyword, 0) | self.SENIOR
+        for keyword in executive_titles:
+            categories[keyword] = categories.get(keyword, 0) | self.EXECUTIVE
+
+        # At each position the scan only reports the longest keyword starting
+        # there, so every keyword also carries the flags of the keywords it
+        # contains (e.g. 'director' contains 'cto', 'vice president' contains
+        # 'president'). This keeps results identical to separate substring checks.
+        self._flags = {}
+        for keyword in categories:
+            flags = 0
+            for other, other_flags in categories.items():
+                if other in keyword:
+                    flags |= other_flags
+            self._flags[keyword] = flags
+
+        keywords = sorted(categories, key=len, reverse=True)
+        self._pattern = re.compile('(?=(' + '|'.join(re.escape(k) for k in keywords) + '))')
+        self._all_flags = self.SENIOR | self.EXECUTIVE
+
+    def match(self, title):
+        """
+        Scan one normalized title.
+
+        Args:
+            title (str): Normalized job title
+
+        Returns:
+            int: Bit flags of the categories found (0 if none)
+        """
+        flags = 0
+        for match in self._pattern.finditer(title):
+            flags |= self._flags[match.group(1)]
+            if flags == self._all_flags:
+                break
+        return flags
+
+    def match_series(self, titles):
+        """
+        Scan a Series of normalized titles, matching each distinct title once.
+
+        Args:
+            titles: pandas Series (or sequence) of normalized job titles
+
+        Returns:
+            numpy.ndarray: Bit flags per title (uint8), in input order
+        """
+        codes, uniques = pd.factorize(pd.Series(titles, dtype=object).fillna(''))
+        unique_flags = np.fromiter(
+            (self.match(title) for title in uniques), dtype=np.uint8, count=len(uniques)
+        )
+        return unique_flags[codes]
+
+    def is_senior(self, title):
+        """Return True if the title contains a senior keyword."""
+        return bool(self.match(title) & self.SENIOR)
+
+    def is_executive(self, title):
+        """Return True if the title contains an executive keyword."""
+        return bool(self.match(title) & self.EXECUTIVE)
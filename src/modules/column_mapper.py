@@ -4,6 +4,7 @@
 import pandas as pd
 import re
 from typing import Dict, List, Tuple, Optional
+from profiling import profiled
 
 class ColumnMapper:
     """
@@ -60,6 +61,7 @@ class ColumnMapper:
             'company_size': [r'.*size.*', r'.*employee.*', r'.*staff.*', r'.*team.*']
         }
     
+    @profiled('mapping.auto_map_columns')
     def auto_map_columns(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str], Dict[str, str]]:
         """
         Automatically detect and map column variations to standard format.
@@ -161,6 +163,7 @@ class ColumnMapper:
         
         return suggestions
     
+    @profiled('mapping.apply_manual_mapping')
     def apply_manual_mapping(self, df: pd.DataFrame, manual_mapping: Dict[str, str]) -> Tuple[pd.DataFrame, List[str]]:
         """
         Apply manual column mappings specified by user.
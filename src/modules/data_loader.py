@@ -0,0 +1,336 @@
+# Lead Data Loading Module
+# Shared loading and cleaning steps for the app and the streaming scorer
+# Reads only the lead columns from CSV, Parquet, Feather and Arrow IPC files
+
+import os
+import pandas as pd
+from typing import Dict, Iterator, List, Optional
+from column_mapper import ColumnMapper
+from size_parser import parse_company_sizes
+from profiling import profiled
+
+REQUIRED_COLUMNS = ['name', 'email', 'company', 'job_title', 'company_size']
+
+# Accepted upload types; Parquet and Arrow need the optional pyarrow package
+LEAD_FILE_TYPES = ['csv', 'parquet', 'feather', 'arrow', 'ipc']
+FILE_EXTENSIONS = {
+    '.csv': 'csv', '.txt': 'csv',
+    '.parquet': 'parquet', '.pq': 'parquet',
+    '.feather': 'arrow', '.arrow': 'arrow', '.ipc': 'arrow'
+}
+
+
+@profiled('loading.clean_leads', standalone=False)
+def clean_leads(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Clean mapped lead data before scoring.
+
+    - Removes completely empty rows
+    - Fills missing name / company / job title with placeholders
+    - Parses company_size ("1.5k", "50-100", "Mid-size", ...) to int (0 if invalid)
+
+    Args:
+        df (pd.DataFrame): Lead data with standard column names
+
+    Returns:
+        pd.DataFrame: Cleaned copy of the data
+    """
+    df_clean = df.dropna(how='all').fillna({
+        'name': 'Unknown',
+        'company': 'Unknown Company',
+        'job_title': 'Unknown'
+    })
+    df_clean['company_size'] = parse_company_sizes(df_clean['company_size'])
+    return df_clean
+
+
+def detect_file_format(source, file_format: Optional[str] = None) -> str:
+    """
+    Work out a lead file's format from its extension.
+
+    Args:
+        source: File path or buffer (an uploaded file's .name is used)
+        file_format (str): Explicit format, returned as-is when given
+
+    Returns:
+        str: 'csv', 'parquet' or 'arrow' (Feather v2 / Arrow IPC file)
+
+    Raises:
+        ValueError: If the extension is not a supported lead file type
+    """
+    if file_format:
+        file_format = file_format.lower()
+    else:
+        name = getattr(source, 'name', source)
+        extension = os.path.splitext(name)[1].lower() if isinstance(name, (str, os.PathLike)) else ''
+        # Unnamed buffers and extension-less paths are read as CSV
+        file_format = FILE_EXTENSIONS.get(extension) if extension else 'csv'
+    if file_format in ('feather', 'ipc'):
+        file_format = 'arrow'
+    if file_format not in ('csv', 'parquet', 'arrow'):
+        raise ValueError(f"Unsupported lead file type: {source} "
+                         f"(expected one of: {', '.join(LEAD_FILE_TYPES)})")
+    return file_format
+
+
+def _pyarrow():
+    # Parquet / Arrow support is optional; CSV needs only pandas
+    try:
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError("Reading Parquet, Feather or Arrow files requires pyarrow "
+                          "(pip install pyarrow)") from exc
+    return pyarrow
+
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def _arrow_source(source):
+    """A memory-mappable path as-is; buffers wrapped without copying."""
+    if hasattr(source, 'getbuffer'):
+        return _pyarrow().BufferReader(source.getbuffer())
+    if hasattr(source, 'read'):
+        _rewind(source)
+        return _pyarrow().BufferReader(source.read())
+    return source
+
+
+def read_lead_columns(source, file_format: Optional[str] = None) -> List[str]:
+    """
+    Read a lead file's column names without loading any rows.
+
+    CSV reads just the header line; Parquet and Arrow read the schema.
+
+    Args:
+        source: File path or buffer
+        file_format (str): Optional format override (see detect_file_format)
+
+    Returns:
+        List[str]: Column names in file order
+    """
+    file_format = detect_file_format(source, file_format)
+    if file_format == 'csv':
+        _rewind(source)
+        columns = pd.read_csv(source, nrows=0).columns.tolist()
+        _rewind(source)
+        return columns
+
+    pa = _pyarrow()
+    if file_format == 'parquet':
+        schema = pa.parquet.read_schema(_arrow_source(source), memory_map=True)
+    else:
+        arrow_source = _arrow_source(source)
+        if isinstance(arrow_source, str):
+            arrow_source = pa.memory_map(arrow_source)
+        schema = pa.ipc.open_file(arrow_source).schema
+    return [name for name in schema.names if name != '__index_level_0__']
+
+
+def detect_column_mapping(source, file_format: Optional[str] = None) -> Dict[str, str]:
+    """
+    Auto-map a lead file's columns from its header / schema only.
+
+    Args:
+        source: File path or buffer
+        file_format (str): Optional format override (see detect_file_format)
+
+    Returns:
+        Dict[str, str]: {original_column: standard_name} rename mapping
+    """
+    header = pd.DataFrame(columns=read_lead_columns(source, file_format))
+    _, _, column_mapping = ColumnMapper().auto_map_columns(header)
+    return {original: standard for standard, original in column_mapping.items()}
+
+
+def lead_source_columns(columns: List[str], column_mapping: Dict[str, str]) -> Dict[str, str]:
+    """
+    Pick the file columns that feed the required lead fields.
+
+    Args:
+        columns (List[str]): Column names in the file
+        column_mapping (Dict[str, str]): {original_column: standard_name}
+
+    Returns:
+        Dict[str, str]: {file_column: standard_name}, one per required field found
+
+    Raises:
+        ValueError: If a required field has no source column
+    """
+    sources = {}
+    for standard in REQUIRED_COLUMNS:
+        mapped = [original for original, target in column_mapping.items()
+                  if target == standard and original in columns]
+        if mapped:
+            sources[mapped[0]] = standard
+        elif standard in columns and standard not in column_mapping:
+            sources[standard] = standard
+
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in sources.values()]
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+    return sources
+
+
+def _lead_sources(source, column_mapping, file_format):
+    if column_mapping is None:
+        column_mapping = detect_column_mapping(source, file_format)
+    return lead_source_columns(read_lead_columns(source, file_format), column_mapping)
+
+
+@profiled('loading.load_leads')
+def load_leads(source, column_mapping: Optional[Dict[str, str]] = None,
+               file_format: Optional[str] = None, all_columns: bool = False) -> pd.DataFrame:
+    """
+    Load a CSV, Parquet, Feather or Arrow IPC lead file with standard column names.
+
+    Only the five lead columns are read: CSV via usecols with string dtypes,
+    Parquet and Arrow via column selection on a memory-mapped file, so load
+    time and memory follow the lead columns rather than the export's width.
+
+    Args:
+        source: File path or buffer (e.g. a Streamlit upload)
+        column_mapping (Dict[str, str]): Optional {original_column: standard_name}
+            rename mapping (auto-detected from the header when omitted)
+        file_format (str): Optional format override (see detect_file_format)
+        all_columns (bool): Read every column instead, renamed where mapped
+            (for manual mapping, which needs to preview the other columns)
+
+    Returns:
+        pd.DataFrame: Lead data, not yet cleaned
+
+    Raises:
+        ValueError: If required columns are missing (unless all_columns)
+    """
+    file_format = detect_file_format(source, file_format)
+    if all_columns:
+        rename = column_mapping or {}
+        columns = None
+    else:
+        rename = _lead_sources(source, column_mapping, file_format)
+        columns = list(rename)
+
+    return _read_columns(source, columns, file_format).rename(columns=rename)
+
+
+def _read_columns(source, columns, file_format):
+    """Read the given columns (None: all) of a lead file; selected CSV columns as strings."""
+    if file_format == 'csv':
+        _rewind(source)
+        return pd.read_csv(source, usecols=columns, dtype=str if columns is not None else None)
+    pa = _pyarrow()
+    arrow_source = _arrow_source(source)
+    if file_format == 'parquet':
+        table = pa.parquet.read_table(arrow_source, columns=columns, memory_map=True)
+    else:
+        table = pa.feather.read_table(arrow_source, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def load_passthrough_columns(source, column_mapping: Optional[Dict[str, str]] = None,
+                             file_format: Optional[str] = None) -> pd.DataFrame:
+    """
+    Load the columns of a lead file that load_leads skips (record IDs, owner, ...).
+
+    Scoring only needs the lead columns; these are read separately, when
+    an export needs them, and joined back with attach_passthrough_columns.
+    Row labels match those of load_leads.
+
+    Args:
+        source: File path or buffer
+        column_mapping (Dict[str, str]): Optional {original_column: standard_name}
+            rename mapping, as given to load_leads
+        file_format (str): Optional format override (see detect_file_format)
+
+    Returns:
+        pd.DataFrame: Every non-lead column, CSV values as text
+    """
+    file_format = detect_file_format(source, file_format)
+    lead_columns = _lead_sources(source, column_mapping, file_format)
+    columns = [column for column in read_lead_columns(source, file_format) if column not in lead_columns]
+    if not columns:
+        return pd.DataFrame()
+    return _read_columns(source, columns, file_format)
+
+
+def attach_passthrough_columns(scored_df: pd.DataFrame, passthrough_df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Join passthrough columns back onto scored leads by row label.
+
+    Scored rows keep their order; passthrough columns come after the
+    scored columns, with an '_original' suffix where a name is taken.
+
+    Args:
+        scored_df (pd.DataFrame): Scored (and possibly enriched) leads
+        passthrough_df (pd.DataFrame): From load_passthrough_columns, or None
+
+    Returns:
+        pd.DataFrame: scored_df with the passthrough columns added
+    """
+    if passthrough_df is None or not len(passthrough_df.columns):
+        return scored_df
+    return scored_df.join(passthrough_df, rsuffix='_original')
+
+
+def _arrow_batches(source, columns, file_format, chunksize):
+    pa = _pyarrow()
+    arrow_source = _arrow_source(source)
+    if file_format == 'parquet':
+        yield from pa.parquet.ParquetFile(arrow_source, memory_map=True).iter_batches(
+            batch_size=chunksize, columns=columns)
+    else:
+        if isinstance(arrow_source, str):
+            arrow_source = pa.memory_map(arrow_source)
+        # One record batch decoded at a time (compressed files included), so
+        # memory follows the batch size rather than the file
+        reader = pa.ipc.open_file(arrow_source)
+        indices = [reader.schema.get_field_index(column) for column in columns]
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i).select(indices)
+            for offset in range(0, batch.num_rows, chunksize):
+                yield batch.slice(offset, chunksize)
+
+
+def iter_lead_chunks(path, chunksize: int = 100_000,
+                     column_mapping: Optional[Dict[str, str]] = None,
+                     file_format: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a lead file in chunks, mapping and cleaning each chunk.
+
+    The column mapping is detected once from the header so every chunk is
+    renamed the same way, and only the lead columns are read. Memory use is
+    bounded by chunksize, not file size.
+
+    Args:
+        path: CSV, Parquet, Feather or Arrow IPC file path
+        chunksize (int): Rows per chunk
+        column_mapping (Dict[str, str]): Optional {original_column: standard_name}
+            rename mapping (auto-detected when omitted)
+        file_format (str): Optional format override (see detect_file_format)
+
+    Yields:
+        pd.DataFrame: Cleaned chunk with standard column names
+
+    Raises:
+        ValueError: If required columns are still missing after mapping
+    """
+    file_format = detect_file_format(path, file_format)
+    rename = _lead_sources(path, column_mapping, file_format)
+
+    if file_format == 'csv':
+        _rewind(path)
+        for chunk in pd.read_csv(path, usecols=list(rename), dtype=str, chunksize=chunksize):
+            yield clean_leads(chunk.rename(columns=rename))
+        return
+
+    start = 0
+    for batch in _arrow_batches(path, list(rename), file_format, chunksize):
+        chunk = batch.to_pandas().rename(columns=rename)
+        # Row labels continue across chunks, as with CSV chunks
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield clean_leads(chunk)
@@ -0,0 +1,190 @@
+# Dedup Index - emails seen in earlier uploads, kept across sessions
+# A memory-mapped Bloom filter screens each batch; SQLite confirms the hits exactly
+
+import math
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from score_store import default_cache_path
+
+# Emails the Bloom filter is sized for, and its false positive rate at that size.
+# Past capacity it only gets less selective: the exact check keeps results correct.
+DEFAULT_CAPACITY = 10_000_000
+DEFAULT_ERROR_RATE = 0.01
+
+# Emails checked / added per step, so memory stays flat however large the upload
+BATCH_ROWS = 100_000
+
+
+def normalize_emails(emails):
+    """
+    Emails as compared across uploads: stripped and lower-cased.
+
+    Args:
+        emails: pandas Series (or sequence) of email addresses
+
+    Returns:
+        pandas Series: Normalized emails ('' where there is no '@')
+    """
+    emails = emails if isinstance(emails, pd.Series) else pd.Series(emails, dtype=object)
+    emails = emails.astype(object)
+    emails = emails.where(emails.notna(), '').astype(str).str.strip().str.lower()
+    return emails.where(emails.str.contains('@', regex=False), '')
+
+
+def bloom_parameters(capacity, error_rate):
+    """
+    Bloom filter size for a capacity and false positive rate.
+
+    Returns:
+        tuple: (bits, hash count); bits rounded up to whole 64-bit words
+    """
+    bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+    bits = max(64, -(-bits // 64) * 64)
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+class DedupIndex:
+    """
+    Persistent set of normalized emails from every upload recorded so far.
+
+    Lookups hash each email once and test its Bloom filter bits with array
+    operations; only emails the filter reports as present (real repeats
+    plus ~error_rate of new ones) are confirmed against the exact SQLite
+    set. The filter is a memory-mapped file, so it is not loaded into
+    memory and checks cost O(rows).
+    """
+
+    def __init__(self, path=None, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        """
+        Args:
+            path (str): SQLite file (default: seen_emails.sqlite in the cache
+                directory, see default_cache_path); the Bloom filter is kept
+                next to it with a .bloom extension. ':memory:' for a
+                throwaway index
+            capacity (int): Emails the filter is sized for (new indexes only)
+            error_rate (float): Bloom false positive rate at capacity (new indexes only)
+        """
+        self.path = path or default_cache_path('seen_emails.sqlite')
+        self._connection = sqlite3.connect(self.path)
+        self._connection.execute('PRAGMA temp_store = MEMORY')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS emails (email TEXT PRIMARY KEY) WITHOUT ROWID')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS bloom (bits INTEGER NOT NULL, hashes INTEGER NOT NULL)')
+        self._connection.execute('CREATE TEMP TABLE IF NOT EXISTS wanted (email TEXT PRIMARY KEY)')
+
+        stored = self._connection.execute('SELECT bits, hashes FROM bloom').fetchone()
+        if stored is None:
+            stored = bloom_parameters(capacity, error_rate)
+            self._connection.execute('INSERT INTO bloom VALUES (?, ?)', stored)
+        self._connection.commit()
+        self.bits, self.hashes = stored
+        self._words = self._open_filter()
+
+    def _open_filter(self):
+        words = self.bits // 64
+        if self.path == ':memory:':
+            return np.zeros(words, dtype=np.uint64)
+        bloom_path = os.path.splitext(self.path)[0] + '.bloom'
+        rebuild = not os.path.exists(bloom_path) or os.path.getsize(bloom_path) != words * 8
+        filter_words = np.memmap(bloom_path, dtype=np.uint64, mode='w+' if rebuild else 'r+', shape=(words,))
+        if rebuild:
+            # Missing or damaged filter: re-derive it from the exact set
+            filter_words[:] = 0
+            cursor = self._connection.execute('SELECT email FROM emails')
+            while True:
+                rows = cursor.fetchmany(BATCH_ROWS)
+                if not rows:
+                    break
+                self._set_bits(filter_words, np.array([row[0] for row in rows], dtype=object))
+            filter_words.flush()
+        return filter_words
+
+    def _positions(self, emails):
+        """Bloom bit positions per email, (rows, hashes) uint64 (double hashing)."""
+        hashed = pd.util.hash_array(emails, categorize=False)
+        first = hashed & np.uint64(0xFFFFFFFF)
+        step = (hashed >> np.uint64(32)) | np.uint64(1)
+        rounds = np.arange(self.hashes, dtype=np.uint64)
+        return (first[:, None] + rounds[None, :] * step[:, None]) % np.uint64(self.bits)
+
+    def _set_bits(self, filter_words, emails):
+        positions = self._positions(emails).ravel()
+        np.bitwise_or.at(filter_words, positions >> np.uint64(6),
+                         np.left_shift(np.uint64(1), positions & np.uint64(63)))
+
+    def _maybe_present(self, emails):
+        positions = self._positions(emails)
+        bits = (self._words[positions >> np.uint64(6)] >> (positions & np.uint64(63))) & np.uint64(1)
+        return bits.all(axis=1)
+
+    def _confirm(self, emails):
+        """Which of these (distinct) emails are in the exact set."""
+        self._connection.execute('DELETE FROM wanted')
+        self._connection.executemany('INSERT INTO wanted VALUES (?)', ((email,) for email in sorted(emails)))
+        # CROSS JOIN keeps wanted as the outer loop (SQLite may otherwise scan every email)
+        present = {row[0] for row in self._connection.execute(
+            'SELECT emails.email FROM wanted CROSS JOIN emails ON emails.email = wanted.email'
+        )}
+        return np.fromiter((email in present for email in emails), dtype=bool, count=len(emails))
+
+    def contains(self, emails):
+        """
+        Which emails were recorded by an earlier add().
+
+        Args:
+            emails: pandas Series (or sequence) of email addresses (normalized here)
+
+        Returns:
+            numpy.ndarray: bool per email (False for invalid emails)
+        """
+        normalized = normalize_emails(emails).to_numpy(dtype=object)
+        seen = np.zeros(len(normalized), dtype=bool)
+        for start in range(0, len(normalized), BATCH_ROWS):
+            batch = normalized[start:start + BATCH_ROWS]
+            codes, distinct = pd.factorize(batch)
+            candidates = np.flatnonzero(self._maybe_present(distinct) & (distinct != ''))
+            found = np.zeros(len(distinct), dtype=bool)
+            if len(candidates):
+                found[candidates] = self._confirm(distinct[candidates])
+            seen[start:start + len(batch)] = found[codes]
+        return seen
+
+    def add(self, emails):
+        """Record emails (normalized here; invalid ones are skipped)."""
+        normalized = normalize_emails(emails).to_numpy(dtype=object)
+        for start in range(0, len(normalized), BATCH_ROWS):
+            distinct = pd.unique(normalized[start:start + BATCH_ROWS])
+            distinct = distinct[distinct != '']
+            self._set_bits(self._words, distinct)
+            self._connection.executemany('INSERT OR IGNORE INTO emails (email) VALUES (?)',
+                                         ((email,) for email in sorted(distinct)))
+        self._connection.commit()
+        if isinstance(self._words, np.memmap):
+            self._words.flush()
+
+    def check_and_add(self, emails):
+        """
+        Flag emails seen in earlier uploads, then record this upload's.
+
+        Repeats within the same batch are not flagged (see the
+        duplicate_email enrichment column for those).
+
+        Returns:
+            numpy.ndarray: bool per email, True if recorded before this call
+        """
+        seen = self.contains(emails)
+        self.add(emails)
+        return seen
+
+    def __len__(self):
+        return self._connection.execute('SELECT COUNT(*) FROM emails').fetchone()[0]
+
+    def close(self):
+        if isinstance(self._words, np.memmap):
+            self._words.flush()
+        self._words = None
+        self._connection.close()
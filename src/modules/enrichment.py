@@ -2,45 +2,33 @@
 # Adds useful context for prioritization without altering required inputs
 
 from typing import Tuple, Dict
+import numpy as np
 import pandas as pd
+from dedup_index import normalize_emails
 from industry_detector import IndustryDetector
+from lead_features import derive_lead_features, has_lead_features
+from near_duplicates import near_duplicate_clusters
+from profiling import profiled, profile_stage
 
 
-def _extract_email_domain(email: str) -> str:
-    if not isinstance(email, str):
-        try:
-            email = str(email)
-        except Exception:
-            return ''
-    email = email.strip().lower()
-    if '@' not in email:
-        return ''
-    try:
-        domain = email.split('@')[1].strip()
-        if domain.startswith('www.'):
-            domain = domain[4:]
-        return domain
-    except Exception:
-        return ''
-
-
-def _is_corporate_domain(domain: str) -> bool:
-    if not domain:
-        return False
-    personal = {
-        'gmail.com','yahoo.com','hotmail.com','outlook.com','aol.com','icloud.com','live.com','msn.com','mail.com','protonmail.com','yandex.com','qq.com','sina.com','zoho.com'
-    }
-    return domain not in personal
+def _key_part(values: pd.Series) -> pd.Series:
+    """Lower-cased, stripped text for duplicate keys (falsy values as '')."""
+    # Hashed to distinct values first; each is normalized once
+    codes, uniques = pd.factorize(values.astype(object), use_na_sentinel=False)
+    normalized = np.array([str(value or '').strip().lower() for value in uniques], dtype=object)
+    return pd.Series(normalized[codes], index=values.index, dtype=object)
 
 
-def _guess_website(domain: str) -> str:
-    if not domain:
-        return ''
-    # Very simple guess (kept offline-friendly)
-    return f"https://{domain}"
+def _column(df: pd.DataFrame, column: str) -> pd.Series:
+    if column in df.columns:
+        return df[column]
+    return pd.Series('', index=df.index, dtype=object)
 
 
-def enrich_leads(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, int]]:
+@profiled('enrichment.enrich_leads')
+def enrich_leads(df: pd.DataFrame, industry_cache=None, scorer=None,
+                 near_duplicates: bool = True, dedup_index=None,
+                 seen_emails=None) -> Tuple[pd.DataFrame, Dict[str, int]]:
     """
     Add light enrichment columns:
     - email_domain
@@ -49,37 +37,51 @@ def enrich_leads(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, int]]:
     - industry (via IndustryDetector using company + domain)
     - duplicate_email (bool)
     - duplicate_name_company (bool)
+    - near_duplicate_cluster (int) and near_duplicate (bool): MinHash/LSH
+      clusters of similar name + company ("Lopez, Olga" at "CodeStream Ltd"
+      and "Olga Lopez" at "CodeStream"), see near_duplicates.py; every
+      lead but the first of its cluster is flagged. Skipped when
+      near_duplicates is False.
+    - seen_before (bool): email recorded in an earlier upload, when a
+      dedup_index (DedupIndex) is given; this batch's emails are then
+      recorded in it too. Given seen_emails instead (normalized emails
+      flagged by an earlier enrichment of the same upload, see
+      seen_before_emails), the flags are taken from it and no index is
+      read or written, so re-enriching an upload reports the same leads.
+
+    email_domain and is_corporate_email are the shared derived features
+    (lead_features): read from df when already attached, otherwise derived
+    here (with scorer's rules, if given) and kept for scoring downstream.
+    Every column is built with whole-column string operations and hashing
+    (no row-wise apply); industry is detected once per distinct
+    (company, domain) pair. With an industry_cache (IndustryCache), pairs
+    seen in earlier uploads are read from it instead of re-detected.
 
     Returns the enriched DataFrame and a small report dict.
     """
     detector = IndustryDetector()
 
-    enriched = df.copy()
-
     # Email domain and corporate flag
-    enriched['email_domain'] = enriched['email'].apply(_extract_email_domain)
-    enriched['is_corporate_email'] = enriched['email_domain'].apply(_is_corporate_domain)
+    enriched = df.copy() if has_lead_features(df) else derive_lead_features(df, scorer)
+    domains = enriched['email_domain']
+    has_domain = (domains != '').to_numpy()
 
     # Website guess
-    enriched['website_guess'] = enriched['email_domain'].apply(_guess_website)
+    enriched['website_guess'] = np.where(has_domain, 'https://' + domains, '')
 
     # Industry detection
-    def _detect(row):
-        company = row.get('company', '')
-        domain = row.get('email_domain', '')
-        return detector.detect_industry(company, domain)
-    enriched['industry'] = enriched.apply(_detect, axis=1)
+    with profile_stage('enrichment.industry'):
+        enriched['industry'] = detector.detect_industries(_column(enriched, 'company'), domains,
+                                                          cache=industry_cache)
 
     # Duplicates
     enriched['duplicate_email'] = enriched.duplicated(subset=['email'], keep='first')
     # Name+company duplicate marker (normalized to lower + stripped)
-    def _name_company_key(row):
-        name = str(row.get('name', '') or '').strip().lower()
-        company = str(row.get('company', '') or '').strip().lower()
-        return f"{name}|{company}"
-    enriched['_name_company_key'] = enriched.apply(_name_company_key, axis=1)
-    enriched['duplicate_name_company'] = enriched.duplicated(subset=['_name_company_key'], keep='first')
-    enriched.drop(columns=['_name_company_key'], inplace=True)
+    name_company = pd.DataFrame({
+        'name': _key_part(_column(enriched, 'name')),
+        'company': _key_part(_column(enriched, 'company'))
+    })
+    enriched['duplicate_name_company'] = name_company.duplicated(keep='first').to_numpy()
 
     report = {
         'rows': len(enriched),
@@ -87,4 +89,32 @@ def enrich_leads(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, int]]:
         'duplicate_name_company_count': int(enriched['duplicate_name_company'].sum())
     }
 
-    return enriched, report
\ No newline at end of file
+    # Near-duplicates (similar, not just equal, name + company)
+    if near_duplicates:
+        with profile_stage('enrichment.near_duplicates'):
+            clusters = near_duplicate_clusters(_column(enriched, 'name'), _column(enriched, 'company'))
+        enriched['near_duplicate_cluster'] = clusters
+        enriched['near_duplicate'] = pd.Series(clusters).duplicated(keep='first').to_numpy()
+        report['near_duplicate_count'] = int(enriched['near_duplicate'].sum())
+
+    # Leads from earlier uploads (persistent index across uploads)
+    if seen_emails is not None or dedup_index is not None:
+        with profile_stage('enrichment.seen_before'):
+            if seen_emails is not None:
+                enriched['seen_before'] = normalize_emails(enriched['email']).isin(seen_emails).to_numpy()
+            else:
+                enriched['seen_before'] = dedup_index.check_and_add(enriched['email'])
+        report['seen_before_count'] = int(enriched['seen_before'].sum())
+
+    return enriched, report
+
+
+def seen_before_emails(enriched: pd.DataFrame) -> frozenset:
+    """
+    Normalized emails flagged seen_before in an enriched batch.
+
+    Passed back to enrich_leads as seen_emails when the same upload is
+    enriched again (e.g. on a Streamlit rerun), so its flags do not change
+    now that the index holds the upload's own emails.
+    """
+    return frozenset(normalize_emails(enriched.loc[enriched['seen_before'], 'email']))
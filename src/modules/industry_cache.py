@@ -0,0 +1,108 @@
+# Industry Cache - persistent (company, domain) -> industry results for enrichment
+# Entries are keyed by (taxonomy version, hash of the normalized pair)
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from score_store import default_cache_path
+
+
+class IndustryCache:
+    """
+    SQLite store of detected industries by (company, domain) pair.
+
+    Keys include IndustryDetector.taxonomy_version, so editing the
+    detector's keyword lists starts a fresh cache instead of serving stale
+    industries.
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): SQLite file (default: industries.sqlite in the cache
+                directory, see default_cache_path); ':memory:' for a
+                throwaway cache
+        """
+        self.path = path or default_cache_path('industries.sqlite')
+        self._connection = sqlite3.connect(self.path)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS industries ('
+            ' taxonomy_version TEXT NOT NULL,'
+            ' pair_key INTEGER NOT NULL,'
+            ' industry TEXT NOT NULL,'
+            ' PRIMARY KEY (taxonomy_version, pair_key)'
+            ') WITHOUT ROWID'
+        )
+        self._connection.execute('CREATE TEMP TABLE IF NOT EXISTS wanted (pair_key INTEGER PRIMARY KEY)')
+        self._connection.commit()
+
+    @staticmethod
+    def pair_keys(companies, domains):
+        """
+        64-bit key per normalized (company, domain) pair.
+
+        Args:
+            companies: Normalized company names
+            domains: Normalized email domains, same length
+
+        Returns:
+            numpy.ndarray: int64 key per pair
+        """
+        pairs = [f"{company}\x00{domain}" for company, domain in zip(companies, domains)]
+        hashes = pd.util.hash_array(np.array(pairs, dtype=object), categorize=False)
+        # SQLite integers are signed, so store the uint64 hash as int64
+        return hashes.view(np.int64)
+
+    def lookup(self, taxonomy_version, keys):
+        """
+        Find cached industries for a batch of pair keys.
+
+        Only the requested keys are read (joined through a temp table), so
+        lookups cost the size of the batch, not of the cache.
+
+        Args:
+            taxonomy_version (str): IndustryDetector.taxonomy_version
+            keys: int64 pair key per pair
+
+        Returns:
+            tuple: (found bool array, industry object array; None where not found)
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        self._connection.execute('DELETE FROM wanted')
+        # Distinct keys in sorted order: appends to the temp B-tree instead of random inserts
+        self._connection.executemany('INSERT INTO wanted VALUES (?)', ((key,) for key in np.unique(keys).tolist()))
+        # CROSS JOIN keeps wanted as the outer loop (SQLite may otherwise scan the whole version)
+        rows = self._connection.execute(
+            'SELECT industries.pair_key, industries.industry FROM wanted'
+            ' CROSS JOIN industries ON industries.taxonomy_version = ? AND industries.pair_key = wanted.pair_key',
+            (taxonomy_version,)
+        ).fetchall()
+
+        industries = np.full(len(keys), None, dtype=object)
+        if rows:
+            stored_keys, stored_industries = zip(*rows)
+            positions = pd.Index(np.array(stored_keys, dtype=np.int64)).get_indexer(keys)
+            found = positions >= 0
+            industries[found] = np.array(stored_industries, dtype=object)[positions[found]]
+        else:
+            found = np.zeros(len(keys), dtype=bool)
+        return found, industries
+
+    def save(self, taxonomy_version, keys, industries):
+        """Store industries for a batch of pair keys (existing entries are replaced)."""
+        keys = np.asarray(keys, dtype=np.int64)
+        order = np.argsort(keys, kind='stable')
+        rows = zip([taxonomy_version] * len(keys), keys[order].tolist(),
+                   np.asarray(industries, dtype=object)[order].tolist())
+        self._connection.executemany('INSERT OR REPLACE INTO industries VALUES (?, ?, ?)', rows)
+        self._connection.commit()
+
+    def prune(self, keep_version):
+        """Delete industries of every taxonomy version except keep_version."""
+        self._connection.execute('DELETE FROM industries WHERE taxonomy_version != ?', (keep_version,))
+        self._connection.commit()
+
+    def close(self):
+        self._connection.close()
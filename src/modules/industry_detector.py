@@ -1,6 +1,25 @@
 # Industry Detection Module
 # Detects company industry from company names and email domains
 
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+# Bump when detect_industry's scoring changes (keyword edits are detected automatically)
+DETECTION_VERSION = 1
+
+
+def _normalize_company(company_name):
+    """Company name as detect_industry reads it ('' for falsy values)."""
+    return str(company_name).lower().strip() if company_name else ''
+
+
+def _normalize_domain(email_domain):
+    """Email domain as detect_industry reads it ('' for falsy values)."""
+    return str(email_domain).lower().strip() if email_domain else ''
+
 class IndustryDetector:
     """
     Modular industry detection system.
@@ -126,6 +145,79 @@ class IndustryDetector:
                 
         return 'general'
     
+    @property
+    def taxonomy_version(self):
+        """
+        Hash of the indicator lists (and the scoring method version).
+        
+        Persistent industry caches key entries by it, so editing any
+        keyword list invalidates previously cached industries.
+        """
+        indicators = {
+            name: list(value) for name, value in sorted(vars(self).items())
+            if name.endswith(('_indicators', '_domains'))
+        }
+        payload = json.dumps([DETECTION_VERSION, indicators], sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+    
+    @staticmethod
+    def _normalized_codes(values, normalize):
+        """Integer code per row and the distinct normalized texts."""
+        codes, uniques = pd.factorize(values.astype(object), use_na_sentinel=False)
+        # Normalize each distinct raw value once, then merge equal texts
+        text_codes, texts = pd.factorize(pd.Series([normalize(value) for value in uniques], dtype=object))
+        return text_codes[codes], texts
+    
+    def detect_industries(self, company_names, email_domains=None, cache=None):
+        """
+        Columnar detect_industry over whole columns.
+        
+        Company names and domains are lower-cased and stripped as
+        detect_industry does, then (company, domain) pairs are hashed into
+        integer codes and each distinct pair is classified once, so cost
+        follows the number of distinct pairs rather than the number of rows.
+        
+        Args:
+            company_names: pandas Series (or sequence) of company names
+            email_domains: Series (or sequence) of email domains, same length (optional)
+            cache (IndustryCache): Optional persistent store of pair results
+                (see industry_cache.py); only pairs it lacks are detected
+            
+        Returns:
+            pandas Series: Industry per row, indexed like company_names
+        """
+        companies = company_names if isinstance(company_names, pd.Series) else pd.Series(company_names, dtype=object)
+        company_codes, company_texts = self._normalized_codes(companies, _normalize_company)
+        if email_domains is None:
+            domain_codes, domain_texts = np.zeros(len(companies), dtype=np.int64), pd.Index([''])
+        else:
+            domains = email_domains if isinstance(email_domains, pd.Series) else pd.Series(email_domains, dtype=object)
+            domain_codes, domain_texts = self._normalized_codes(domains, _normalize_domain)
+        
+        width = max(len(domain_texts), 1)
+        pair_codes, pairs = pd.factorize(company_codes.astype(np.int64) * width + domain_codes)
+        pair_companies = company_texts.take(pairs // width) if len(pairs) else pd.Index([], dtype=object)
+        pair_domains = domain_texts.take(pairs % width) if len(pairs) else pd.Index([], dtype=object)
+        
+        industries = np.empty(len(pairs), dtype=object)
+        missing = np.ones(len(pairs), dtype=bool)
+        if cache is not None:
+            version = self.taxonomy_version
+            keys = cache.pair_keys(pair_companies, pair_domains)
+            found, cached = cache.lookup(version, keys)
+            industries[found] = cached[found]
+            missing = ~found
+        
+        positions = np.flatnonzero(missing)
+        industries[positions] = [
+            self.detect_industry(pair_companies[position], pair_domains[position])
+            for position in positions.tolist()
+        ]
+        if cache is not None and len(positions):
+            cache.save(version, keys[positions], industries[positions])
+        
+        return pd.Series(industries[pair_codes], index=companies.index, dtype=object)
+    
     def _calculate_industry_score(self, text, indicators, domain_indicators=None):
         """
         Calculate confidence score for industry match.
@@ -4,6 +4,8 @@
 
 from industry_detector import IndustryDetector
 from industry_templates import IndustryTemplates
+from lead_features import email_domain as derive_email_domain
+from profiling import profiled
 
 def get_templates():
     """
@@ -67,14 +69,18 @@ def get_openers():
     ]
     return openers
 
-def generate_personalized_content(lead_data, content_type="both"):
+@profiled('outreach.generate_personalized_content', standalone=False)
+def generate_personalized_content(lead_data, content_type="both", features=None):
     """
     Generate personalized outreach content for a specific lead.
     Enhanced with industry detection and company size-based messaging.
     
     Args:
-        lead_data (dict): Lead information with name, company, job_title, etc.
+        lead_data (Lead or dict): Lead information with name, company, job_title, etc.
         content_type (str): "templates", "openers", or "both"
+        features: Optional derived columns for this lead (e.g. its scored
+            row): 'email_domain' (lead_features) and 'industry' (enrichment)
+            are used instead of being worked out again
         
     Returns:
         dict: Personalized templates and/or openers
@@ -89,16 +95,19 @@ def generate_personalized_content(lead_data, content_type="both"):
     industry_detector = IndustryDetector()
     industry_templates = IndustryTemplates()
     
-    # Extract email domain for industry detection
-    email_domain = ''
-    if email and '@' in str(email):
-        try:
-            email_domain = str(email).split('@')[1]
-        except IndexError:
-            email_domain = ''
+    features = features if features is not None else {}
+    
+    # Email domain for industry detection (shared lead_features normalization)
+    if 'email_domain' in features:
+        email_domain = features['email_domain']
+    else:
+        email_domain = derive_email_domain(email)
     
     # Detect industry
-    industry = industry_detector.detect_industry(company, email_domain)
+    if 'industry' in features:
+        industry = features['industry']
+    else:
+        industry = industry_detector.detect_industry(company, email_domain)
     
     # Determine appropriate goal based on job title (enhanced)
     goal = determine_goal_from_title(job_title)
@@ -0,0 +1,9 @@
+# Test configuration: keep cache files (score store, industry cache, compiled
+# domain table, dedup index) out of the real ~/.cache/lead_scorer
+import pytest
+
+@pytest.fixture(scope="session", autouse=True)
+def lead_scorer_cache_dir(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv('LEAD_SCORER_CACHE_DIR', str(tmp_path_factory.mktemp('lead_scorer_cache')))
+        yield
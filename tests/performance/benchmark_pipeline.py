@@ -0,0 +1,263 @@
+# Benchmark Suite for the Lead Scoring Pipeline
+# Throughput and peak memory per pipeline stage at several dataset sizes
+#
+# Usage (from the repository root):
+#   python tests/performance/benchmark_pipeline.py --sizes 1000 10000 100000
+#   python tests/performance/benchmark_pipeline.py --output benchmark.json \
+#       --baseline tests/performance/baseline.json --tolerance 0.2
+#   python tests/performance/benchmark_pipeline.py --save-baseline tests/performance/baseline.json
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src')
+for folder in ('utils', 'modules', 'core', ''):
+    sys.path.insert(0, os.path.join(SRC_DIR, folder))
+
+from column_mapper import ColumnMapper
+from data_loader import clean_leads
+from enrichment import enrich_leads
+from lead_record import Lead
+from lead_scoring_engine import LeadScorer
+from outreach_templates import generate_personalized_content
+from test_data_generator import ComplexTestDataGenerator
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+# Larger datasets repeat a generated base block (generation is per-row Python)
+MAX_GENERATED_ROWS = 100_000
+
+# Headers as they arrive in CRM exports, so the mapper has work to do
+RAW_HEADERS = {
+    'name': 'Full Name',
+    'email': 'Email Address',
+    'company': 'Company Name',
+    'job_title': 'Title',
+    'company_size': 'Employees'
+}
+
+
+def make_dataset(rows, seed=42):
+    """
+    Generate a messy lead dataset with standard column names.
+
+    Args:
+        rows (int): Number of leads
+        seed (int): Seed for reproducible data
+
+    Returns:
+        pd.DataFrame: Lead data
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    base = ComplexTestDataGenerator().generate_complex_dataset(min(rows, MAX_GENERATED_ROWS))
+    if rows <= len(base):
+        return base
+    repeats = -(-rows // len(base))
+    return pd.concat([base] * repeats, ignore_index=True).iloc[:rows]
+
+
+def _validate_csv_data(df):
+    # The app module imports Streamlit, so load it only when this stage runs
+    from app import validate_csv_data
+    return validate_csv_data(df)
+
+
+def _personalized_content(df):
+    return [generate_personalized_content(lead) for lead in Lead.iter_frame(df)]
+
+
+def build_stages(scorer):
+    """
+    Pipeline stages as (name, input kind, function, row limit).
+
+    Inputs follow the app's pipeline: 'raw' has CRM-style headers, 'mapped'
+    has standard column names, 'clean' has also been through clean_leads.
+    Stages that work one lead at a time run on at most row_limit rows.
+    """
+    return [
+        ('auto_map_columns', 'raw', lambda df: ColumnMapper().auto_map_columns(df), None),
+        ('validate_csv_data', 'mapped', _validate_csv_data, None),
+        ('enrich_leads', 'clean', enrich_leads, None),
+        ('score_leads_batch', 'clean', scorer.score_leads_batch, None),
+        ('score_leads_batch_with_explain', 'clean', scorer.score_leads_batch_with_explain, None),
+        ('generate_personalized_content', 'clean', _personalized_content, 10_000),
+    ]
+
+
+def measure(function, df, repeat=3, memory=True):
+    """
+    Time a stage and measure its peak traced memory.
+
+    One untimed warm-up call on a few rows loads lazy imports first. Timing
+    runs without tracemalloc (it slows allocation-heavy code); the memory
+    pass runs once afterwards.
+
+    Returns:
+        dict: seconds (best of repeat), rows_per_second, peak_memory_mb
+    """
+    function(df.iloc[:100])
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(df)
+        timings.append(time.perf_counter() - start)
+    seconds = min(timings)
+
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        try:
+            function(df)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'seconds': round(seconds, 6),
+        'rows_per_second': round(len(df) / seconds, 1) if seconds > 0 else None,
+        'peak_memory_mb': round(peak_mb, 3) if peak_mb is not None else None
+    }
+
+
+def machine_info():
+    """CPU model, logical CPU count and platform of this machine (recorded with results)."""
+    cpu = platform.processor()
+    try:
+        with open('/proc/cpuinfo') as f:
+            cpu = next((line.split(':', 1)[1].strip() for line in f if line.startswith('model name')), cpu)
+    except OSError:
+        pass
+    return {'cpu': cpu or platform.machine(), 'cpu_count': os.cpu_count(), 'platform': platform.platform()}
+
+
+def run_benchmarks(sizes, stages=None, repeat=3, memory=True, seed=42, log=print):
+    """
+    Run every selected stage at every dataset size.
+
+    Returns:
+        dict: {'meta': environment info, 'results': [per stage and size]}
+    """
+    scorer = LeadScorer()
+    selected = [stage for stage in build_stages(scorer) if not stages or stage[0] in stages]
+    results = []
+
+    for size in sizes:
+        mapped = make_dataset(size, seed=seed)
+        inputs = {
+            'raw': mapped.rename(columns=RAW_HEADERS),
+            'mapped': mapped,
+            'clean': clean_leads(mapped)
+        }
+        for name, kind, function, row_limit in selected:
+            df = inputs[kind]
+            if row_limit is not None:
+                df = df.iloc[:row_limit]
+            result = {'stage': name, 'rows': len(df), 'dataset_rows': size}
+            result.update(measure(function, df, repeat=repeat, memory=memory))
+            results.append(result)
+            log(f"{name:<32} {len(df):>10,} rows  {result['seconds']:>9.4f}s  "
+                f"{result['rows_per_second'] or 0:>14,.0f} rows/s  "
+                f"peak {result['peak_memory_mb'] if memory else '-'} MB")
+
+    meta = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        **machine_info(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'repeat': repeat,
+        'seed': seed
+    }
+    return {'meta': meta, 'results': results}
+
+
+def compare_to_baseline(current, baseline, tolerance=0.2):
+    """
+    Flag stages that got slower or use more memory than the baseline.
+
+    A regression is throughput below baseline * (1 - tolerance) or peak
+    memory above baseline * (1 + tolerance), matched by stage and dataset size.
+
+    Returns:
+        list: Regression dicts (empty if none)
+    """
+    previous = {(r['stage'], r['dataset_rows']): r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        before = previous.get((result['stage'], result['dataset_rows']))
+        if before is None:
+            continue
+        checks = [
+            ('rows_per_second', lambda now, then: now < then * (1 - tolerance)),
+            ('peak_memory_mb', lambda now, then: now > then * (1 + tolerance)),
+        ]
+        for metric, regressed in checks:
+            now, then = result.get(metric), before.get(metric)
+            if now is not None and then and regressed(now, then):
+                regressions.append({
+                    'stage': result['stage'], 'rows': result['rows'], 'metric': metric,
+                    'baseline': then, 'current': now, 'change': round(now / then - 1, 4)
+                })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the lead scoring pipeline")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Dataset sizes in rows (e.g. 1000 100000 10000000)")
+    parser.add_argument('--stages', nargs='+', help="Only run these stages")
+    parser.add_argument('--repeat', type=int, default=3, help="Timing runs per stage (best is kept)")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc pass")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--baseline', help="Compare against this JSON results file")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Allowed relative slowdown / memory growth (default 0.2)")
+    parser.add_argument('--save-baseline', help="Also write results as a new baseline file")
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.sizes, stages=args.stages, repeat=args.repeat,
+                             memory=not args.no_memory, seed=args.seed)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(current, f, indent=2)
+            print(f"Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(current, baseline, tolerance=args.tolerance)
+        recorded_on = {key: baseline['meta'].get(key) for key in ('cpu', 'cpu_count', 'platform')}
+        if recorded_on != machine_info():
+            print(f"Note: baseline was recorded on another machine ({recorded_on}); "
+                  f"throughput changes may not be regressions")
+        current['regressions'] = regressions
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(current, f, indent=2)
+        for regression in regressions:
+            print(f"REGRESSION {regression['stage']} @ {regression['rows']:,} rows: "
+                  f"{regression['metric']} {regression['baseline']} -> {regression['current']} "
+                  f"({regression['change']:+.1%})")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+# Smoke Test for the Benchmark Suite
+from benchmark_pipeline import build_stages, compare_to_baseline, run_benchmarks
+from lead_scoring_engine import LeadScorer
+
+def test_benchmark_smoke():
+    """Test a tiny benchmark run and the baseline comparison."""
+    current = run_benchmarks([60], repeat=1, log=lambda line: None)
+
+    stages = [result['stage'] for result in current['results']]
+    assert stages == [name for name, _, _, _ in build_stages(LeadScorer())]
+    for result in current['results']:
+        assert result['rows'] == 60
+        assert result['rows_per_second'] > 0 and result['peak_memory_mb'] > 0
+
+    # Same numbers: no regressions; half the throughput: flagged
+    assert compare_to_baseline(current, current) == []
+    slower = {'results': [dict(r, rows_per_second=r['rows_per_second'] / 2) for r in current['results']]}
+    regressions = compare_to_baseline(slower, current, tolerance=0.2)
+    assert len(regressions) == len(stages)
+    assert all(r['metric'] == 'rows_per_second' for r in regressions)
+
+if __name__ == "__main__":
+    test_benchmark_smoke()
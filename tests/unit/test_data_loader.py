@@ -0,0 +1,126 @@
+# Test Data Loading and Streaming Scoring
+import os
+import tempfile
+import pandas as pd
+from lead_scoring_engine import LeadScorer
+from data_loader import attach_passthrough_columns, clean_leads, iter_lead_chunks, load_leads, load_passthrough_columns
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'complex_test_leads.csv')
+
+def test_chunked_loading():
+    """Test that chunked loading maps and cleans every chunk the same way."""
+    print("Testing Chunked Loading:")
+    print("-" * 40)
+    
+    chunks = list(iter_lead_chunks(DATA_PATH, chunksize=7))
+    combined = pd.concat(chunks)
+    expected = clean_leads(pd.read_csv(DATA_PATH))
+    
+    print(f"Chunks: {len(chunks)} | Rows: {len(combined)}")
+    assert len(combined) == len(expected)
+    assert list(combined['company_size']) == list(expected['company_size'])
+
+def test_stream_scoring_matches_batch():
+    """Test that streamed scores match in-memory batch scores."""
+    print("\nTesting Streaming Scoring:")
+    print("-" * 40)
+    
+    scorer = LeadScorer()
+    batch = scorer.score_leads_batch(clean_leads(pd.read_csv(DATA_PATH))).sort_index()
+    streamed = pd.concat(scorer.score_csv_stream(DATA_PATH, chunksize=9))
+    
+    assert list(streamed['score']) == list(batch['score'])
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, 'scored.csv')
+        report = scorer.score_csv_to_file(DATA_PATH, output_path, chunksize=9, explain=True)
+        written = pd.read_csv(output_path)
+    
+    print(f"Report: {report}")
+    assert report['rows'] == len(written) == len(batch)
+    assert report['High'] == (batch['score'] == 'High').sum()
+    assert 'score_reasons' in written.columns
+
+def test_top_k_stream():
+    """Test that the streamed top k matches the in-memory top k."""
+    scorer = LeadScorer()
+    leads = clean_leads(pd.read_csv(DATA_PATH))
+    
+    expected = scorer.top_k(leads, 10)
+    streamed = scorer.top_k_stream(DATA_PATH, 10, chunksize=7)
+    
+    print(f"Top 10 rows: {list(streamed.index)}")
+    assert list(streamed.index) == list(expected.index)
+    assert list(streamed['score_points']) == list(expected['score_points'])
+
+def test_columnar_loading():
+    """Test that only the lead columns are read, from CSV, Parquet and Feather."""
+    print("\nTesting Column-Pruned Loading:")
+    print("-" * 40)
+    
+    # A wide CRM-style export: renamed lead columns plus unrelated fields
+    wide = pd.read_csv(DATA_PATH).rename(columns={'email': 'Email Address', 'job_title': 'Title',
+                                                  'company_size': 'Employees'})
+    for i in range(20):
+        wide[f'crm_field_{i}'] = i
+    expected = clean_leads(pd.read_csv(DATA_PATH))
+    scorer = LeadScorer()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = [os.path.join(tmp_dir, 'leads.csv')]
+        wide.to_csv(paths[0], index=False)
+        try:
+            wide.to_parquet(os.path.join(tmp_dir, 'leads.parquet'))
+            wide.to_feather(os.path.join(tmp_dir, 'leads.feather'))
+            paths += [os.path.join(tmp_dir, 'leads.parquet'), os.path.join(tmp_dir, 'leads.feather')]
+        except ImportError:
+            print("pyarrow not installed - checking CSV only")
+        
+        for path in paths:
+            loaded = load_leads(path)
+            streamed = pd.concat(iter_lead_chunks(path, chunksize=7))
+            print(f"{os.path.basename(path)}: {list(loaded.columns)}")
+            assert list(loaded.columns) == ['name', 'email', 'company', 'job_title', 'company_size']
+            assert list(clean_leads(loaded)['company_size']) == list(expected['company_size'])
+            assert list(streamed.index) == list(expected.index)
+            assert list(scorer.score_leads_batch(streamed).sort_index()['score']) == \
+                list(scorer.score_leads_batch(expected).sort_index()['score'])
+            
+            # Exports get the skipped CRM columns back, row for row
+            passthrough = load_passthrough_columns(path)
+            assert list(passthrough.columns) == [f'crm_field_{i}' for i in range(20)]
+            exported = attach_passthrough_columns(scorer.score_leads_batch(clean_leads(loaded)), passthrough)
+            assert (exported['crm_field_7'].astype(int) == 7).all() and len(exported) == len(wide)
+
+def test_compressed_arrow_streaming():
+    """Test that compressed multi-batch Feather files stream batch by batch."""
+    print("\nTesting Compressed Arrow Streaming:")
+    print("-" * 40)
+    
+    try:
+        import pyarrow as pa
+        import pyarrow.feather
+    except ImportError:
+        print("pyarrow not installed - skipping")
+        return
+    
+    df = pd.read_csv(DATA_PATH)
+    expected = clean_leads(df)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'leads.feather')
+        pa.feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), path,
+                                 compression='zstd', chunksize=16)
+        chunks = list(iter_lead_chunks(path, chunksize=10))
+    
+    print(f"Chunk sizes: {[len(chunk) for chunk in chunks]}")
+    assert max(len(chunk) for chunk in chunks) <= 10
+    combined = pd.concat(chunks)
+    assert list(combined.index) == list(expected.index)
+    assert list(combined['company_size']) == list(expected['company_size'])
+
+if __name__ == "__main__":
+    test_chunked_loading()
+    test_stream_scoring_matches_batch()
+    test_top_k_stream()
+    test_columnar_loading()
+    test_compressed_arrow_streaming()
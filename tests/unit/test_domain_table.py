@@ -0,0 +1,105 @@
+# Test Domain Table (personal email domain knowledge base)
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from domain_table import DISPOSABLE, FREE, ISP, NOT_LISTED, DEFAULT_DOMAINS_PATH, DomainTable, default_domain_table
+from lead_scoring_engine import LeadScorer
+from scoring_rules import DEFAULT_RULES_PATH
+
+def test_domain_table():
+    """Test compiled lookups, subdomain matching and recompilation on edit."""
+    print("Testing Domain Table:")
+    print("-" * 40)
+
+    domains = ['gmail.com', 'mail.yahoo.co.uk', 'mailinator.com', 'x.comcast.net', 'acme.com',
+               'eu.acme.co.uk', 'co.uk', '', 'gmail.com.acme.io', 'GMAIL.COM']
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        compiled_path = os.path.join(tmp_dir, 'email_domains.npy')
+        table = DomainTable.from_file(compiled_path=compiled_path)
+        assert os.path.exists(compiled_path)
+
+        # Later loads map the compiled file instead of parsing the list
+        loaded = DomainTable.from_file(compiled_path=compiled_path)
+        assert isinstance(loaded.keys, np.memmap) and loaded.version == table.version
+
+        categories = loaded.categories(domains)
+        print(f"Categories: {dict(zip(domains, categories.tolist()))}")
+        # Lookups expect lower-cased domains (see lead_features.email_domains)
+        assert categories.tolist() == [FREE, FREE, DISPOSABLE, ISP] + [NOT_LISTED] * 6
+        assert [domain in loaded for domain in domains] == loaded.is_personal(domains).tolist()
+        assert len(loaded) > 500
+
+        # Editing the list changes the version, so it is compiled afresh
+        with open(DEFAULT_DOMAINS_PATH, encoding='utf-8') as f:
+            source = f.read()
+        edited_path = os.path.join(tmp_dir, 'email_domains.txt')
+        with open(edited_path, 'w', encoding='utf-8') as f:
+            f.write(source.replace('\n[disposable]\n', '\n[disposable]\nacme.com\n'))
+        edited = DomainTable.from_file(edited_path, compiled_path=os.path.join(tmp_dir, 'edited.npy'))
+        assert edited.version != table.version
+        assert edited.is_personal(['acme.com', 'eu.acme.com']).tolist() == [True, True]
+
+    # A rule set's own list keeps public-suffix-aware matching
+    override = DomainTable.from_domains(['Example.co.uk'])
+    assert override.is_personal(['example.co.uk', 'mail.example.co.uk', 'gmail.com']).tolist() == [True, True, False]
+
+def test_unwritable_cache_dir():
+    """Test that the table is compiled in memory when the cache directory can't be used."""
+    print("\nTesting Domain Table without a cache directory:")
+    print("-" * 40)
+
+    previous = os.environ.get('LEAD_SCORER_CACHE_DIR')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # A file where the cache directory should be
+        not_a_dir = os.path.join(tmp_dir, 'cache')
+        open(not_a_dir, 'w').close()
+        os.environ['LEAD_SCORER_CACHE_DIR'] = not_a_dir
+        try:
+            table = DomainTable.from_file()
+            scorer = LeadScorer()
+        finally:
+            if previous is None:
+                del os.environ['LEAD_SCORER_CACHE_DIR']
+            else:
+                os.environ['LEAD_SCORER_CACHE_DIR'] = previous
+
+    assert not isinstance(table.keys, np.memmap)
+    assert table.is_personal(['gmail.com', 'mail.yahoo.co.uk', 'acme.com']).tolist() == [True, True, False]
+    assert scorer.derive_features(pd.DataFrame({'email': ['ann@gmail.com', 'di@acme.com']}))['is_corporate_email'].tolist() == [False, True]
+
+def test_personal_domains_in_scoring():
+    """Test that every scoring path uses the table, and the rules version tracks it."""
+    print("\nTesting Personal Domains in Scoring:")
+    print("-" * 40)
+
+    scorer = LeadScorer()
+    emails = ['ann@mailinator.com', 'bo@btinternet.com', 'cy@mail.yahoo.co.uk', 'di@acme.com']
+    leads = [{'name': 'Lead', 'email': email, 'job_title': 'Analyst', 'company_size': 1} for email in emails]
+    expected = [False, False, False, True]
+
+    assert [scorer.score_lead_with_explain(lead)[1] > 0 for lead in leads] == expected
+    df = pd.DataFrame(leads)
+    for engine in ("vectorized", "factorize"):
+        points = scorer.score_leads_batch_with_explain(df, engine=engine)['score_points'].sort_index()
+        assert (points > 0).tolist() == expected
+    assert scorer.derive_features(df)['is_corporate_email'].tolist() == expected
+    assert scorer.rules.version.endswith(default_domain_table().version[:8])
+
+    # An explicit list in the rule set replaces the table
+    with open(DEFAULT_RULES_PATH) as f:
+        config = json.load(f)
+    config['email']['personal_domains'] = ['acme.com']
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        rules_path = os.path.join(tmp_dir, 'rules.json')
+        with open(rules_path, 'w') as f:
+            json.dump(config, f)
+        custom = LeadScorer(rules_path=rules_path)
+    assert custom.derive_features(df)['is_corporate_email'].tolist() == [True, True, True, False]
+    print(f"Rules versions: {scorer.rules.version} / {custom.rules.version}")
+
+if __name__ == "__main__":
+    test_domain_table()
+    test_unwritable_cache_dir()
+    test_personal_domains_in_scoring()
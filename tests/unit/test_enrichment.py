@@ -0,0 +1,172 @@
+# Test Lead Enrichment
+import os
+import pandas as pd
+import tempfile
+from dedup_index import DedupIndex
+from enrichment import enrich_leads, seen_before_emails
+from industry_cache import IndustryCache
+from industry_detector import IndustryDetector
+from near_duplicates import near_duplicate_clusters
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'complex_test_leads.csv')
+
+def test_detect_industries_matches_per_lead():
+    """Test that columnar industry detection matches detect_industry row by row."""
+    print("Testing Columnar Industry Detection:")
+    print("-" * 40)
+    
+    df = pd.read_csv(DATA_PATH)
+    domains = df['email'].astype(str).str.split('@').str[1]
+    detector = IndustryDetector()
+    
+    expected = [detector.detect_industry(company, domain) for company, domain in zip(df['company'], domains)]
+    detected = detector.detect_industries(df['company'], domains)
+    
+    print(f"Industries: {detected.value_counts().to_dict()}")
+    assert detected.tolist() == expected
+    assert detected.index.equals(df.index)
+    assert detector.detect_industries(['Acme Software', None, 'Unknown']).tolist() == ['technology', 'general', 'general']
+
+def test_enrich_leads_columns():
+    """Test the enrichment columns on messy emails and duplicate leads."""
+    print("\nTesting Lead Enrichment:")
+    print("-" * 40)
+    
+    df = pd.DataFrame({
+        'name': ['Ann Lee', ' ann lee ', 'Bo Chen', 'Cy Diaz'],
+        'email': [' Ann@WWW.Acme.com ', 'ann@gmail.com', 'not-an-email', 'cy@acme.com'],
+        'company': ['Acme Software', 'ACME SOFTWARE', 'Bank of Bo', 'Acme Software'],
+        'job_title': ['CTO', 'CTO', 'Analyst', 'VP'],
+        'company_size': [100, 100, 5, 100]
+    })
+    enriched, report = enrich_leads(df)
+    
+    print(enriched[['email_domain', 'is_corporate_email', 'industry']].to_string())
+    assert enriched['email_domain'].tolist() == ['acme.com', 'gmail.com', '', 'acme.com']
+    assert enriched['is_corporate_email'].tolist() == [True, False, False, True]
+    assert enriched['website_guess'].tolist() == ['https://acme.com', 'https://gmail.com', '', 'https://acme.com']
+    assert enriched['industry'].tolist() == ['technology', 'technology', 'finance', 'technology']
+    assert enriched['duplicate_name_company'].tolist() == [False, True, False, False]
+    assert report == {'rows': 4, 'duplicate_email_count': 0, 'duplicate_name_company_count': 1,
+                      'near_duplicate_count': 1}
+
+def test_industry_cache():
+    """Test that cached industries are reused, and dropped when the taxonomy changes."""
+    print("\nTesting Industry Cache:")
+    print("-" * 40)
+    
+    df = pd.read_csv(DATA_PATH)
+    domains = df['email'].astype(str).str.split('@').str[1]
+    detector = IndustryDetector()
+    expected = detector.detect_industries(df['company'], domains)
+    cache = IndustryCache(':memory:')
+    
+    calls = []
+    detect_industry = detector.detect_industry
+    detector.detect_industry = lambda *pair: calls.append(pair) or detect_industry(*pair)
+    
+    first = detector.detect_industries(df['company'], domains, cache=cache)
+    detected_first = len(calls)
+    second = detector.detect_industries(df['company'], domains, cache=cache)
+    print(f"Detected on first run: {detected_first} | on repeat run: {len(calls) - detected_first}")
+    assert first.tolist() == second.tolist() == expected.tolist()
+    assert detected_first > 0 and len(calls) == detected_first
+    
+    # Editing a keyword list changes the taxonomy version, so nothing is reused
+    version = detector.taxonomy_version
+    detector.tech_indicators = detector.tech_indicators + ['acme']
+    assert detector.taxonomy_version != version
+    calls.clear()
+    assert detector.detect_industries(['Acme Holdings'], ['acme.com'], cache=cache).tolist() == ['technology']
+    assert len(calls) == 1
+    
+    cache.prune(detector.taxonomy_version)
+    found, _ = cache.lookup(version, cache.pair_keys(['acme holdings'], ['acme.com']))
+    assert not found.any()
+    cache.close()
+
+def test_near_duplicate_clusters():
+    """Test MinHash/LSH clustering of reordered names and suffixed company names."""
+    print("\nTesting Near-Duplicate Clusters:")
+    print("-" * 40)
+    
+    names = ['Olga Lopez', 'Lopez, Olga', 'OLGA LÓPEZ', 'Lisa M.', 'Lisa J.', 'Mark Wang', 'Mark Wang',
+             'Unknown', 'Unknown', 'Anthony Singh']
+    companies = ['CodeStream Ltd', 'CodeStream', 'Codestream Inc.', 'Globex', 'Globex', 'Initech', 'Umbrella',
+                 'Acme', 'Acme', 'AI Dynamics Corp']
+    clusters = near_duplicate_clusters(names, companies)
+    
+    print(f"Clusters: {clusters.tolist()}")
+    assert clusters.tolist() == [0, 0, 0, 1, 2, 3, 4, 5, 6, 7]
+    
+    # Repeats join their lead's cluster; unnamed leads always stay apart
+    repeated = near_duplicate_clusters(names * 5000, companies * 5000)
+    assert repeated[:len(names)].tolist() == clusters.tolist()
+    assert repeated.max() + 1 == 6 + 2 * 5000  # 6 named clusters, 2 unnamed leads per copy
+    
+    enriched, report = enrich_leads(pd.DataFrame({
+        'name': names, 'email': [f'lead{i}@example.com' for i in range(len(names))],
+        'company': companies, 'job_title': 'CTO', 'company_size': 100
+    }))
+    assert enriched['near_duplicate_cluster'].tolist() == clusters.tolist()
+    assert enriched['near_duplicate'].tolist() == [False, True, True] + [False] * 7
+    assert report['near_duplicate_count'] == 2
+
+def test_dedup_index():
+    """Test that emails from earlier uploads are flagged, however they were typed."""
+    print("\nTesting Dedup Index:")
+    print("-" * 40)
+    
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'seen_emails.sqlite')
+        first = pd.DataFrame({'name': ['Ana', 'Ben', 'Cy'], 'company': 'Acme', 'job_title': 'CTO', 'company_size': 100,
+                              'email': ['ana@acme.com', 'ben@acme.com', 'not-an-email']})
+        index = DedupIndex(path, capacity=1000)
+        enriched, report = enrich_leads(first, dedup_index=index)
+        assert enriched['seen_before'].tolist() == [False, False, False]
+        assert report['seen_before_count'] == 0
+        index.close()
+        
+        # A later upload from another vendor, with different spelling of the same addresses
+        second = ['  ANA@acme.com', 'dee@acme.com', 'Ben@Acme.com ', 'not-an-email', None]
+        index = DedupIndex(path)
+        seen = index.check_and_add(second)
+        print(f"Seen before: {seen.tolist()}")
+        assert seen.tolist() == [True, False, True, False, False]
+        assert len(index) == 3
+        index.close()
+        
+        # Enriching the same upload again (a Streamlit rerun) reuses the first run's flags
+        third = pd.DataFrame({'name': ['Ana', 'Fay'], 'company': 'Acme', 'job_title': 'CTO', 'company_size': 100,
+                              'email': ['ana@acme.com', 'fay@acme.com']})
+        index = DedupIndex(path)
+        enriched, report = enrich_leads(third, dedup_index=index)
+        seen_emails = seen_before_emails(enriched)
+        rerun, rerun_report = enrich_leads(third.iloc[::-1], seen_emails=seen_emails)
+        assert enriched['seen_before'].tolist() == [True, False] and seen_emails == {'ana@acme.com'}
+        assert rerun['seen_before'].sort_index().tolist() == [True, False]
+        assert rerun_report['seen_before_count'] == 1
+        assert len(index) == 4
+        index.close()
+        
+        # The same file re-sent in a later session is all seen
+        index = DedupIndex(path)
+        assert enrich_leads(third, dedup_index=index)[0]['seen_before'].tolist() == [True, True]
+        index.close()
+        
+        # A lost Bloom filter is rebuilt from the exact set
+        os.remove(os.path.join(folder, 'seen_emails.bloom'))
+        index = DedupIndex(path)
+        assert index.contains(['dee@acme.com', 'eve@acme.com']).tolist() == [True, False]
+        index.close()
+    
+    # Without an index, no column is added
+    enriched, report = enrich_leads(first)
+    assert 'seen_before' not in enriched.columns and 'seen_before_count' not in report
+
+if __name__ == "__main__":
+    test_detect_industries_matches_per_lead()
+    test_enrich_leads_columns()
+    test_industry_cache()
+    test_near_duplicate_clusters()
+    test_dedup_index()
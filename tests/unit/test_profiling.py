@@ -0,0 +1,82 @@
+# Test Opt-in Profiling Capture
+import json
+import os
+import tempfile
+import pandas as pd
+from enrichment import enrich_leads
+from lead_scoring_engine import LeadScorer
+from data_loader import clean_leads
+from profiling import PROFILE_DIR_ENV, PROFILE_ENV, profile_run
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'complex_test_leads.csv')
+
+def test_profile_run_by_stage():
+    """Test that a profiled run writes stats broken down by pipeline stage."""
+    print("Testing Profiling Capture:")
+    print("-" * 40)
+
+    df = pd.read_csv(DATA_PATH)
+    scorer = LeadScorer()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with profile_run('upload', enabled=True, output_dir=tmp_dir) as run:
+            enriched, _ = enrich_leads(df)
+            scorer.score_leads_batch_with_explain(enriched)
+
+        files = os.listdir(run.directory)
+        with open(os.path.join(run.directory, 'summary.json')) as f:
+            summary = json.load(f)
+        with open(os.path.join(run.directory, 'allocations.txt')) as f:
+            allocations = f.read()
+
+    stages = summary['stages']
+    print(f"Stages: {list(stages)}")
+    for stage in ('upload', 'enrichment.enrich_leads', 'enrichment.industry',
+                  'scoring.score_leads_batch_with_explain', 'scoring.features'):
+        assert stages[stage]['calls'] == 1
+        assert stages[stage]['profile'] in files
+    assert {'summary.json', 'allocations.txt', 'stacks.collapsed'} <= set(files)
+    assert '== scoring.features' in allocations
+
+    # Nested stages are profiled separately, so each holds its own functions
+    scoring_functions = [f['function'] for f in stages['scoring.features']['top_functions']]
+    assert not any('industry_detector' in function for function in scoring_functions)
+
+def test_profiling_off_by_default():
+    """Test that nothing is captured unless profiling is requested."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with profile_run('upload', enabled=False, output_dir=tmp_dir) as run:
+            LeadScorer().score_leads_batch(pd.read_csv(DATA_PATH))
+        assert run is None
+        assert os.listdir(tmp_dir) == []
+
+def test_profile_env_var():
+    """Test that LEAD_SCORER_PROFILE=0 is off, and =1 profiles top-level calls, not per-chunk stages."""
+    df = pd.read_csv(DATA_PATH)
+    scorer = LeadScorer()
+    previous = {name: os.environ.get(name) for name in (PROFILE_ENV, PROFILE_DIR_ENV)}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ[PROFILE_DIR_ENV] = tmp_dir
+        try:
+            os.environ[PROFILE_ENV] = '0'
+            scorer.score_leads_batch(df)
+            assert os.listdir(tmp_dir) == []
+
+            os.environ[PROFILE_ENV] = '1'
+            # Chunk-level stages (as in iter_lead_chunks) don't write a profile per call
+            for chunk in (df.iloc[:20], df.iloc[20:]):
+                clean_leads(chunk)
+            assert os.listdir(tmp_dir) == []
+            scorer.score_leads_batch(df)
+            assert len(os.listdir(tmp_dir)) == 1
+        finally:
+            for name, value in previous.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+if __name__ == "__main__":
+    test_profile_run_by_stage()
+    test_profiling_off_by_default()
+    test_profile_env_var()
@@ -26,6 +26,32 @@ def test_job_title_normalization():
         normalized = scorer.normalize_job_title(title)
         print(f"'{title}' → '{normalized}'")
 
+def test_title_matcher_single_scan():
+    """Test that the compiled title matcher agrees with plain substring checks."""
+    print("\n\nTesting Title Matcher:")
+    print("-" * 50)
+    
+    scorer = LeadScorer()
+    
+    test_titles = [
+        "senior vice president",   # Overlapping senior + executive keywords
+        "vpresident",              # Keywords sharing a character
+        "director of sales",       # 'director' also contains 'cto'
+        "coordinator",             # 'coordinator' also contains 'coo'
+        "software engineer",       # No keywords
+        "unknown"
+    ]
+    
+    for title in test_titles:
+        senior = any(t in title for t in scorer.senior_titles)
+        executive = any(t in title for t in scorer.executive_titles)
+        print(f"'{title}' → senior={senior}, executive={executive}")
+        assert scorer.title_matcher.is_senior(title) == senior
+        assert scorer.title_matcher.is_executive(title) == executive
+    
+    flags = scorer.title_matcher.match_series(pd.Series(test_titles * 3))
+    assert list(flags[:len(test_titles)]) == [scorer.title_matcher.match(t) for t in test_titles]
+
 def test_email_domain_normalization():
     """Test email domain extraction and normalization."""
     print("\n\nTesting Email Domain Normalization:")
@@ -72,6 +98,28 @@ def test_company_size_normalization():
         normalized = scorer.normalize_company_size(size)
         print(f"'{size}' → {normalized}")
 
+def test_normalizer_cache():
+    """Test that repeated values are served from the normalizer caches."""
+    print("\n\nTesting Normalizer Cache:")
+    print("-" * 50)
+    
+    scorer = LeadScorer(cache_size=2)
+    
+    for title in ["Sales Mgr", "Sales Mgr", "CEO", "VP Sales", "Sales Mgr"]:
+        scorer.normalize_job_title(title)
+    
+    stats = scorer.cache_stats()['job_title']
+    print(f"Job title cache: {stats}")
+    assert stats['hits'] == 1 and stats['misses'] == 4
+    assert stats['size'] == 2  # Oldest entry evicted
+    
+    # Equal values of different types must not share an entry
+    assert scorer.normalize_company_size(True) == 0
+    assert scorer.normalize_company_size(1) == 1
+    
+    scorer.clear_caches()
+    assert scorer.cache_stats()['job_title']['misses'] == 0
+
 def test_edge_case_scoring():
     """Test scoring with messy, real-world edge case data."""
     print("\n\nTesting Edge Case Scoring:")
@@ -167,8 +215,10 @@ def test_consistency_with_variations():
 
 if __name__ == "__main__":
     test_job_title_normalization()
+    test_title_matcher_single_scan()
     test_email_domain_normalization()
     test_company_size_normalization()
+    test_normalizer_cache()
     test_edge_case_scoring()
     test_consistency_with_variations()
     
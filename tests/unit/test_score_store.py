@@ -0,0 +1,74 @@
+# Test Incremental Rescoring
+import json
+import os
+import tempfile
+import pandas as pd
+from lead_scoring_engine import LeadScorer
+from score_store import ScoreStore
+from scoring_rules import DEFAULT_RULES_PATH
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'complex_test_leads.csv')
+
+def test_incremental_rescoring():
+    """Test that only changed leads are rescored and results match a full run."""
+    print("Testing Incremental Rescoring:")
+    print("-" * 40)
+
+    df = pd.read_csv(DATA_PATH)
+    scorer = LeadScorer()
+    columns = ['score', 'score_points', 'score_reason_codes']
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = ScoreStore(os.path.join(tmp_dir, 'scores.sqlite'))
+
+        first, report = scorer.score_leads_incremental(df, store)
+        print(f"First upload: {report}")
+        assert report['rescored'] == len(df) and report['cached'] == 0
+        assert first[columns].equals(scorer.score_leads_batch_with_explain(df)[columns])
+
+        # Next day: one title changed, one non-scoring field changed
+        changed = df.copy()
+        changed.iloc[0, changed.columns.get_loc('job_title')] = 'Chief Executive Officer'
+        changed.iloc[1, 0] = 'Renamed Lead'
+        second, report = scorer.score_leads_incremental(changed, store)
+        print(f"Second upload: {report}")
+        assert report['rescored'] <= 1 and report['cached'] >= len(df) - 1
+        assert second[columns].equals(scorer.score_leads_batch_with_explain(changed)[columns])
+
+        # A different rule set version never reuses those results
+        with open(DEFAULT_RULES_PATH) as f:
+            config = json.load(f)
+        config['email']['corporate']['points'] = 3
+        rules_path = os.path.join(tmp_dir, 'rules.json')
+        with open(rules_path, 'w') as f:
+            json.dump(config, f)
+
+        other = LeadScorer(rules_path=rules_path)
+        third, report = other.score_leads_incremental(changed, store)
+        print(f"New rule set: {report}")
+        assert report['cached'] == 0
+        assert third[columns].equals(other.score_leads_batch_with_explain(changed)[columns])
+        
+        # Saving under the new version pruned the old one
+        versions = store._connection.execute('SELECT DISTINCT rules_version FROM scores').fetchall()
+        assert versions == [(other.rules.version,)]
+        store.close()
+
+def test_score_store_lookup():
+    """Test that lookups return only the requested fingerprints, in request order."""
+    print("\nTesting Score Store Lookup:")
+    print("-" * 40)
+
+    store = ScoreStore(':memory:')
+    store.save('v1', [30, 10, 20], [3, 1, 2], [4, 0, 8])
+    found, points, reason_codes = store.lookup('v1', [20, 99, 20, 30])
+    print(f"Found: {found.tolist()} | Points: {points.tolist()}")
+    assert found.tolist() == [True, False, True, True]
+    assert points.tolist() == [2, 0, 2, 3]
+    assert reason_codes.tolist() == [8, 0, 8, 4]
+    assert not store.lookup('v2', [10, 20])[0].any()
+    store.close()
+
+if __name__ == "__main__":
+    test_incremental_rescoring()
+    test_score_store_lookup()
@@ -1,6 +1,17 @@
 # Test Script for Lead Scoring Engine
+import json
+import os
 import pandas as pd
+from enrichment import enrich_leads
+from domain_table import default_domain_table
+from lead_features import FEATURE_COLUMNS, drop_lead_features
+from lead_record import Lead
 from lead_scoring_engine import LeadScorer
+from outreach_templates import generate_personalized_content
+from parallel_scoring import score_features_parallel
+from scoring_rules import DEFAULT_RULES_PATH, ScoringRules
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'complex_test_leads.csv')
 
 def test_scoring_engine():
     """Test the lead scoring engine with sample data."""
@@ -54,5 +65,182 @@ def test_scoring_engine():
     
     print(scored_df[['name', 'job_title', 'company_size', 'score']])
 
+def test_vectorized_matches_rowwise():
+    """Test that the columnar batch engines match the per-row reference."""
+    print("Testing Vectorized vs Row-wise Batch Scoring:")
+    print("-" * 40)
+    
+    df = pd.read_csv(DATA_PATH)
+    scorer = LeadScorer()
+    
+    rowwise = scorer.score_leads_batch(df, engine="rowwise")
+    
+    for engine in ["vectorized", "factorize"]:
+        scored = scorer.score_leads_batch(df, engine=engine)
+        mismatches = (scored['score'].sort_index() != rowwise['score'].sort_index()).sum()
+        print(f"{engine}: leads scored: {len(df)} | Mismatches: {mismatches}")
+        assert mismatches == 0
+
+def test_explain_reason_codes():
+    """Test that rendered reason codes match the per-lead explanations."""
+    print("Testing Reason Codes:")
+    print("-" * 40)
+    
+    df = pd.read_csv(DATA_PATH)
+    scorer = LeadScorer()
+    
+    scored = scorer.score_leads_batch_with_explain(df)
+    rendered = scorer.render_score_reasons(scored)
+    why = scorer.summarize_reason_codes(scored['score_reason_codes'])
+    
+    print(f"Reason code dtype: {scored['score_reason_codes'].dtype}")
+    for idx in scored.index:
+        level, points, reasons = scorer.score_lead_with_explain(df.loc[idx].to_dict())
+        assert scored.loc[idx, 'score'] == level
+        assert scored.loc[idx, 'score_points'] == points
+        assert rendered[idx] == '; '.join(reasons)
+    
+    first = scored.index[0]
+    print(f"{df.loc[first, 'name']}: {rendered[first]} → {why[first]}")
+
+def test_parallel_matches_single_process():
+    """Test that sharded process-pool scoring matches in-process scoring."""
+    print("Testing Parallel Scoring:")
+    print("-" * 40)
+    
+    df = pd.concat([pd.read_csv(DATA_PATH)] * 5, ignore_index=True)
+    scorer = LeadScorer()
+    
+    single = scorer.score_leads_batch_with_explain(df).sort_index()
+    parallel = scorer.score_leads_parallel(df, explain=True, workers=2, shard_size=30, min_rows=1).sort_index()
+    
+    columns = ['score', 'score_points', 'score_reason_codes']
+    print(f"Leads scored: {len(parallel)} in {-(-len(df) // 30)} shards")
+    assert parallel[columns].equals(single[columns])
+    
+    # Workers score with the parent's rule set, not whatever they load from the file
+    with open(DEFAULT_RULES_PATH) as f:
+        config = json.load(f)
+    config['title']['senior']['points'] = 7
+    rules = ScoringRules(config, fingerprint='edited')
+    sharded = score_features_parallel(scorer, df, workers=2, shard_size=30, min_rows=1, rules=rules)
+    in_process = scorer._score_features(df, factorize=True, rules=rules)
+    assert all((a == b).all() for a, b in zip(sharded, in_process))
+    assert (sharded[0] >= 7).any()
+
+def test_top_k():
+    """top_k matches a full sort by level, then points, then input order."""
+    df = pd.concat([pd.read_csv(DATA_PATH)] * 3, ignore_index=True)
+    scorer = LeadScorer()
+    
+    scored = scorer.score_leads_batch_with_explain(df).sort_index()
+    rank = scored['score'].map({'High': 3, 'Medium': 2, 'Low': 1})
+    expected = scored.assign(_rank=rank).sort_values(
+        ['_rank', 'score_points'], ascending=False, kind='stable'
+    )
+    
+    for k in (0, 1, 7, 25, len(df) + 5):
+        top = scorer.top_k(scored, k)
+        assert list(top.index) == list(expected.index[:k])
+    
+    # Raw leads are scored on the fly
+    assert list(scorer.top_k(df, 7).index) == list(expected.index[:7])
+    assert list(scorer.top_k(scored, 5, by=('level',)).index) == list(
+        scored.assign(_rank=rank).sort_values('_rank', ascending=False, kind='stable').index[:5]
+    )
+
+def test_priority_order():
+    """Batch results are ordered by level, points, then the tiebreak."""
+    df = pd.concat([pd.read_csv(DATA_PATH)] * 3, ignore_index=True)
+    scorer = LeadScorer()
+    
+    scored = scorer.score_leads_batch_with_explain(df, tiebreak='company_size')
+    sizes = scorer.normalize_company_sizes(scored['company_size'])
+    keys = list(zip(scored['score_points'], sizes, -scored.index))
+    assert keys == sorted(keys, reverse=True)
+    
+    order = scorer.priority_order(scored.sort_index())
+    assert list(scored.sort_index().index[order]) == list(scorer.score_leads_batch_with_explain(df).index)
+    
+    ml = scorer.score_leads_batch(df, engine="ml")
+    rank = ml['score'].map({'High': 3, 'Medium': 2, 'Low': 1})
+    assert rank.is_monotonic_decreasing
+
+def test_ml_mode():
+    """ML mode: batch and per-lead predictions agree and track the rules."""
+    df = pd.read_csv(DATA_PATH)
+    scorer = LeadScorer()
+    
+    batch = scorer.score_leads_batch(df, engine="ml").sort_index()
+    single = [scorer.score_lead(lead, mode="ml") for lead in df.to_dict('records')]
+    rules = scorer.score_leads_batch(df).sort_index()
+    
+    agreement = (batch['score'] == rules['score']).mean()
+    print(f"ML agreement with rules: {agreement:.1%}")
+    assert batch['score'].tolist() == single
+    assert set(batch['score']) <= {'High', 'Medium', 'Low'}
+    assert agreement > 0.85
+
+def test_lead_record():
+    """Lead records score and personalize exactly like lead dicts."""
+    df = pd.read_csv(DATA_PATH)
+    scorer = LeadScorer()
+    
+    leads = list(Lead.iter_frame(df))
+    records = df.to_dict('records')
+    assert len(leads) == len(df)
+    assert [scorer.score_lead(lead) for lead in leads] == [scorer.score_lead(r) for r in records]
+    
+    lead = Lead(name="Ana Ruiz", email="ana@acme.com", job_title="CTO")
+    assert lead['email'] == lead.email == lead.get('email')
+    assert lead.get('company', 'your company') == 'your company'
+    assert lead.get('unknown_field') is None
+    assert lead.to_dict() == {'name': "Ana Ruiz", 'email': "ana@acme.com", 'job_title': "CTO"}
+    assert Lead.from_mapping(lead.to_dict()) == lead
+    assert generate_personalized_content(lead) == generate_personalized_content(lead.to_dict())
+    
+    # Missing columns come through as None
+    assert next(Lead.iter_frame(df[['email']])).company is None
+
+def test_derived_features():
+    """Test that scoring, enrichment and outreach reuse derived features with identical results."""
+    print("\nTesting Shared Derived Features:")
+    print("-" * 40)
+    
+    df = pd.read_csv(DATA_PATH)
+    scorer = LeadScorer()
+    features = scorer.derive_features(df)
+    
+    print(features[list(FEATURE_COLUMNS)].head(3).to_string())
+    assert list(features['email_domain']) == [scorer.normalize_email_domain(email) for email in df['email']]
+    assert list(features['normalized_size']) == [scorer.normalize_company_size(size) for size in df['company_size']]
+    assert scorer.personal_domains is default_domain_table()
+    
+    for engine in ("vectorized", "factorize"):
+        plain = scorer.score_leads_batch_with_explain(df, engine=engine)
+        derived = scorer.score_leads_batch_with_explain(features, engine=engine)
+        assert list(derived.index) == list(plain.index)
+        assert list(derived['score_reason_codes']) == list(plain['score_reason_codes'])
+        assert list(scorer.render_score_reasons(derived)) == list(scorer.render_score_reasons(plain))
+    assert list(scorer.score_leads_batch(features, engine="ml")['score']) == \
+        list(scorer.score_leads_batch(df, engine="ml")['score'])
+    
+    # Enrichment reads the attached columns; outreach takes them from the row
+    enriched, _ = enrich_leads(features)
+    assert enriched.drop(columns=list(FEATURE_COLUMNS)).equals(enrich_leads(df)[0].drop(columns=list(FEATURE_COLUMNS)))
+    row = enriched.iloc[0]
+    assert generate_personalized_content(Lead.from_mapping(row), features=row) == \
+        generate_personalized_content(Lead.from_mapping(row))
+    assert list(drop_lead_features(enriched, keep=('email_domain',)).columns) == \
+        [column for column in enriched.columns if column not in FEATURE_COLUMNS[1:]]
+
 if __name__ == "__main__":
-    test_scoring_engine()
\ No newline at end of file
+    test_scoring_engine()
+    test_vectorized_matches_rowwise()
+    test_explain_reason_codes()
+    test_parallel_matches_single_process()
+    test_top_k()
+    test_priority_order()
+    test_ml_mode()
+    test_lead_record()
+    test_derived_features()
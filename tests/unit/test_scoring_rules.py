@@ -0,0 +1,187 @@
+# Test Declarative Scoring Rules
+import json
+import os
+import tempfile
+import pandas as pd
+import pytest
+from lead_scoring_engine import LeadScorer
+from points_histogram import PointsHistogram
+from scoring_rules import DEFAULT_RULES_PATH
+
+def test_rules_drive_all_paths():
+    """Test that rule set weights reach the per-lead, batch and explain paths."""
+    print("Testing Rule Set Evaluation:")
+    print("-" * 40)
+    
+    lead = {
+        'name': 'Bob Director',
+        'email': 'bob@bigcompany.com',
+        'company': 'BigCompany Inc',
+        'job_title': 'Marketing Director',
+        'company_size': 150
+    }
+    
+    with open(DEFAULT_RULES_PATH) as f:
+        config = json.load(f)
+    config['title']['senior']['points'] = 0
+    config['levels'] = [{'name': 'High', 'min_points': 4}, {'name': 'Medium', 'min_points': 2}]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        rules_path = os.path.join(tmp_dir, 'rules.json')
+        with open(rules_path, 'w') as f:
+            json.dump(config, f)
+        
+        scorer = LeadScorer(rules_path=rules_path)
+        level, points, reasons = scorer.score_lead_with_explain(lead)
+        batch = scorer.score_leads_batch_with_explain(pd.DataFrame([lead]))
+    
+    print(f"{lead['job_title']}: {level} ({points} points) - {'; '.join(reasons)}")
+    assert (level, points) == ('High', 4)
+    assert reasons[0] == '±0 senior title'
+    assert scorer.score_lead(lead) == batch['score'].iloc[0] == level
+    assert batch['score_points'].iloc[0] == points
+
+def test_rules_hot_reload():
+    """Test that edits to the rule set file are picked up without a restart."""
+    print("\nTesting Rule Set Hot Reload:")
+    print("-" * 40)
+    
+    lead = {'name': 'Jane Doe', 'email': 'jane@gmail.com', 'company': 'Solo',
+            'job_title': 'Sales Manager', 'company_size': 1}
+    
+    with open(DEFAULT_RULES_PATH) as f:
+        config = json.load(f)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        rules_path = os.path.join(tmp_dir, 'rules.json')
+        with open(rules_path, 'w') as f:
+            json.dump(config, f)
+        
+        scorer = LeadScorer(rules_path=rules_path, reload_interval=0)
+        before = scorer.score_lead(lead)
+        old_version = scorer.rules.version
+        
+        config['levels'][1]['min_points'] = 3
+        with open(rules_path, 'w') as f:
+            json.dump(config, f)
+        os.utime(rules_path, ns=(0, os.stat(rules_path).st_mtime_ns + 1))
+        after = scorer.score_lead(lead)
+        
+        with open(rules_path, 'w') as f:
+            f.write('{not json')
+        os.utime(rules_path, ns=(0, os.stat(rules_path).st_mtime_ns + 2))
+        kept = scorer.score_lead(lead)
+    
+    print(f"Before: {before} | After edit: {after} | After broken edit: {kept}")
+    assert (before, after, kept) == ('Medium', 'Low', 'Low')
+    assert scorer.rules.version != old_version
+    assert scorer._rule_set_file.last_error is not None
+
+def test_rules_hot_reload_yaml():
+    """Test that a malformed YAML edit keeps the last good rule set."""
+    yaml = pytest.importorskip('yaml')
+    lead = {'name': 'Jane Doe', 'email': 'jane@gmail.com', 'company': 'Solo',
+            'job_title': 'Sales Manager', 'company_size': 1}
+    
+    with open(DEFAULT_RULES_PATH) as f:
+        config = json.load(f)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        rules_path = os.path.join(tmp_dir, 'rules.yaml')
+        with open(rules_path, 'w') as f:
+            yaml.safe_dump(config, f)
+        
+        scorer = LeadScorer(rules_path=rules_path, reload_interval=0)
+        before = scorer.score_lead(lead)
+        version = scorer.rules.version
+        
+        with open(rules_path, 'w') as f:
+            f.write('title: [unclosed')
+        os.utime(rules_path, ns=(0, os.stat(rules_path).st_mtime_ns + 1))
+        kept = scorer.score_lead(lead)
+        assert kept == before and scorer.rules.version == version
+        assert isinstance(scorer._rule_set_file.last_error, ValueError)
+
+def test_what_if_thresholds():
+    """Test that threshold what-ifs match rescoring with edited thresholds."""
+    print("\nTesting Threshold What-if:")
+    print("-" * 40)
+    
+    data_path = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'complex_test_leads.csv')
+    leads = pd.read_csv(data_path)
+    scorer = LeadScorer()
+    scored = scorer.score_leads_batch_with_explain(leads)
+    current = scorer.rules.thresholds()
+    what_if = {'High': 4, 'Medium': 2}
+    
+    with open(DEFAULT_RULES_PATH) as f:
+        config = json.load(f)
+    config['levels'] = [{'name': name, 'min_points': points} for name, points in what_if.items()]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        rules_path = os.path.join(tmp_dir, 'rules.json')
+        with open(rules_path, 'w') as f:
+            json.dump(config, f)
+        rescored = LeadScorer(rules_path=rules_path).score_leads_batch(leads)
+    
+    counts = scorer.what_if_counts(what_if)
+    levels = scorer.what_if_levels(what_if)
+    print(f"Current {scorer.what_if_counts(current)} -> what-if {counts}")
+    assert scorer.what_if_counts(current) == scored['score'].value_counts().reindex(['High', 'Medium', 'Low'], fill_value=0).to_dict()
+    assert counts == rescored['score'].value_counts().reindex(['High', 'Medium', 'Low'], fill_value=0).to_dict()
+    assert list(counts) == ['High', 'Medium', 'Low']
+    assert levels.index.equals(scored.index)
+    assert (levels == rescored['score'].reindex(scored.index)).all()
+
+def test_what_if_crossed_thresholds():
+    """Test that equal or crossed slider thresholds level leads like rescoring (first level met)."""
+    histogram = PointsHistogram([0, 1, 3, 5, 6])
+    
+    # Equal: everything at 3+ is High, as level_for would say
+    assert histogram.level_counts({'High': 3, 'Medium': 3}) == {'High': 3, 'Medium': 0, 'Low': 2}
+    # Crossed: Medium below High's minimum never outranks it
+    crossed = {'High': 1, 'Medium': 5}
+    assert histogram.level_counts(crossed) == {'High': 4, 'Medium': 0, 'Low': 1}
+    assert histogram.assign_levels(crossed).tolist() == ['Low', 'High', 'High', 'High', 'High']
+    assert histogram.level_counts({'High': 5, 'Medium': 1}) == {'High': 2, 'Medium': 2, 'Low': 1}
+
+def test_renamed_levels_in_batch_paths():
+    """Test that renamed levels reach file reports, and a batch is scored with one rule set."""
+    print("\nTesting Renamed Levels:")
+    print("-" * 40)
+    
+    with open(DEFAULT_RULES_PATH) as f:
+        config = json.load(f)
+    config['levels'] = [{'name': 'Hot', 'min_points': 4}, {'name': 'Warm', 'min_points': 2}]
+    config['default_level'] = 'Cold'
+    leads = pd.DataFrame([
+        {'name': 'A', 'email': 'a@acme.com', 'company': 'Acme', 'job_title': 'CEO', 'company_size': 500},
+        {'name': 'B', 'email': 'b@gmail.com', 'company': 'Solo', 'job_title': 'Intern', 'company_size': 1}
+    ])
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        rules_path = os.path.join(tmp_dir, 'rules.json')
+        with open(rules_path, 'w') as f:
+            json.dump(config, f)
+        input_path = os.path.join(tmp_dir, 'leads.csv')
+        leads.to_csv(input_path, index=False)
+        
+        scorer = LeadScorer(rules_path=rules_path)
+        report = scorer.score_csv_to_file(input_path, os.path.join(tmp_dir, 'scored.csv'))
+        print(f"Report: {report}")
+        assert report == {'rows': 2, 'Hot': 1, 'Warm': 0, 'Cold': 1}
+        
+        # A reload between reads must not mix rule sets within one batch
+        renamed = scorer.rules
+        default = LeadScorer().rules
+        reads = iter([renamed] + [default] * 10)
+        scorer._rule_set_file.get = lambda: next(reads)
+        scored = scorer.score_leads_batch_with_explain(leads)
+    assert sorted(scored['score']) == ['Cold', 'Hot']
+
+if __name__ == "__main__":
+    test_rules_drive_all_paths()
+    test_rules_hot_reload()
+    test_rules_hot_reload_yaml()
+    test_what_if_thresholds()
+    test_what_if_crossed_thresholds()
+    test_renamed_levels_in_batch_paths()
@@ -0,0 +1,107 @@
+# Test the Local Scoring Service
+import asyncio
+import json
+import os
+import pandas as pd
+from lead_scoring_engine import LeadScorer
+from scoring_service import ScoringService, score_records
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'complex_test_leads.csv')
+
+def load_leads_json():
+    """Leads as JSON-ready dicts (missing values as null)."""
+    df = pd.read_csv(DATA_PATH).astype(object)
+    return df.where(df.notna(), None).to_dict('records')
+
+async def request(reader, writer, method, path, payload=None):
+    """Send one keep-alive HTTP request and return (status, JSON body)."""
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode().split("\r\n")
+    headers = dict(line.lower().split(": ", 1) for line in head[1:] if line)
+    data = await reader.readexactly(int(headers['content-length']))
+    return int(head[0].split()[1]), json.loads(data)
+
+def test_score_records_paths_agree():
+    """Test that small (per-lead) and large (columnar) batches score the same."""
+    scorer = LeadScorer()
+    leads = load_leads_json() + [{}, {'job_title': 'CEO', 'company_size': '1.5k'}]
+    
+    per_lead = score_records(scorer, leads, min_vectorized=len(leads) + 1)
+    columnar = score_records(scorer, leads, min_vectorized=1)
+    
+    assert per_lead == columnar
+    level, points, reasons = scorer.score_lead_with_explain(leads[0])
+    assert per_lead[0] == {'score': level, 'score_points': points, 'score_reasons': '; '.join(reasons)}
+
+def test_service_micro_batches_requests():
+    """Test the HTTP endpoints and that concurrent requests share batches."""
+    print("Testing Scoring Service:")
+    print("-" * 40)
+    
+    leads = load_leads_json()
+    expected = score_records(LeadScorer(), leads)
+    
+    async def run():
+        service = await ScoringService(port=0, max_delay=0.01).start()
+        try:
+            async def client(lead):
+                reader, writer = await asyncio.open_connection('127.0.0.1', service.port)
+                try:
+                    return await request(reader, writer, 'POST', '/score', lead)
+                finally:
+                    writer.close()
+            
+            singles = await asyncio.gather(*[client(lead) for lead in leads])
+            
+            reader, writer = await asyncio.open_connection('127.0.0.1', service.port)
+            batch = await request(reader, writer, 'POST', '/score/batch', {'leads': leads})
+            health = await request(reader, writer, 'GET', '/health')
+            missing = await request(reader, writer, 'GET', '/nope')
+            invalid = await request(reader, writer, 'POST', '/score', ['not', 'a', 'lead'])
+            writer.close()
+            return singles, batch, health, missing, invalid
+        finally:
+            await service.stop()
+    
+    singles, batch, health, missing, invalid = asyncio.run(run())
+    
+    print(f"Health: {health[1]}")
+    assert [body for _, body in singles] == expected
+    assert batch == (200, {'results': expected})
+    assert health[1]['requests'] == len(leads)
+    assert health[1]['batches'] < len(leads)
+    assert missing[0] == 404 and invalid[0] == 400
+
+def test_service_rejects_bad_content_length():
+    """Test that a non-numeric or negative Content-Length gets a 400, not a dropped connection."""
+    async def send(port, length):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            writer.write(f"POST /score HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}".encode())
+            await writer.drain()
+            head = (await reader.readuntil(b"\r\n\r\n")).decode().split("\r\n")
+            headers = dict(line.lower().split(": ", 1) for line in head[1:] if line)
+            body = json.loads(await reader.readexactly(int(headers['content-length'])))
+            # The connection is closed after the error
+            return int(head[0].split()[1]), body, headers['connection'], await reader.read()
+        finally:
+            writer.close()
+
+    async def run():
+        service = await ScoringService(port=0).start()
+        try:
+            return [await send(service.port, length) for length in ('abc', '-1')]
+        finally:
+            await service.stop()
+
+    for status, body, connection, rest in asyncio.run(run()):
+        assert status == 400 and body == {'error': 'Invalid Content-Length'}
+        assert connection == 'close' and rest == b''
+
+if __name__ == "__main__":
+    test_score_records_paths_agree()
+    test_service_micro_batches_requests()
+    test_service_rejects_bad_content_length()
@@ -0,0 +1,63 @@
+# Test Company Size Parsing
+import pandas as pd
+from data_loader import clean_leads
+from lead_scoring_engine import LeadScorer
+from size_parser import parse_company_size, parse_company_sizes, recognized_company_sizes
+
+SIZE_CASES = [
+    ('1.5k', 1500),
+    ('10k+', 10000),
+    ('Mid-size', 50),
+    ('1,000-5,000 employees', 1000),
+    ('1-5k', 1000),
+    ('2,500+', 2500),
+    ('~25', 25),
+    ('50 - 100', 50),
+    ('200 employees', 200),
+    ('Small Business', 10),
+    ('Enterprise', 1000),
+    ('50.0', 50),
+    (120, 120),
+    (75.0, 75),
+    ('Unknown', 0),
+    (None, 0),
+    ('-5', 0),
+    ('lots', 0),
+]
+
+def test_size_formats():
+    """Test that every supported format parses the same on both paths."""
+    print("Testing Company Size Formats:")
+    print("-" * 40)
+
+    values = pd.Series([value for value, _ in SIZE_CASES], dtype=object)
+    expected = [size for _, size in SIZE_CASES]
+
+    parsed = parse_company_sizes(values)
+    for (value, size), result in zip(SIZE_CASES, parsed):
+        print(f"{value!r:>26} -> {result}")
+    assert list(parsed) == expected
+    assert [parse_company_size(value) for value, _ in SIZE_CASES] == expected
+
+    recognized = recognized_company_sizes(values)
+    assert list(values[~recognized]) == ['-5', 'lots']
+
+def test_sizes_survive_cleaning():
+    """Test that cleaning keeps rich size formats for the scorer."""
+    df = pd.DataFrame({
+        'name': ['A', 'B', 'C'],
+        'email': ['a@corp.com', 'b@corp.com', 'c@corp.com'],
+        'company': ['Corp', 'Corp', 'Corp'],
+        'job_title': ['Analyst', 'Analyst', 'Analyst'],
+        'company_size': ['1.5k', '10k+', 'Mid-size']
+    })
+    cleaned = clean_leads(df)
+    assert list(cleaned['company_size']) == [1500, 10000, 50]
+
+    scorer = LeadScorer()
+    assert list(scorer.normalize_company_sizes(df['company_size'])) == [1500, 10000, 50]
+    assert scorer.normalize_company_size('1,000-5,000 employees') == 1000
+
+if __name__ == "__main__":
+    test_size_formats()
+    test_sizes_survive_cleaning()